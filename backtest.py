@@ -1,16 +1,79 @@
+from collections.abc import Sequence
+import numpy as np
 import pandas as pd
+from strategy import SignalResult
+
+
+class TradeLog(Sequence):
+    """BUY/SELL log lines of a backtest, formatted only when accessed.
+
+    Behaves like the list of strings simulate_trades used to build, so slicing
+    the last few entries for display formats just those entries.
+    """
+
+    def __init__(self, prices: np.ndarray, times, returns: np.ndarray):
+        self._prices = prices  # alternating entry/exit prices
+        self._times = times
+        self._returns = returns  # one per closed trade
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._format(k) for k in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("trade log index out of range")
+        return self._format(i)
+
+    def _format(self, k: int) -> str:
+        price = self._prices[k]
+        time = self._times[k]
+        if k % 2 == 0:
+            return f"BUY at {price:.2f} on {time}"
+        return f"SELL at {price:.2f} on {time} (Return: {self._returns[k // 2] * 100:.2f}%)"
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, TradeLog)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"TradeLog({len(self)} entries)"
+
+
+def trade_indices(signal: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Entry and exit row positions for all-in/all-out trading on a signal array.
+
+    A position opens on the first 1 while flat and closes on the first -1
+    while invested. Both are the rows where the non-zero signal differs from
+    the previous non-zero signal (starting flat), so they alternate entry,
+    exit, entry, ... An open position at the end has no exit.
+    """
+    nonzero = np.flatnonzero((signal == 1) | (signal == -1))
+    values = signal[nonzero]
+    changed = values != np.concatenate(([-1], values[:-1]))
+    events = nonzero[changed]
+    return events[0::2], events[1::2]
 
 
 def simulate_trades(df: pd.DataFrame, fee: float = 0.001) -> dict:
     """Simulates trading using 'signal' and 'close' columns in the dataframe."""
-    
-    df = df.copy()
-    df.dropna(subset=["close", "signal"], inplace=True)
+    return _simulate(df, df["signal"].to_numpy(), fee)
+
+
+def simulate_signals(result: SignalResult, fee: float = 0.001) -> dict:
+    """Same as simulate_trades, but straight from a SignalResult without a signals frame."""
+    return _simulate(result.data, result.signal, fee)
 
-    trades = []
-    log = []
-    entry_price = None
-    in_position = False
+
+def _simulate(df: pd.DataFrame, signal: np.ndarray, fee: float) -> dict:
+    close = df["close"].to_numpy()
+    valid = ~(pd.isna(close) | pd.isna(signal))
+    close = close[valid]
+    signal = signal[valid]
 
     # Identify time column
     timestamp_col = None
@@ -19,35 +82,25 @@ def simulate_trades(df: pd.DataFrame, fee: float = 0.001) -> dict:
     elif "date" in df.columns:
         timestamp_col = "date"
 
-    for i, row in df.iterrows():
-        time = row[timestamp_col] if timestamp_col else str(i)
-        price = row["close"]
-        signal = row["signal"]
-
-        if signal == 1 and not in_position:
-            entry_price = price
-            in_position = True
-            log.append(f"BUY at {price:.2f} on {time}")
-
-        elif signal == -1 and in_position:
-            exit_price = price
-            pct_change = (exit_price - entry_price) / entry_price - fee
-            trades.append(pct_change)
-            log.append(
-                f"SELL at {exit_price:.2f} on {time} (Return: {pct_change * 100:.2f}%)"
-            )
-            in_position = False
-            entry_price = None
-
-    total_return = sum(trades)
+    entries, exits = trade_indices(signal)
+    entry_prices = close[entries[: len(exits)]]
+    trades = (close[exits] - entry_prices) / entry_prices - fee
+
+    events = np.empty(len(entries) + len(exits), dtype=np.intp)
+    events[0::2] = entries
+    events[1::2] = exits
+    times = df[timestamp_col].array[valid] if timestamp_col else df.index[valid]
+    log = TradeLog(close[events], times[events], trades)
+
+    total_return = sum(trades.tolist())
     num_trades = len(trades)
-    wins = len([t for t in trades if t > 0])
-    losses = len([t for t in trades if t <= 0])
+    wins = int((trades > 0).sum())
+    losses = int((trades <= 0).sum())
     win_rate = wins / num_trades * 100 if num_trades > 0 else 0
 
-    data_points = len(df)
-    start_time = df[timestamp_col].iloc[0] if timestamp_col else None
-    end_time = df[timestamp_col].iloc[-1] if timestamp_col else None
+    data_points = len(close)
+    start_time = times[0] if timestamp_col and data_points else None
+    end_time = times[-1] if timestamp_col and data_points else None
 
     return {
         "trades": num_trades,
@@ -60,3 +113,130 @@ def simulate_trades(df: pd.DataFrame, fee: float = 0.001) -> dict:
         "start_time": str(start_time),
         "end_time": str(end_time),
     }
+
+
+def invested_matrix(signal: np.ndarray) -> np.ndarray:
+    """1 after each bar while the last non-zero signal in a column was a buy, else 0."""
+    last = np.where(signal != 0, signal, np.nan)
+    return (pd.DataFrame(last, copy=False).ffill().to_numpy() == 1).astype(np.int8)
+
+
+def round_trips(close: np.ndarray, invested: np.ndarray, fee: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Closed trades of every column of an invested_matrix, as simulate_trades counts them.
+
+    `close` is one price series for all columns (bars,) or one per column
+    (bars x columns). Returns the column, exit row and net return of each
+    trade, ordered by column and then time. Open positions at the end are
+    left out.
+    """
+    m = invested.shape[1]
+    change = np.diff(invested, axis=0, prepend=np.zeros((1, m), dtype=invested.dtype))
+    entry_cols, entry_rows = np.nonzero(change.T == 1)
+    exit_cols, exit_rows = np.nonzero(change.T == -1)
+
+    # Entries and exits alternate per column; drop each column's unmatched last entry
+    n_exits = np.bincount(exit_cols, minlength=m)
+    first_entry = np.searchsorted(entry_cols, np.arange(m))
+    closed = np.arange(len(entry_cols)) - first_entry[entry_cols] < n_exits[entry_cols]
+    entry_cols, entry_rows = entry_cols[closed], entry_rows[closed]
+
+    if close.ndim == 1:
+        trades = close[exit_rows] / close[entry_rows] - 1 - fee
+    else:
+        trades = close[exit_rows, exit_cols] / close[entry_rows, entry_cols] - 1 - fee
+    return exit_cols, exit_rows, trades
+
+
+# Bars per year used to annualise the Sharpe ratio (US equity sessions)
+PERIODS_PER_YEAR = {"1m": 252 * 390, "5m": 252 * 78, "h": 252 * 7, "d": 252, "w": 52, "m": 12}
+
+
+def align_closes(frames: dict[str, pd.DataFrame]) -> tuple[pd.Index, list[str], np.ndarray]:
+    """Aligns many symbols' closes on their combined timeline.
+
+    Returns the timeline, the symbols and a (bars x symbols) float64 array.
+    Each column is forward-filled from its first bar; rows before a symbol's
+    first bar are NaN.
+    """
+    series = {}
+    for symbol, df in frames.items():
+        if df.empty:
+            continue
+        col = "datetime" if "datetime" in df.columns else "date" if "date" in df.columns else None
+        index = df[col] if col else df.index
+        series[symbol] = pd.Series(df["close"].to_numpy(dtype=np.float64), index=index)
+    if not series:
+        return pd.Index([]), [], np.empty((0, 0))
+
+    panel = pd.concat(series, axis=1, sort=True)
+    panel = panel[~panel.index.duplicated(keep="last")].ffill()
+    return panel.index, list(panel.columns), panel.to_numpy(dtype=np.float64)
+
+
+def simulate_portfolio(
+    strategy,
+    frames: dict[str, pd.DataFrame],
+    fee: float = 0.001,
+    periods_per_year: float = 252,
+) -> dict:
+    """Backtests one strategy on many symbols at once with an equal-weight portfolio.
+
+    The capital is split equally between the symbols, and each symbol's
+    share trades all-in/all-out on its own signals (as simulate_trades),
+    compounding, without rebalancing between symbols. Signals for all
+    symbols come from one Strategy.compute_signal_matrix pass over the
+    aligned closes. `fee` is charged per round trip, half on entry and
+    half on exit.
+    """
+    times, symbols, close = align_closes(frames)
+    n, m = close.shape
+    if n == 0:
+        raise ValueError("No price data to backtest")
+
+    signal = strategy.compute_signal_matrix(close)
+    signal[np.isnan(close)] = 0
+
+    invested = invested_matrix(signal)
+
+    returns = np.nan_to_num(close / np.vstack([close[:1], close[:-1]]) - 1)
+    held = np.vstack([np.zeros((1, m), dtype=np.int8), invested[:-1]])
+    change = np.diff(invested, axis=0, prepend=np.zeros((1, m), dtype=np.int8))
+
+    growth = (1 + held * returns) * (1 - fee / 2 * np.abs(change))
+    sleeves = np.cumprod(growth, axis=0) / m
+    equity = sleeves.sum(axis=1)
+
+    # Per-bar portfolio returns for the Sharpe ratio, drawdown from the running peak
+    period_returns = np.diff(equity, prepend=1.0) / np.concatenate(([1.0], equity[:-1]))
+    std = period_returns.std()
+    sharpe = period_returns.mean() / std * np.sqrt(periods_per_year) if std > 0 else 0.0
+    drawdown = equity / np.maximum.accumulate(np.maximum(equity, 1.0)) - 1
+
+    exit_cols, _, trades = round_trips(close, invested, fee)
+    n_exits = np.bincount(exit_cols, minlength=m)
+    wins = np.bincount(exit_cols, weights=trades > 0, minlength=m).astype(int)
+    per_symbol = pd.DataFrame(
+        {
+            "symbol": symbols,
+            "trades": n_exits,
+            "wins": wins,
+            "win_rate_pct": np.round(np.divide(wins * 100, n_exits, out=np.zeros(m), where=n_exits > 0), 2),
+            "return_pct": np.round((sleeves[-1] * m - 1) * 100, 2),
+            "contribution_pct": np.round((sleeves[-1] - 1 / m) * 100, 2),
+        }
+    )
+
+    return {
+        "symbols": m,
+        "trades": len(trades),
+        "win_rate_pct": round(float((trades > 0).mean() * 100), 2) if len(trades) else 0,
+        "total_return_pct": round(float(equity[-1] - 1) * 100, 2),
+        "max_drawdown_pct": round(float(drawdown.min()) * 100, 2),
+        "sharpe": round(float(sharpe), 2),
+        "equity": pd.Series(equity, index=times, name="equity"),
+        "drawdown": pd.Series(drawdown, index=times, name="drawdown"),
+        "per_symbol": per_symbol.sort_values("return_pct", ascending=False, ignore_index=True),
+        "data_points": n,
+        "start_time": str(times[0]),
+        "end_time": str(times[-1]),
+    }
@@ -1,26 +1,26 @@
+import asyncio
+import importlib
 import logging
+import sys
+from types import ModuleType
+from typing import Optional
 from telegram.ext import (
     ApplicationBuilder,
     CommandHandler,
     CallbackQueryHandler,
     ContextTypes,
 )
-from config import TELEGRAM_BOT_TOKEN
-from handlers import (
-    backtest,
-    start,
-    interval_to_seconds,
-    interval,
-    set_symbol,
-    set_interval,
-    get_price,
-    list_strategies,
-    set_strategy,
-    strategy_button,
-    current_strategy,
-    analyse_market,
-    toggle_debug,
+from config import (
+    TELEGRAM_BOT_TOKEN,
+    TELEGRAM_CHAT_ID,
+    DEFAULT_SYMBOL,
+    DEFAULT_INTERVAL,
+    METRICS_PORT,
+    METRICS_HOST,
+    STARTUP_WARMUP,
 )
+from metrics import start_exporter
+from state_store import has_saved_state
 
 # Set up root logger
 logging.basicConfig(
@@ -28,35 +28,120 @@ logging.basicConfig(
     level=logging.INFO,
 )
 
+# handlers imports pandas, numpy, aiohttp and the strategies, which takes
+# longer than everything else here together. It is loaded in a worker thread
+# on first use (or by the warm-up task), so the bot starts polling right away.
+_handlers_task: Optional[asyncio.Task] = None
+
+
+async def _import_handlers() -> ModuleType:
+    handlers = await asyncio.to_thread(importlib.import_module, "handlers")
+    # Saved state was loaded by the import; changes are flushed from here on
+    handlers.watchlist.store.start()
+    return handlers
+
+
+async def load_handlers() -> ModuleType:
+    """Imports the handlers module once, off the event loop."""
+    global _handlers_task
+
+    if _handlers_task is None:
+        _handlers_task = asyncio.ensure_future(_import_handlers())
+    try:
+        return await asyncio.shield(_handlers_task)
+    except Exception:
+        _handlers_task = None
+        raise
+
+
+def lazy(name: str):
+    """A callback that runs `handlers.<name>`, loading handlers on the first call."""
+
+    async def callback(update, context: ContextTypes.DEFAULT_TYPE):
+        handlers = await load_handlers()
+        return await getattr(handlers, name)(update, context)
+
+    callback.__name__ = callback.__qualname__ = name
+    return callback
+
+
+async def warm_up(app) -> None:
+    """Loads handlers, resumes saved subscriptions and, on the first run, watches the default symbol in the configured channel."""
+    handlers = await load_handlers()
+    logging.info("Handlers loaded.")
+
+    if TELEGRAM_CHAT_ID:
+        from watchlist import Subscription
+
+        chat_id = int(TELEGRAM_CHAT_ID) if TELEGRAM_CHAT_ID.lstrip("-").isdigit() else TELEGRAM_CHAT_ID
+        # Only on the first run: after that the channel's saved state (including an /unwatch) wins
+        if not handlers.watchlist.has_chat(chat_id):
+            handlers.watchlist.add(Subscription(chat_id, DEFAULT_SYMBOL, DEFAULT_INTERVAL))
+            handlers.watchlist.save_settings(chat_id)
+    handlers.schedule_jobs(app.job_queue)
+
 
 # Called once on bot startup
 async def on_startup(app):
     logging.info("Bot Started: Type /start in Telegram trading bot channel.")
 
-    seconds = interval_to_seconds(interval)
-    app.job_queue.run_repeating(analyse_market, interval=seconds, first=0)
+    # Saved subscriptions and the configured channel's default symbol need
+    # the handlers anyway; otherwise they load with the first command
+    if TELEGRAM_CHAT_ID or STARTUP_WARMUP or has_saved_state():
+        app.create_task(warm_up(app))
+
+    if METRICS_PORT:
+        app.bot_data["metrics_runner"] = await start_exporter(METRICS_PORT, METRICS_HOST)
+        logging.info("Serving metrics on %s:%d/metrics", METRICS_HOST, METRICS_PORT)
+
+
+# Called once on bot shutdown
+async def on_shutdown(app):
+    runner = app.bot_data.pop("metrics_runner", None)
+    if runner is not None:
+        await runner.cleanup()
+
+    # Nothing to close if no command ever loaded the handlers
+    handlers = sys.modules.get("handlers")
+    if handlers is not None:
+        await handlers.stream.close()
+        await handlers.notifier.close()
+        handlers.compute.shutdown()
+        if handlers.shards is not None:
+            handlers.shards.close()
+        await handlers.watchlist.store.close()
+        await sys.modules["data_fetcher"].close_session()
 
 
 def main() -> None:
     application = ApplicationBuilder().token(TELEGRAM_BOT_TOKEN).build()
 
     # Register command handlers
-    application.add_handler(CommandHandler("start", start))
-    application.add_handler(CommandHandler("set_symbol", set_symbol))
-    application.add_handler(CommandHandler("set_interval", set_interval))
-    application.add_handler(CommandHandler("get_price", get_price))
-    application.add_handler(CommandHandler("list_strategies", list_strategies))
-    application.add_handler(CommandHandler("set_strategy", set_strategy))
-    application.add_handler(CommandHandler("current_strategy", current_strategy))
-    application.add_handler(CommandHandler("backtest", backtest))
-    application.add_handler(CommandHandler("debug", toggle_debug))
+    application.add_handler(CommandHandler("start", lazy("start")))
+    application.add_handler(CommandHandler("set_symbol", lazy("set_symbol")))
+    application.add_handler(CommandHandler("set_interval", lazy("set_interval")))
+    application.add_handler(CommandHandler("get_price", lazy("get_price")))
+    application.add_handler(CommandHandler("list_strategies", lazy("list_strategies")))
+    application.add_handler(CommandHandler("set_strategy", lazy("set_strategy")))
+    application.add_handler(CommandHandler("current_strategy", lazy("current_strategy")))
+    application.add_handler(CommandHandler("backtest", lazy("backtest")))
+    application.add_handler(CommandHandler("optimize", lazy("optimize_strategy")))
+    application.add_handler(CommandHandler("portfolio", lazy("portfolio")))
+    application.add_handler(CommandHandler("walkforward", lazy("walkforward")))
+    application.add_handler(CommandHandler("debug", lazy("toggle_debug")))
+    application.add_handler(CommandHandler("watch", lazy("watch")))
+    application.add_handler(CommandHandler("unwatch", lazy("unwatch")))
+    application.add_handler(CommandHandler("watchlist", lazy("show_watchlist")))
+    application.add_handler(CommandHandler("stats", lazy("stats")))
+    application.add_handler(CommandHandler("cancel", lazy("cancel")))
 
     application.add_handler(
-        CallbackQueryHandler(strategy_button, pattern=r"^setstrat:")
+        CallbackQueryHandler(lazy("strategy_button"), pattern=r"^setstrat:")
     )
 
     # Hook for startup logic (e.g. scheduling)
     application.post_init = on_startup
+    application.post_shutdown = on_shutdown
     application.run_polling()
 
 
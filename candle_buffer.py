@@ -0,0 +1,153 @@
+# candle_buffer.py
+
+from typing import Mapping, Optional
+import numpy as np
+import pandas as pd
+from config import CANDLE_STORE_DTYPE
+
+COLUMNS = ("open", "high", "low", "close", "volume")
+UTC_NS = pd.DatetimeTZDtype("ns", "UTC")
+
+
+class CandleBuffer:
+    """Fixed-capacity OHLCV history of one series in flat NumPy arrays.
+
+    Timestamps are int64 epoch nanoseconds and the OHLCV columns use `dtype`
+    (float64 by default; float32 takes 28 bytes per bar against 48). The newest
+    `capacity` bars sit in one contiguous window of preallocated arrays, so
+    `arrays()` and `frame()` are views rather than copies, and appending a
+    bar only writes that bar until the spare room runs out.
+
+    Views stay valid: once one has been handed out, an update that would
+    rewrite rows it covers (a refreshed forming candle) copies the window to
+    new arrays instead of writing over it. Re-sent bars identical to the
+    stored ones are skipped, so polling from the last timestamp only copies
+    when that candle actually changed.
+    """
+
+    def __init__(self, capacity: int, time_column: str = "datetime", dtype=CANDLE_STORE_DTYPE):
+        self.capacity = capacity
+        self.time_column = time_column
+        self.dtype = np.dtype(dtype)
+        self._times = np.empty(0, dtype=np.int64)
+        self._values = np.empty((len(COLUMNS), 0), dtype=self.dtype)
+        self._start = 0
+        self._end = 0
+        self._shared = False
+        self._frame: Optional[pd.DataFrame] = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, capacity: int, time_column: str = "datetime", dtype=CANDLE_STORE_DTYPE):
+        buffer = cls(capacity, time_column, dtype)
+        buffer.extend_frame(df)
+        return buffer
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the arrays, spare room included."""
+        return self._times.nbytes + self._values.nbytes
+
+    def _view(self, values: np.ndarray) -> np.ndarray:
+        self._shared = True
+        view = values.view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def times(self) -> np.ndarray:
+        """Bar timestamps as int64 epoch nanoseconds (read-only view)."""
+        return self._view(self._times[self._start : self._end])
+
+    def column(self, name: str) -> np.ndarray:
+        """One OHLCV column (read-only view)."""
+        return self._view(self._values[COLUMNS.index(name), self._start : self._end])
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """Read-only views of the time and OHLCV columns."""
+        return {self.time_column: self.times, **{col: self.column(col) for col in COLUMNS}}
+
+    def frame(self) -> pd.DataFrame:
+        """The bars as a DataFrame backed by the buffer's arrays, with a UTC time column.
+
+        The same frame is returned until the buffer changes. Callers must not mutate it.
+        """
+        if self._frame is None:
+            arrays = self.arrays()
+            arrays[self.time_column] = pd.Series(arrays[self.time_column], dtype=UTC_NS, copy=False)
+            self._frame = pd.DataFrame(arrays, copy=False)
+        return self._frame
+
+    def last_time(self) -> Optional[pd.Timestamp]:
+        if not len(self):
+            return None
+        return pd.Timestamp(int(self._times[self._end - 1]), unit="ns", tz="UTC")
+
+    def extend(self, times: np.ndarray, values: Mapping[str, np.ndarray]) -> None:
+        """Adds bars in time order; stored bars at or after the first new one are replaced.
+
+        `times` are epoch nanoseconds and `values` maps OHLCV column names to
+        arrays (missing columns are stored as NaN). Only the newest `capacity`
+        bars are kept.
+        """
+        times = np.asarray(times, dtype=np.int64)[-self.capacity :]
+        n = len(times)
+        values = {col: np.asarray(values[col], dtype=self.dtype)[-n:] for col in COLUMNS if col in values}
+        cut = self._start + int(np.searchsorted(self._times[self._start : self._end], times[0])) if n else self._end
+
+        # Leading new bars that repeat the stored ones exactly change nothing
+        same = min(self._end - cut, n)
+        if same and self._repeats(cut, times[:same], values):
+            times = times[same:]
+            values = {col: v[same:] for col, v in values.items()}
+            n -= same
+            cut += same
+        if not n:
+            return
+        self._frame = None
+
+        keep = min(cut - self._start, self.capacity - n)
+        if (self._shared and cut < self._end) or cut + n > len(self._times):
+            self._move(cut - keep, cut, n)
+            cut = keep
+        else:
+            self._start = cut - keep
+
+        self._times[cut : cut + n] = times
+        for i, col in enumerate(COLUMNS):
+            self._values[i, cut : cut + n] = values.get(col, np.nan)
+        self._end = cut + n
+
+    def _repeats(self, cut: int, times: np.ndarray, values: dict[str, np.ndarray]) -> bool:
+        """Whether bars from row `cut` on equal the given ones (NaN equal to NaN)."""
+        hi = cut + len(times)
+        if not np.array_equal(self._times[cut:hi], times):
+            return False
+        return all(
+            np.array_equal(self._values[i, cut:hi], values.get(col, np.full(len(times), np.nan)), equal_nan=True)
+            for i, col in enumerate(COLUMNS)
+        )
+
+    def extend_frame(self, df: pd.DataFrame) -> None:
+        """extend() with the bars of a DataFrame that has this buffer's time column."""
+        if df.empty:
+            return
+        times = df[self.time_column].array
+        # Epoch nanoseconds whatever resolution the column was parsed with
+        ns = times.asi8 * pd.Timedelta(1, unit=times.unit).value
+        self.extend(ns, {col: df[col].to_numpy() for col in COLUMNS if col in df.columns})
+
+    def _move(self, lo: int, hi: int, n: int) -> None:
+        """Copies bars [lo, hi) to the front of new arrays with room for `n` more and some spare."""
+        kept = hi - lo
+        size = kept + n + max((kept + n) // 8, 16)
+        times = np.empty(size, dtype=np.int64)
+        values = np.empty((len(COLUMNS), size), dtype=self.dtype)
+        times[:kept] = self._times[lo:hi]
+        values[:, :kept] = self._values[:, lo:hi]
+        self._times, self._values = times, values
+        self._start, self._end = 0, kept
+        self._shared = False
+        self._frame = None
@@ -0,0 +1,88 @@
+# candle_store.py
+
+import asyncio
+import pandas as pd
+from config import CANDLE_STORE_MAX_BARS, CANDLE_STORE_DTYPE
+from candle_buffer import CandleBuffer
+from data_fetcher import AsyncDataFetcher
+from ohlc_cache import OhlcCache
+from typing import Optional
+
+
+def time_column(df: pd.DataFrame) -> str:
+    """Name of the bar timestamp column ("datetime" for intraday, "date" for EOD)."""
+    return "datetime" if "datetime" in df.columns else "date"
+
+
+class CandleStore:
+    """Keeps OHLC history per (symbol, interval) in memory and only fetches new bars.
+
+    The first request for a series downloads the full history window; later
+    requests ask EODHD for bars from the last stored timestamp onwards, so the
+    still-forming last candle is refreshed and everything older is reused.
+    With a `cache`, the initial history is loaded through the on-disk OhlcCache.
+
+    Each series is held in a CandleBuffer of at most `max_bars` bars with
+    `dtype` price and volume columns, and callers get DataFrame views of it.
+    """
+
+    def __init__(
+        self, max_bars: int = CANDLE_STORE_MAX_BARS, cache: Optional[OhlcCache] = None, dtype=CANDLE_STORE_DTYPE
+    ):
+        self.max_bars = max_bars
+        self.cache = cache
+        self.dtype = dtype
+        self._buffers: dict[tuple[str, str], CandleBuffer] = {}
+        self._locks: dict[tuple[str, str], asyncio.Lock] = {}
+
+    def _new_buffer(self, key: tuple[str, str], df: pd.DataFrame) -> CandleBuffer:
+        self._buffers[key] = CandleBuffer(self.max_bars, time_column(df), self.dtype)
+        return self._buffers[key]
+
+    async def get(self, symbol: str, interval: str) -> pd.DataFrame:
+        """Returns the up-to-date history for a series. Callers must not mutate it."""
+        key = (symbol, interval)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+
+        async with lock:
+            fetcher = AsyncDataFetcher(symbol, interval)
+            buffer = self._buffers.get(key)
+
+            if buffer is None or not len(buffer):
+                if self.cache is not None:
+                    df = await self.cache.fetch_ohlc(symbol, interval)
+                else:
+                    df = await fetcher.fetch_ohlc()
+                buffer = self._new_buffer(key, df)
+            else:
+                df = await fetcher.fetch_ohlc(start=buffer.last_time().to_pydatetime())
+
+            buffer.extend_frame(df)
+            return buffer.frame()
+
+    async def add_bars(self, symbol: str, interval: str, new: pd.DataFrame) -> pd.DataFrame:
+        """Merges bars built elsewhere (e.g. from the WebSocket feed) into a series.
+
+        A series that is not in memory yet is loaded first, so the bars land
+        on top of the full history. Stored bars at or after the first new one
+        are replaced.
+        """
+        key = (symbol, interval)
+        if self._buffers.get(key) is None:
+            await self.get(symbol, interval)
+
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            buffer = self._buffers.get(key)
+            if buffer is None or not len(buffer):
+                buffer = self._new_buffer(key, new)
+            buffer.extend_frame(new)
+            return buffer.frame()
+
+    def nbytes(self) -> int:
+        """Memory held by all stored series."""
+        return sum(buffer.nbytes for buffer in list(self._buffers.values()))
+
+    def drop(self, symbol: str, interval: str) -> None:
+        """Forgets a series so the next request re-downloads its history."""
+        self._buffers.pop((symbol, interval), None)
+        self._locks.pop((symbol, interval), None)
@@ -0,0 +1,193 @@
+# compute.py
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, Optional
+from config import COMPUTE_THREADS, COMPUTE_MAX_PENDING, COMPUTE_USER_LIMIT, OPTIMIZE_MAX_WORKERS
+import metrics
+
+COMPUTE_JOBS = metrics.counter("compute_jobs_total", "CPU-bound jobs by outcome", ("job", "result"))
+COMPUTE_SECONDS = metrics.histogram("compute_job_seconds", "Time from submitting a job to its result", ("job",))
+COMPUTE_PENDING = metrics.gauge("compute_jobs_pending", "Jobs queued or running in the compute pool")
+
+
+class ComputeBusy(Exception):
+    """Raised when the queue or a user's concurrency limit is full."""
+
+
+class JobCancelled(Exception):
+    """Raised when a job was cancelled through ComputePool.cancel()."""
+
+
+@dataclass(eq=False)
+class Job:
+    name: str
+    user: Optional[Hashable]
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+    future: Optional[Future] = None
+    waiter: Optional[asyncio.Future] = None
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+        # Stops the caller waiting; a worker that already started runs on
+        # until it notices cancel_event (or finishes)
+        if self.waiter is not None:
+            self.waiter.cancel()
+        elif self.future is not None:
+            self.future.cancel()
+
+
+class ComputePool:
+    """Runs CPU-bound strategy and backtest work off the event loop.
+
+    Jobs run in a thread pool, where NumPy and pandas release the GIL for the
+    heavy parts. Jobs that fan out further (parameter sweeps) are handed the
+    shared process pool instead of starting their own.
+
+    At most `max_pending` jobs are queued or running. Users' jobs are rejected
+    with ComputeBusy when that queue, or the user's `user_limit`, is full;
+    background jobs (`wait=True`) wait for a slot. A slot is held until the
+    job's worker really finishes, also after cancellation, so cancelled work
+    that is already running still counts against the bounds.
+    """
+
+    def __init__(
+        self,
+        threads: int = COMPUTE_THREADS,
+        processes: int = OPTIMIZE_MAX_WORKERS,
+        max_pending: int = COMPUTE_MAX_PENDING,
+        user_limit: int = COMPUTE_USER_LIMIT,
+    ):
+        self.threads = threads or min(32, (os.cpu_count() or 1) + 4)
+        self.processes = processes or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.user_limit = user_limit
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._jobs: dict[Optional[Hashable], set[Job]] = {}
+
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        """The shared process pool, started on first use."""
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.processes)
+        return self._process_pool
+
+    def pending(self, user: Optional[Hashable] = None) -> int:
+        """Jobs queued or running, for one user or (by default) in total."""
+        if user is not None:
+            return len(self._jobs.get(user, ()))
+        return sum(len(jobs) for jobs in self._jobs.values())
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        user: Optional[Hashable] = None,
+        wait: bool = False,
+        cancellable: bool = False,
+        **kwargs,
+    ) -> Any:
+        """Runs `fn(*args, **kwargs)` in the thread pool and returns its result.
+
+        With `cancellable=True`, `fn` also receives `cancel=<threading.Event>`
+        and should stop early once it is set.
+        """
+        name = getattr(fn, "__name__", "job")
+        job = self._admit(name, user, wait)
+        if cancellable:
+            kwargs["cancel"] = job.cancel_event
+        try:
+            await self._start(job, fn, args, kwargs)
+            result = await self._wait(job)
+        except JobCancelled:
+            COMPUTE_JOBS.inc(job=name, result="cancelled")
+            raise
+        except Exception:
+            COMPUTE_JOBS.inc(job=name, result="failed")
+            raise
+        COMPUTE_JOBS.inc(job=name, result="done")
+        return result
+
+    def _admit(self, name: str, user: Optional[Hashable], wait: bool) -> Job:
+        """Registers a new job, or raises ComputeBusy when the user's or the pool's limit is reached."""
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="compute")
+            self._slots = asyncio.Semaphore(self.max_pending)
+
+        if user is not None and self.pending(user) >= self.user_limit:
+            COMPUTE_JOBS.inc(job=name, result="rejected")
+            raise ComputeBusy(f"You already have {self.user_limit} jobs running; wait for them or /cancel.")
+        if not wait and self._slots.locked():
+            COMPUTE_JOBS.inc(job=name, result="rejected")
+            raise ComputeBusy("The bot is busy; please try again in a moment.")
+
+        job = Job(name, user)
+        self._jobs.setdefault(user, set()).add(job)
+        COMPUTE_PENDING.set(self.pending())
+        return job
+
+    async def _start(self, job: Job, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        """Waits for a slot and submits the job; the slot and the job are given up if that fails."""
+        acquired = False
+        try:
+            await self._slots.acquire()
+            acquired = True
+            if job.cancel_event.is_set():
+                raise JobCancelled(f"{job.name} was cancelled")
+            job.future = self._thread_pool.submit(fn, *args, **kwargs)
+        except BaseException:
+            if acquired:
+                self._release(job)
+            else:
+                self._finish(job)
+            raise
+
+        # Free the slot when the worker is done, not when the caller stops waiting
+        loop = asyncio.get_running_loop()
+        job.future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release, job))
+        job.waiter = asyncio.wrap_future(job.future)
+
+    async def _wait(self, job: Job) -> Any:
+        """The result of a submitted job; JobCancelled if it was cancelled through cancel()."""
+        try:
+            with COMPUTE_SECONDS.time(job=job.name):
+                return await job.waiter
+        except asyncio.CancelledError:
+            job.future.cancel()
+            if job.cancel_event.is_set():
+                raise JobCancelled(f"{job.name} was cancelled") from None
+            raise
+
+    def _release(self, job: Job) -> None:
+        self._slots.release()
+        self._finish(job)
+
+    def _finish(self, job: Job) -> None:
+        jobs = self._jobs.get(job.user)
+        if jobs is not None:
+            jobs.discard(job)
+            if not jobs:
+                del self._jobs[job.user]
+        COMPUTE_PENDING.set(self.pending())
+
+    def cancel(self, user: Hashable) -> int:
+        """Cancels a user's queued and running jobs; returns how many there were."""
+        jobs = list(self._jobs.get(user, ()))
+        for job in jobs:
+            job.cancel()
+        return len(jobs)
+
+    def shutdown(self) -> None:
+        for jobs in self._jobs.values():
+            for job in jobs:
+                job.cancel()
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False, cancel_futures=True)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+        self._thread_pool = self._process_pool = None
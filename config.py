@@ -8,3 +8,74 @@ DEFAULT_SYMBOL = os.getenv("DEFAULT_SYMBOL", "AAPL.US")
 DEFAULT_INTERVAL = os.getenv("DEFAULT_INTERVAL", "d")
 SHORT_WINDOW = int(os.getenv("SHORT_WINDOW", 20))
 LONG_WINDOW = int(os.getenv("LONG_WINDOW", 50))
+
+# EODHD HTTP client (AsyncDataFetcher)
+EODHD_API_URL = os.getenv("EODHD_API_URL", "https://eodhd.com/api")
+EODHD_MAX_CONNECTIONS = int(os.getenv("EODHD_MAX_CONNECTIONS", 10))
+EODHD_TIMEOUT = float(os.getenv("EODHD_TIMEOUT", 15))
+EODHD_MAX_RETRIES = int(os.getenv("EODHD_MAX_RETRIES", 3))
+EODHD_RETRY_BACKOFF = float(os.getenv("EODHD_RETRY_BACKOFF", 0.5))
+
+# In-memory candle store
+CANDLE_STORE_MAX_BARS = int(os.getenv("CANDLE_STORE_MAX_BARS", 20000))
+# Storage type of the price and volume columns (float64, or float32 to save memory)
+CANDLE_STORE_DTYPE = os.getenv("CANDLE_STORE_DTYPE", "float64")
+
+# On-disk OHLC cache
+OHLC_CACHE_DIR = os.getenv("OHLC_CACHE_DIR", "cache/ohlc")
+OHLC_CACHE_MAX_MB = int(os.getenv("OHLC_CACHE_MAX_MB", 512))
+
+# Parameter sweeps (/optimize); 0 uses all cores
+OPTIMIZE_MAX_WORKERS = int(os.getenv("OPTIMIZE_MAX_WORKERS", 0))
+
+# Memory for indicator arrays shared between strategies on the same series, in MB (0 disables)
+INDICATOR_CACHE_MB = int(os.getenv("INDICATOR_CACHE_MB", 256))
+
+# Compile the indicator kernels with Numba when it is installed
+INDICATOR_JIT = os.getenv("INDICATOR_JIT", "true").lower() in ("1", "true", "yes")
+
+# Outgoing Telegram alerts (messages per second)
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", 30))
+TELEGRAM_CHAT_RATE = float(os.getenv("TELEGRAM_CHAT_RATE", 1))
+TELEGRAM_MAX_CONNECTIONS = int(os.getenv("TELEGRAM_MAX_CONNECTIONS", 10))
+TELEGRAM_MAX_RETRIES = int(os.getenv("TELEGRAM_MAX_RETRIES", 5))
+
+# Live quotes: cache lifetime (s), tickers per request, batching window (s)
+QUOTE_TTL = float(os.getenv("QUOTE_TTL", 5))
+QUOTE_BATCH_SIZE = int(os.getenv("QUOTE_BATCH_SIZE", 20))
+QUOTE_BATCH_DELAY = float(os.getenv("QUOTE_BATCH_DELAY", 0.05))
+
+# Real-time WebSocket streaming for 1m/5m/h series (falls back to polling)
+STREAMING_ENABLED = os.getenv("STREAMING_ENABLED", "false").lower() in ("1", "true", "yes")
+EODHD_WS_URL = os.getenv("EODHD_WS_URL", "wss://ws.eodhistoricaldata.com/ws")
+STREAM_SETTLE = float(os.getenv("STREAM_SETTLE", 2))
+
+# Candle-aligned analysis runs: delay after a candle closes (s), series per batch, batching window (s)
+SCHEDULE_SETTLE = float(os.getenv("SCHEDULE_SETTLE", 10))
+SCHEDULE_BATCH_SIZE = int(os.getenv("SCHEDULE_BATCH_SIZE", 200))
+SCHEDULE_BATCH_WINDOW = float(os.getenv("SCHEDULE_BATCH_WINDOW", 0.25))
+
+# Prometheus /metrics endpoint (0 disables)
+METRICS_PORT = int(os.getenv("METRICS_PORT", 0))
+METRICS_HOST = os.getenv("METRICS_HOST", "0.0.0.0")
+
+# Import handlers, pandas and the strategies in the background right after startup
+# instead of on the first command
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "false").lower() in ("1", "true", "yes")
+
+# CPU-bound work from handlers: worker threads (0 = from the core count), jobs
+# queued or running at once, and jobs per user. Sweeps use OPTIMIZE_MAX_WORKERS processes.
+COMPUTE_THREADS = int(os.getenv("COMPUTE_THREADS", 0))
+COMPUTE_MAX_PENDING = int(os.getenv("COMPUTE_MAX_PENDING", 32))
+COMPUTE_USER_LIMIT = int(os.getenv("COMPUTE_USER_LIMIT", 2))
+
+# Subscriptions, chat settings and last processed candles: "sqlite" or "memory"
+# (not persisted), database file, and seconds between batched writes
+STATE_BACKEND = os.getenv("STATE_BACKEND", "sqlite")
+STATE_DB_PATH = os.getenv("STATE_DB_PATH", "cache/state.sqlite3")
+STATE_FLUSH_INTERVAL = float(os.getenv("STATE_FLUSH_INTERVAL", 1))
+
+# Analysis worker processes, sharded by symbol (0 analyses in the bot process),
+# and seconds to wait for a worker's result
+SHARD_WORKERS = int(os.getenv("SHARD_WORKERS", 0))
+SHARD_TIMEOUT = float(os.getenv("SHARD_TIMEOUT", 120))
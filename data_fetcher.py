@@ -1,15 +1,103 @@
 # data_fetcher.py
 
+import asyncio
+import io
+import json
+import logging
+import aiohttp
 import pandas as pd
-from eodhd import APIClient
-from config import EODHD_API_TOKEN, DEFAULT_SYMBOL, DEFAULT_INTERVAL
+from config import (
+    EODHD_API_TOKEN,
+    EODHD_API_URL,
+    EODHD_MAX_CONNECTIONS,
+    EODHD_TIMEOUT,
+    EODHD_MAX_RETRIES,
+    EODHD_RETRY_BACKOFF,
+    DEFAULT_SYMBOL,
+    DEFAULT_INTERVAL,
+)
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Optional
 import pytz
+import metrics
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+EODHD_REQUESTS = metrics.counter(
+    "eodhd_requests_total", "EODHD API requests by endpoint and HTTP status", ("endpoint", "status")
+)
+EODHD_LATENCY = metrics.histogram("eodhd_request_seconds", "EODHD API request latency", ("endpoint",))
+
+EOD_INTERVALS = ["d", "w", "m"]
+INTRADAY_INTERVALS = ["1m", "5m", "h"]
+
+# EODHD names the hourly intraday interval "1h"
+_API_INTERVALS = {"h": "1h"}
+
+
+def history_start(interval: str, now: datetime) -> datetime:
+    """Start of the default history window fetched for an interval."""
+    if interval in EOD_INTERVALS:
+        return now - timedelta(days=365)
+    if interval in INTRADAY_INTERVALS:
+        return now - timedelta(days=14)
+    raise ValueError("Invalid interval (1m, 5m, h, d, w, m)")
+
+
+def loads(body: bytes) -> Any:
+    """Decodes a JSON response body, with orjson when it is installed."""
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+def _to_dataframe(data: Any) -> pd.DataFrame:
+    """Turns an EODHD OHLC payload into a DataFrame with a parsed time column."""
+    df = pd.DataFrame(data)
+    df.dropna(inplace=True)
+    df.drop(columns=["timestamp", "gmtoffset"], errors="ignore", inplace=True)
+
+    # Parse timestamp into datetime
+    if "date" in df.columns:
+        df["date"] = pd.to_datetime(df["date"], utc=True)
+    elif "datetime" in df.columns:
+        df["datetime"] = pd.to_datetime(df["datetime"], utc=True)
+
+    return df
+
+
+def _from_csv(body: bytes) -> pd.DataFrame:
+    """Parses an EODHD OHLC CSV response into the same frame as _to_dataframe.
+
+    The C parser reads each column straight into an array, with no Python
+    object per bar, and intraday times come from the epoch Timestamp column
+    instead of the Datetime text.
+    """
+    if not body.strip():
+        return pd.DataFrame()
+    df = pd.read_csv(io.BytesIO(body), usecols=lambda col: col.lower() not in ("datetime", "gmtoffset"))
+    df.columns = df.columns.str.lower()
+    df.dropna(inplace=True)
+
+    if "timestamp" in df.columns:
+        df.insert(0, "datetime", pd.to_datetime(df.pop("timestamp"), unit="s", utc=True))
+    elif "date" in df.columns:
+        df["date"] = pd.to_datetime(df["date"], format="%Y-%m-%d", utc=True)
+    else:
+        logger.warning("Unexpected EODHD CSV columns: %s", list(df.columns))
+        return pd.DataFrame()
+
+    return df.reset_index(drop=True)
 
 
 class DataFetcher:
     def __init__(self, symbol: str = DEFAULT_SYMBOL, interval: str = DEFAULT_INTERVAL):
+        # The eodhd package pulls in matplotlib; only load it for the sync client
+        from eodhd import APIClient
+
         self.api = APIClient(EODHD_API_TOKEN)
         self.symbol = symbol
         self.interval = interval
@@ -17,40 +105,204 @@ class DataFetcher:
     def fetch_ohlc(self) -> pd.DataFrame:
         now = datetime.now(pytz.UTC)
 
-        if self.interval in ["d", "w", "m"]:
+        if self.interval in EOD_INTERVALS:
             start = now - timedelta(days=365)
-            data = self.api.get_eod_historical_stock_market_data(
-                symbol=self.symbol,
-                period=self.interval,
-                from_date=start.strftime("%Y-%m-%d"),
-                to_date=now.strftime("%Y-%m-%d"),
-                order="a",
-            )
-        elif self.interval in ["1m", "5m", "h"]:
+            with EODHD_LATENCY.time(endpoint="eod"):
+                data = self.api.get_eod_historical_stock_market_data(
+                    symbol=self.symbol,
+                    period=self.interval,
+                    from_date=start.strftime("%Y-%m-%d"),
+                    to_date=now.strftime("%Y-%m-%d"),
+                    order="a",
+                )
+        elif self.interval in INTRADAY_INTERVALS:
             start = now - timedelta(days=14)
-            data = self.api.get_intraday_historical_data(
-                symbol=self.symbol,
-                interval=self.interval,
-                from_unix_time=start.timestamp(),
-                to_unix_time=now.timestamp(),
-            )
+            with EODHD_LATENCY.time(endpoint="intraday"):
+                data = self.api.get_intraday_historical_data(
+                    symbol=self.symbol,
+                    interval=_API_INTERVALS.get(self.interval, self.interval),
+                    from_unix_time=start.timestamp(),
+                    to_unix_time=now.timestamp(),
+                )
         else:
             raise ValueError("Invalid interval (1m, 5m, h, d, w, m)")
 
-        df = pd.DataFrame(data)
-        df.dropna(inplace=True)
-        df.drop(columns=["timestamp", "gmtoffset"], errors="ignore", inplace=True)
+        return _to_dataframe(data)
 
-        # Parse timestamp into datetime
-        if "date" in df.columns:
-            df["date"] = pd.to_datetime(df["date"], utc=True)
-        elif "datetime" in df.columns:
-            df["datetime"] = pd.to_datetime(df["datetime"], utc=True)
+    def fetch_price(self) -> Optional[float]:
+        with EODHD_LATENCY.time(endpoint="real-time"):
+            data = self.api.get_live_stock_prices(ticker=self.symbol)
+        if not data or "close" not in data:
+            return None
+        return data["close"]
 
-        return df
 
-    def fetch_price(self) -> Optional[float]:
-        data = self.api.get_live_stock_prices(ticker=self.symbol)
+# Shared HTTP session for AsyncDataFetcher. Created lazily inside the running
+# event loop and closed from the application's shutdown hook.
+_session: Optional[aiohttp.ClientSession] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def get_session() -> tuple[aiohttp.ClientSession, asyncio.Semaphore]:
+    """The shared session and the semaphore capping its concurrent requests.
+
+    Callers keep both for the whole request, since close_session() may reset
+    the globals while it is in flight.
+    """
+    global _session, _semaphore
+
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(limit=EODHD_MAX_CONNECTIONS)
+        timeout = aiohttp.ClientTimeout(total=EODHD_TIMEOUT)
+        _session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        _semaphore = asyncio.Semaphore(EODHD_MAX_CONNECTIONS)
+    return _session, _semaphore
+
+
+async def close_session() -> None:
+    global _session, _semaphore
+
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+    _semaphore = None
+
+
+class AsyncDataFetcher:
+    """Non-blocking counterpart of DataFetcher backed by the shared aiohttp session."""
+
+    def __init__(self, symbol: str = DEFAULT_SYMBOL, interval: str = DEFAULT_INTERVAL):
+        self.symbol = symbol
+        self.interval = interval
+
+    async def _get(self, endpoint: str, params: dict) -> Any:
+        """GETs a JSON endpoint. Returns an empty dict when the request ultimately
+        fails, mirroring the behaviour of the synchronous eodhd client."""
+        body = await self._request(endpoint, params)
+        return {} if body is None else loads(body)
+
+    async def _request(self, endpoint: str, params: dict) -> Optional[bytes]:
+        """GETs an EODHD endpoint, retrying timeouts, 429s and 5xx with backoff.
+
+        Returns the response body (JSON unless `params` sets another fmt), or
+        None when the request ultimately fails.
+        """
+        session, semaphore = get_session()
+        url = f"{EODHD_API_URL}/{endpoint}"
+        kind = endpoint.split("/")[0]
+        query = {"api_token": EODHD_API_TOKEN, "fmt": "json", **params}
+
+        for attempt in range(EODHD_MAX_RETRIES + 1):
+            delay = EODHD_RETRY_BACKOFF * 2**attempt
+            try:
+                async with semaphore:
+                    with EODHD_LATENCY.time(endpoint=kind):
+                        async with session.get(url, params=query) as response:
+                            EODHD_REQUESTS.inc(endpoint=kind, status=str(response.status))
+                            if response.status == 200:
+                                return await response.read()
+
+                            body = await response.text()
+                            if response.status != 429 and response.status < 500:
+                                logger.warning(
+                                    "EODHD %s failed (%s): %s", endpoint, response.status, body
+                                )
+                                return None
+
+                            retry_after = response.headers.get("Retry-After")
+                            if retry_after and retry_after.isdigit():
+                                delay = max(delay, float(retry_after))
+                            logger.info(
+                                "EODHD %s returned %s (attempt %d)",
+                                endpoint,
+                                response.status,
+                                attempt + 1,
+                            )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                EODHD_REQUESTS.inc(endpoint=kind, status="error")
+                logger.info("EODHD %s error: %r (attempt %d)", endpoint, e, attempt + 1)
+
+            if attempt < EODHD_MAX_RETRIES:
+                await asyncio.sleep(delay)
+
+        logger.warning("EODHD %s gave up after %d attempts", endpoint, EODHD_MAX_RETRIES + 1)
+        return None
+
+    async def fetch_ohlc(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> pd.DataFrame:
+        """Fetches bars between `start` and `end` (default: the history window until now).
+
+        Bars are requested as CSV, which parses into columns much faster and
+        with far less memory than the JSON list of per-bar objects.
+        """
+        df = await self.try_fetch_ohlc(start, end)
+        return pd.DataFrame() if df is None else df
+
+    async def try_fetch_ohlc(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Optional[pd.DataFrame]:
+        """Like fetch_ohlc, but returns None when the request failed rather than an empty frame."""
+        end = end or datetime.now(pytz.UTC)
+        if start is None:
+            start = history_start(self.interval, end)
+        elif self.interval not in EOD_INTERVALS + INTRADAY_INTERVALS:
+            raise ValueError("Invalid interval (1m, 5m, h, d, w, m)")
+
+        if self.interval in EOD_INTERVALS:
+            body = await self._request(
+                f"eod/{self.symbol}",
+                {
+                    "fmt": "csv",
+                    "period": self.interval,
+                    "from": start.strftime("%Y-%m-%d"),
+                    "to": end.strftime("%Y-%m-%d"),
+                    "order": "a",
+                },
+            )
+        else:
+            body = await self._request(
+                f"intraday/{self.symbol}",
+                {
+                    "fmt": "csv",
+                    "interval": _API_INTERVALS.get(self.interval, self.interval),
+                    "from": int(start.timestamp()),
+                    "to": int(end.timestamp()),
+                },
+            )
+
+        return None if body is None else _from_csv(body)
+
+    async def fetch_price(self) -> Optional[float]:
+        data = await self._get(f"real-time/{self.symbol}", {})
         if not data or "close" not in data:
             return None
         return data["close"]
+
+    async def fetch_quotes(self, symbols: list[str]) -> dict[str, dict]:
+        """Live quotes for several symbols in one request, keyed by the requested symbols.
+
+        EODHD answers with full codes (AAPL.US for AAPL), so a quote is matched
+        by its code, then by its ticker for symbols requested without an
+        exchange, then by position when every symbol got an answer.
+        """
+        params = {"s": ",".join(symbols[1:])} if len(symbols) > 1 else {}
+        data = await self._get(f"real-time/{symbols[0]}", params)
+        if isinstance(data, dict):
+            data = [data]
+        quotes = [q for q in data if isinstance(q, dict) and "code" in q]
+
+        by_code = {q["code"].upper(): q for q in quotes}
+        by_ticker: dict[str, dict] = {}
+        for code, q in by_code.items():
+            by_ticker.setdefault(code.rsplit(".", 1)[0], q)
+
+        matched = {}
+        for i, symbol in enumerate(symbols):
+            key = symbol.upper()
+            quote = by_code.get(key) or (by_ticker.get(key) if "." not in key else None)
+            if quote is None and len(quotes) == len(symbols):
+                quote = quotes[i]
+            if quote is not None:
+                matched[symbol] = quote
+        return matched
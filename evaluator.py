@@ -0,0 +1,108 @@
+# evaluator.py
+
+import threading
+from typing import Hashable, Mapping
+import pandas as pd
+from candle_store import time_column
+from strategy import Strategy, StrategyFactory, close_panel
+import metrics
+
+EVALUATION_SECONDS = metrics.histogram(
+    "signal_evaluation_seconds", "Time to evaluate a strategy on a series update", ("strategy", "mode")
+)
+
+
+def get_latest_signal(strategy: Strategy, data: pd.DataFrame) -> int:
+    with EVALUATION_SECONDS.time(strategy=type(strategy).__name__, mode="batch"):
+        return strategy.compute_signals(data).latest()
+
+
+def latest_signals_batch(
+    configs: Mapping[Hashable, tuple[str, dict, Mapping[Hashable, pd.DataFrame]]],
+) -> dict[Hashable, dict[Hashable, int]]:
+    """Latest signals of each {key: (strategy name, params, {series key: candles})}.
+
+    Each config is evaluated on all its series at once with
+    Strategy.generate_signals_batch, which only reads the bars its signal
+    depends on, so the cost does not depend on what was evaluated before.
+    """
+    results = {}
+    for key, (name, params, series) in configs.items():
+        strategy = StrategyFactory.create_strategy(name, **params)
+        with EVALUATION_SECONDS.time(strategy=type(strategy).__name__, mode="panel"):
+            signals = strategy.generate_signals_batch(close_panel(series, strategy.lookback))
+        results[key] = {series_key: int(signal) for series_key, signal in signals.items()}
+    return results
+
+
+class SignalEvaluator:
+    """Evaluates strategies on growing candle series using their streaming state.
+
+    For every (symbol, interval, strategy config) it keeps a strategy that has
+    consumed all closed candles up to a timestamp. Each call feeds only the
+    candles closed since then and peeks at the last, possibly still forming,
+    candle, so a tick costs O(new candles) instead of recomputing the history.
+
+    Calls may come from several compute threads; a series is evaluated by one
+    thread at a time so its streaming state is never updated concurrently.
+    """
+
+    def __init__(self):
+        self._streams: dict[tuple, tuple[Strategy, pd.Timestamp]] = {}
+        self._locks: dict[tuple[str, str], threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def _lock(self, symbol: str, interval: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault((symbol, interval), threading.Lock())
+
+    def latest_signal(self, symbol: str, interval: str, name: str, params: dict, data: pd.DataFrame) -> int:
+        with self._lock(symbol, interval):
+            return self._latest_signal(symbol, interval, name, params, data)
+
+    def _latest_signal(self, symbol: str, interval: str, name: str, params: dict, data: pd.DataFrame) -> int:
+        if len(data) < 2:
+            return get_latest_signal(StrategyFactory.create_strategy(name, **params), data)
+
+        key = (symbol, interval, name, tuple(sorted(params.items())))
+        times = data[time_column(data)]
+        closes = data["close"].to_numpy(dtype=float)
+
+        strategy, start = None, 0
+        if key in self._streams:
+            strategy, seen = self._streams[key]
+            start = int(times.searchsorted(seen, side="right"))
+            # The last consumed candle must still be in the history
+            if start == 0 or times.iloc[start - 1] != seen:
+                strategy = None
+
+        if strategy is None:
+            strategy = StrategyFactory.create_strategy(name, **params)
+            if not strategy.supports_streaming:
+                return get_latest_signal(strategy, data)
+            mode = "seed"
+        else:
+            mode = "stream"
+
+        with EVALUATION_SECONDS.time(strategy=type(strategy).__name__, mode=mode):
+            if mode == "seed":
+                strategy.seed(data.iloc[:-1])
+            else:
+                for close in closes[start:-1]:
+                    strategy.update(close)
+            self._streams[key] = (strategy, times.iloc[-2])
+            return strategy.peek(closes[-1])
+
+    def latest_signals(
+        self, symbol: str, interval: str, configs: dict[tuple, tuple[str, dict]], data: pd.DataFrame
+    ) -> dict[tuple, int]:
+        """Latest signal for each {key: (strategy name, params)} on a series."""
+        return {key: self.latest_signal(symbol, interval, name, params, data) for key, (name, params) in configs.items()}
+
+    def drop(self, symbol: str, interval: str) -> None:
+        """Forgets the streaming state of a series."""
+        with self._lock(symbol, interval):
+            for key in [k for k in list(self._streams) if k[:2] == (symbol, interval)]:
+                del self._streams[key]
+        with self._locks_lock:
+            self._locks.pop((symbol, interval), None)
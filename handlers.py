@@ -1,46 +1,101 @@
 # handlers.py
 
+import asyncio
 import logging
+import time
+import numpy as np
 import pandas as pd
+from typing import Optional
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import ContextTypes  # type: ignore
-from config import DEFAULT_SYMBOL, DEFAULT_INTERVAL
-from data_fetcher import DataFetcher
+from telegram.ext import ContextTypes, JobQueue  # type: ignore
+from datetime import datetime, timedelta, timezone
+from data_fetcher import EOD_INTERVALS, INTRADAY_INTERVALS
+from candle_store import CandleStore, time_column
+from ohlc_cache import OhlcCache
 from strategy import StrategyFactory
 from telegram_notifier import TelegramNotifier
-from backtest import simulate_trades
-from typing import Optional
+from backtest import simulate_signals, simulate_portfolio, PERIODS_PER_YEAR
+from optimize import optimize, expand_grid
+from walkforward import walk_forward
+from watchlist import Watchlist, Subscription
+from evaluator import SignalEvaluator, latest_signals_batch
+from quote_service import QuoteService
+from stream import EodhdStream, Candle
+from scheduler import CandleScheduler
+from compute import ComputePool, ComputeBusy, JobCancelled
+from state_store import open_store
+from sharding import ShardPool
+from config import STREAMING_ENABLED, SHARD_WORKERS
+import metrics
 
 # Configure a logger for debugging
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
-symbol: str = DEFAULT_SYMBOL
-interval: str = DEFAULT_INTERVAL
-current_strategy_name: str = "sma"
-strategy_params: dict = {}
-last_candle_time: Optional[pd.Timestamp] = None
+INTERVALS = INTRADAY_INTERVALS + EOD_INTERVALS
+
+# Default history for /walkforward, in days, and its result columns other than the parameters
+WALKFORWARD_DAYS = {"1m": 30, "5m": 90, "h": 365, "d": 5 * 365, "w": 10 * 365, "m": 20 * 365}
+WALKFORWARD_COLUMNS = {
+    "window", "train_start", "test_start", "test_end",
+    "train_return_pct", "test_trades", "test_win_rate_pct", "test_return_pct",
+}
+
+ANALYSE_SECONDS = metrics.histogram("analyse_series_seconds", "Time to fetch and evaluate one series", ("interval",))
+ANALYSE_BATCH_SECONDS = metrics.histogram("analyse_batch_seconds", "Time to fetch and evaluate a batch of scheduled series")
+DUPLICATE_CANDLES = metrics.counter("duplicate_candles_skipped_total", "Subscriptions skipped because the candle was already processed")
+ALERTS = metrics.counter("alerts_total", "Buy/sell alerts queued for sending", ("signal",))
+
+# Restores subscriptions and chat settings saved before the last restart
+watchlist = Watchlist(open_store())
+watchlist.load()
+ohlc_cache = OhlcCache()
+candle_store = CandleStore(cache=ohlc_cache)
+metrics.gauge("candle_store_bytes", "Memory held by in-memory candle histories", function=candle_store.nbytes)
+evaluator = SignalEvaluator()
+notifier = TelegramNotifier()
+quote_service = QuoteService()
+compute = ComputePool()
+# Scheduled analysis runs in SHARD_WORKERS processes when set
+shards = ShardPool(SHARD_WORKERS) if SHARD_WORKERS else None
+
+
+def parse_value(value: str):
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
 
-debug_mode: bool = False
+def split_args(args: list[str]) -> dict[str, str]:
+    """Splits `key=value` arguments, leaving the values as text."""
+    pairs = {}
+    for arg in args:
+        key, sep, value = arg.partition("=")
+        if not sep:
+            raise ValueError(f"Expected key=value, got {arg!r}")
+        pairs[key] = value
+    return pairs
 
 
-def interval_to_seconds(interval: str) -> int:
-    mapping = {
-        "1m": 60,
-        "5m": 300,
-        "h": 3600,
-        "d": 86400,
-        "w": 604800,
-        "m": 2592000,
-    }
-    return mapping.get(interval, 60)  # fallback to 60 seconds
+def parse_params(args: list[str]) -> dict:
+    """Parses `key=value` strategy arguments, converting numbers."""
+    return {key: parse_value(value) for key, value in split_args(args).items()}
 
 
-def get_latest_signal(strategy, data: pd.DataFrame) -> int:
-    df = strategy.generate_signals(data)
-    if "signal" not in df.columns or df.empty:
-        return 0
-    return int(df["signal"].iloc[-1])
+def parse_grid(args: list[str]) -> dict:
+    """Parses `key=v1,v2,...` parameter grid arguments."""
+    return {key: [parse_value(v) for v in values.split(",")] for key, values in split_args(args).items()}
+
+
+def schedule_jobs(job_queue: JobQueue) -> None:
+    """Keeps one candle-aligned analysis job per watched (symbol, interval)."""
+    series = set(watchlist.groups())
+    if STREAMING_ENABLED:
+        stream.sync(series)
+    scheduler.sync(job_queue, series)
 
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -48,46 +103,50 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 
 
 async def set_symbol(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    global symbol
+    settings = watchlist.settings(update.effective_chat.id)
     msg = update.effective_message
 
     if context.args:
-        symbol = context.args[0].upper()
-        await msg.reply_text(f"Symbol set to {symbol}")
+        settings.symbol = context.args[0].upper()
+        watchlist.save_settings(update.effective_chat.id)
+        await msg.reply_text(
+            f"Default symbol set to {settings.symbol}. This does not change your alerts; "
+            f"use /watch {settings.symbol} to get alerts for it."
+        )
     else:
         await msg.reply_text("Please provide a symbol.")
 
 
 async def set_interval(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    global interval
+    settings = watchlist.settings(update.effective_chat.id)
     msg = update.effective_message
 
-    if not context.args:
-        await msg.reply_text("Please provide an interval (e.g., 1m, 5m, 1h, 1d).")
+    if not context.args or context.args[0] not in INTERVALS:
+        await msg.reply_text(f"Please provide an interval ({', '.join(INTERVALS)}).")
         return
 
-    interval = context.args[0]
-
-    # Reschedule job to match new interval
-    job_queue = context.application.job_queue
-    job_queue.scheduler.remove_all_jobs()
-
-    seconds = interval_to_seconds(interval)
-    job_queue.run_repeating(analyse_market, interval=seconds, first=0)
-
-    await msg.reply_text(f"Interval set to {interval} and scheduler updated.")
+    settings.interval = context.args[0]
+    watchlist.save_settings(update.effective_chat.id)
+    await msg.reply_text(
+        f"Default interval set to {settings.interval}. This does not change your alerts; "
+        f"use /watch <symbol> {settings.interval} to get alerts on it."
+    )
 
 
 async def get_price(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    fetcher = DataFetcher(symbol, interval)
-    price = fetcher.fetch_price()
+    settings = watchlist.settings(update.effective_chat.id)
+    symbols = [a.upper() for a in context.args] or [settings.symbol.upper()]
+    quotes = await quote_service.get_quotes(symbols)
 
     msg = update.effective_message
-
-    if price is not None:
-        await msg.reply_text(f"Current price of {symbol}: {price}")
-    else:
-        await msg.reply_text("Failed to fetch data.")
+    lines = []
+    for symbol in symbols:
+        quote = quotes.get(symbol)
+        if quote and quote.get("close") not in (None, "NA"):
+            lines.append(f"Current price of {symbol}: {quote['close']}")
+        else:
+            lines.append(f"Failed to fetch price for {symbol}.")
+    await msg.reply_text("\n".join(lines))
 
 
 async def list_strategies(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -97,15 +156,15 @@ async def list_strategies(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
 
 async def set_strategy(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    global current_strategy_name, strategy_params
-
+    settings = watchlist.settings(update.effective_chat.id)
     names = StrategyFactory.list_strategies()
 
     if context.args:
         name = context.args[0].lower()
         if name in names:
-            current_strategy_name = name
-            strategy_params = {}
+            settings.strategy = name
+            settings.params = {}
+            watchlist.save_settings(update.effective_chat.id)
             await update.message.reply_text(f'Strategy set to "{name}".')
         else:
             await update.message.reply_text(f'Unknown strategy "{name}".')
@@ -124,8 +183,7 @@ async def set_strategy(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
 
 
 async def strategy_button(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    global current_strategy_name, strategy_params
-
+    settings = watchlist.settings(update.effective_chat.id)
     query = update.callback_query
     data = query.data or ""
     logger.info("Callback query received: %r", data)
@@ -137,19 +195,21 @@ async def strategy_button(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
     _, name = data.split(":", 1)
     if name in StrategyFactory.list_strategies():
-        current_strategy_name = name
-        strategy_params = {}
+        settings.strategy = name
+        settings.params = {}
+        watchlist.save_settings(update.effective_chat.id)
         await query.edit_message_text(f'Strategy set to "{name}".')
     else:
         await query.edit_message_text(f'Unknown strategy "{name}".')
 
 
 async def current_strategy(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    await update.message.reply_text(f'Current strategy: "{current_strategy_name}".')
+    settings = watchlist.settings(update.effective_chat.id)
+    await update.message.reply_text(f'Current strategy: "{settings.strategy}".')
 
 
 async def toggle_debug(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    global debug_mode
+    settings = watchlist.settings(update.effective_chat.id)
 
     if not context.args:
         await update.message.reply_text("Usage: /debug true or /debug false")
@@ -157,55 +217,257 @@ async def toggle_debug(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
 
     arg = context.args[0].lower()
     if arg == "true":
-        debug_mode = True
+        settings.debug = True
+        watchlist.save_settings(update.effective_chat.id)
         await update.message.reply_text("Debug mode enabled.")
     elif arg == "false":
-        debug_mode = False
+        settings.debug = False
+        watchlist.save_settings(update.effective_chat.id)
         await update.message.reply_text("Debug mode disabled.")
     else:
         await update.message.reply_text("Invalid option. Use true or false.")
 
 
-async def analyse_market(context: ContextTypes.DEFAULT_TYPE) -> None:
-    global last_candle_time
+async def watch(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    chat_id = update.effective_chat.id
+    settings = watchlist.settings(chat_id)
+    args = context.args or []
+
+    symbol = args[0].upper() if len(args) > 0 else settings.symbol
+    interval = args[1] if len(args) > 1 else settings.interval
+    name = args[2].lower() if len(args) > 2 else settings.strategy
+
+    if interval not in INTERVALS:
+        await update.message.reply_text(f"Invalid interval. Use one of: {', '.join(INTERVALS)}")
+        return
+
+    try:
+        params = parse_params(args[3:]) if len(args) > 3 else dict(settings.params)
+        StrategyFactory.create_strategy(name, **params)
+    except (TypeError, ValueError) as e:
+        await update.message.reply_text(f"Invalid strategy: {e}")
+        return
+
+    sub = Subscription(chat_id, symbol, interval, name, params)
+    added = watchlist.add(sub)
+    schedule_jobs(context.application.job_queue)
 
-    fetcher = DataFetcher(symbol, interval)
-    data = fetcher.fetch_ohlc()
-    if data.empty:
+    verb = "Watching" if added else "Updated"
+    await update.message.reply_text(f"{verb} {symbol} ({interval}) with {name.upper()} strategy.")
+
+
+async def unwatch(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    if not context.args:
+        await update.message.reply_text("Usage: /unwatch <symbol> [interval]")
         return
 
-    strategy = StrategyFactory.create_strategy(current_strategy_name, **strategy_params)
-    signal = get_latest_signal(strategy, data)
-    notifier = TelegramNotifier()
+    symbol = context.args[0].upper()
+    interval = context.args[1] if len(context.args) > 1 else None
+    removed = watchlist.remove(update.effective_chat.id, symbol, interval)
 
-    last_price = data["close"].iloc[-1]
-    last_time_col = "datetime" if "datetime" in data.columns else "date"
-    current_candle_time = data[last_time_col].iloc[-1]
+    for sub in removed:
+        if not watchlist.is_watched(*sub.series):
+            candle_store.drop(*sub.series)
+            evaluator.drop(*sub.series)
+            if shards is not None:
+                shards.drop(*sub.series)
+    schedule_jobs(context.application.job_queue)
 
-    # Prevent duplicate processing of same candle
-    if last_candle_time == current_candle_time:
-        if debug_mode:
-            await notifier.send_message(
-                f"[DEBUG] Skipped - already processed candle at {current_candle_time}"
+    if removed:
+        await update.message.reply_text(f"Stopped watching {symbol} ({len(removed)} subscriptions).")
+    else:
+        await update.message.reply_text(f"{symbol} is not on your watchlist.")
+
+
+async def show_watchlist(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    subs = watchlist.for_chat(update.effective_chat.id)
+    if not subs:
+        await update.message.reply_text("Your watchlist is empty. Use /watch to add a symbol.")
+        return
+
+    lines = []
+    for sub in subs:
+        params = ", ".join(f"{k}={v}" for k, v in sub.params.items())
+        lines.append(f"- {sub.symbol} ({sub.interval}) {sub.strategy.upper()}" + (f" [{params}]" if params else ""))
+    await update.message.reply_text("Watchlist:\n" + "\n".join(lines))
+
+
+async def stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Shows the bot's counters and latency histograms."""
+    lines = metrics.registry.summary()
+    uptime = int(time.time() - metrics.registry.started)
+    header = f"Uptime: {uptime // 3600}h {uptime % 3600 // 60}m, {len(watchlist)} subscriptions"
+    await update.message.reply_text("\n".join([header, *lines]) if lines else header)
+
+
+async def analyse_market(series: list[tuple[str, str]]) -> None:
+    """Analyses a batch of due series."""
+    # Streamed series are evaluated on candle close by on_stream_candle
+    groups = watchlist.groups()
+    due = [(k, groups[k]) for k in series if k in groups and not stream.covers(*k)]
+
+    if shards is None:
+        with ANALYSE_BATCH_SECONDS.time():
+            await analyse_batch(due)
+        return
+
+    results = await asyncio.gather(
+        *(analyse_series(symbol, interval, subs) for (symbol, interval), subs in due),
+        return_exceptions=True,
+    )
+    for ((symbol, interval), _), result in zip(due, results):
+        if isinstance(result, Exception):
+            logger.error("analyse_market failed for %s (%s): %r", symbol, interval, result)
+
+
+async def analyse_batch(due: list[tuple[tuple[str, str], list[Subscription]]]) -> None:
+    """Fetches the series concurrently and evaluates each strategy config on all of them at once."""
+    frames = await asyncio.gather(
+        *(candle_store.get(symbol, interval) for (symbol, interval), _ in due), return_exceptions=True
+    )
+
+    ready = []
+    for ((symbol, interval), subs), data in zip(due, frames):
+        if isinstance(data, Exception):
+            logger.error("analyse_market failed for %s (%s): %r", symbol, interval, data)
+        elif not data.empty:
+            subs = await due_subscriptions(subs, data[time_column(data)].iloc[-1])
+            if subs:
+                ready.append((symbol, interval, subs, data))
+    if not ready:
+        return
+
+    # One panel of series per interval and strategy config, evaluated in the compute pool
+    configs: dict[tuple, tuple[str, dict, dict]] = {}
+    for symbol, interval, subs, data in ready:
+        for sub in subs:
+            configs.setdefault((interval, sub.strategy_key), (sub.strategy, sub.params, {}))[2][symbol] = data
+    signals = await compute.run(latest_signals_batch, configs, wait=True)
+
+    results = await asyncio.gather(
+        *(
+            send_alerts(
+                symbol,
+                interval,
+                subs,
+                {sub.strategy_key: signals[(interval, sub.strategy_key)][symbol] for sub in subs},
+                data["close"].iloc[-1],
+                data[time_column(data)].iloc[-1],
             )
+            for symbol, interval, subs, data in ready
+        ),
+        return_exceptions=True,
+    )
+    for (symbol, interval, _, _), result in zip(ready, results):
+        if isinstance(result, Exception):
+            logger.error("analyse_market failed for %s (%s): %r", symbol, interval, result)
+
+
+async def on_stream_candle(symbol: str, interval: str, candle: Candle) -> None:
+    """Evaluates a streamed series when one of its candles closes."""
+    subs = watchlist.groups(interval).get((symbol, interval))
+    if not subs:
         return
+    try:
+        data = await candle_store.add_bars(symbol, interval, candle.to_frame())
+        await analyse_series(symbol, interval, subs, data)
+    except Exception as e:
+        logger.error("Streaming analysis failed for %s (%s): %r", symbol, interval, e)
+
+
+stream = EodhdStream(on_candle=on_stream_candle)
+scheduler = CandleScheduler(analyse_market)
+
+
+async def analyse_series(
+    symbol: str, interval: str, subs: list[Subscription], data: Optional[pd.DataFrame] = None
+) -> None:
+    """Fetches one series once (unless `data` is given) and evaluates it for every subscriber."""
+    with ANALYSE_SECONDS.time(interval=interval):
+        if shards is not None and data is None:
+            # A worker process fetches and evaluates every config; only the
+            # duplicate check and the alerts happen here
+            configs = {sub.strategy_key: (sub.strategy, sub.params) for sub in subs}
+            result = await shards.analyse(symbol, interval, configs)
+            if result is None:
+                return
+            current_candle_time, last_price, signals = result
+            due = await due_subscriptions(subs, current_candle_time)
+        else:
+            if data is None:
+                data = await candle_store.get(symbol, interval)
+            if data.empty:
+                return
+
+            last_price = data["close"].iloc[-1]
+            current_candle_time = data[time_column(data)].iloc[-1]
+            due = await due_subscriptions(subs, current_candle_time)
+            if not due:
+                return
+
+            # Strategy evaluation runs in the compute pool, once per distinct config
+            configs = {sub.strategy_key: (sub.strategy, sub.params) for sub in due}
+            signals = await compute.run(evaluator.latest_signals, symbol, interval, configs, data, wait=True)
+
+        await send_alerts(symbol, interval, due, signals, last_price, current_candle_time)
+
+
+async def due_subscriptions(subs: list[Subscription], current_candle_time: pd.Timestamp) -> list[Subscription]:
+    """Subscriptions that have not seen this candle yet, marked as having seen it."""
+    due: list[Subscription] = []
+    for sub in subs:
+        # Prevent duplicate processing of same candle
+        if sub.last_candle_time == current_candle_time:
+            DUPLICATE_CANDLES.inc()
+            if watchlist.settings(sub.chat_id).debug:
+                await notifier.send_message(
+                    f"[DEBUG] Skipped - already processed candle at {current_candle_time}",
+                    chat_id=sub.chat_id,
+                )
+            continue
+
+        # Update last seen timestamp
+        watchlist.mark_processed(sub, current_candle_time)
+        due.append(sub)
+    return due
+
+
+async def send_alerts(
+    symbol: str,
+    interval: str,
+    subs: list[Subscription],
+    signals: dict[tuple, int],
+    last_price: float,
+    current_candle_time: pd.Timestamp,
+) -> None:
+    for sub in subs:
+        signal = signals[sub.strategy_key]
+
+        if watchlist.settings(sub.chat_id).debug:
+            await notifier.send_message(
+                f"[DEBUG] analyse_market ran for {symbol} at price {last_price} (timestamp: {current_candle_time})",
+                chat_id=sub.chat_id,
+            )
 
-    # Update last seen timestamp
-    last_candle_time = current_candle_time
+        if signal:
+            ALERTS.inc(signal="buy" if signal == 1 else "sell")
 
-    if debug_mode:
-        await notifier.send_message(
-            f"[DEBUG] analyse_market ran for {symbol} at price {last_price} (timestamp: {current_candle_time})"
-        )
+        if signal == 1:
+            await notifier.send_message(
+                f"Buy signal for {symbol} ({sub.strategy.upper()}, {interval}) at {last_price} (timestamp: {current_candle_time})",
+                chat_id=sub.chat_id,
+            )
+        elif signal == -1:
+            await notifier.send_message(
+                f"Sell signal for {symbol} ({sub.strategy.upper()}, {interval}) at {last_price} (timestamp: {current_candle_time})",
+                chat_id=sub.chat_id,
+            )
 
-    if signal == 1:
-        await notifier.send_message(
-            f"Buy signal for {symbol} at {last_price} (timestamp: {current_candle_time})"
-        )
-    elif signal == -1:
-        await notifier.send_message(
-            f"Sell signal for {symbol} at {last_price} (timestamp: {current_candle_time})"
-        )
+
+def run_backtest(strategy_name: str, df: pd.DataFrame) -> tuple[pd.Series, dict]:
+    """Signal counts and simulated trades for /backtest (runs in the compute pool)."""
+    result = StrategyFactory.create_strategy(strategy_name).compute_signals(df)
+    return pd.Series(result.signal, name="signal").value_counts(), simulate_signals(result)
 
 
 async def backtest(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -219,15 +481,11 @@ async def backtest(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 
         strategy_name, symbol, interval = args[0], args[1], args[2]
 
-        strategy = StrategyFactory.create_strategy(strategy_name)
-        fetcher = DataFetcher(symbol=symbol, interval=interval)
-        df = fetcher.fetch_ohlc()
-        df = strategy.generate_signals(df)
+        StrategyFactory.create_strategy(strategy_name)
+        df = await ohlc_cache.fetch_ohlc(symbol, interval)
+        counts, stats = await compute.run(run_backtest, strategy_name, df, user=update.effective_user.id)
 
-        await update.message.reply_text(
-            f"Signal value counts:\n{df['signal'].value_counts()}"
-        )
-        stats = simulate_trades(df)
+        await update.message.reply_text(f"Signal value counts:\n{counts}")
 
         if stats["log"]:
             await update.message.reply_text(
@@ -244,5 +502,156 @@ async def backtest(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
             f"- Period: {stats['start_time']} → {stats['end_time']}"
         )
         await update.message.reply_text(msg)
+    except ComputeBusy as e:
+        await update.message.reply_text(str(e))
+    except JobCancelled:
+        await update.message.reply_text("Backtest cancelled.")
     except Exception as e:
         await update.message.reply_text(f"Backtest failed: {e}")
+
+
+async def portfolio(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    try:
+        args = context.args
+        if len(args) < 3:
+            await update.message.reply_text(
+                "Usage: /portfolio <strategy> <interval> <symbol> [symbol ...]"
+            )
+            return
+
+        strategy_name, interval = args[0].lower(), args[1]
+        symbols = list(dict.fromkeys(a.upper() for a in args[2:]))
+        strategy = StrategyFactory.create_strategy(strategy_name)
+        if interval not in INTERVALS:
+            await update.message.reply_text(f"Invalid interval. Use one of: {', '.join(INTERVALS)}")
+            return
+
+        frames = await asyncio.gather(*(ohlc_cache.fetch_ohlc(symbol, interval) for symbol in symbols))
+        stats = await compute.run(
+            simulate_portfolio,
+            strategy,
+            dict(zip(symbols, frames)),
+            periods_per_year=PERIODS_PER_YEAR[interval],
+            user=update.effective_user.id,
+        )
+
+        per_symbol = stats["per_symbol"]
+        table = per_symbol if len(per_symbol) <= 10 else pd.concat([per_symbol.head(5), per_symbol.tail(5)])
+        msg = (
+            f"Portfolio backtest of {strategy_name.upper()} on {stats['symbols']} symbols ({interval}):\n"
+            f"- Total Return: {stats['total_return_pct']}%\n"
+            f"- Max Drawdown: {stats['max_drawdown_pct']}%\n"
+            f"- Sharpe: {stats['sharpe']}\n"
+            f"- Trades: {stats['trades']}, Win Rate: {stats['win_rate_pct']}%\n"
+            f"- Period: {stats['start_time']} → {stats['end_time']}\n\n"
+            f"{table.to_string(index=False, columns=['symbol', 'trades', 'win_rate_pct', 'return_pct'])}"
+        )
+        await update.message.reply_text(msg)
+    except ComputeBusy as e:
+        await update.message.reply_text(str(e))
+    except JobCancelled:
+        await update.message.reply_text("Portfolio backtest cancelled.")
+    except Exception as e:
+        await update.message.reply_text(f"Portfolio backtest failed: {e}")
+
+
+async def optimize_strategy(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    try:
+        args = context.args
+        if len(args) < 3:
+            await update.message.reply_text(
+                "Usage: /optimize <strategy> <symbol> <interval> [param=v1,v2,...]"
+            )
+            return
+
+        strategy_name, symbol, interval = args[0].lower(), args[1].upper(), args[2]
+        grid = parse_grid(args[3:]) or None
+        combos = len(expand_grid(strategy_name, grid))
+
+        df = await ohlc_cache.fetch_ohlc(symbol, interval)
+        await update.message.reply_text(
+            f"Optimizing {strategy_name.upper()} on {symbol} ({interval}) over {combos} combinations..."
+        )
+
+        # Runs off the event loop; the sweep itself fans out to the shared process pool
+        result = await compute.run(
+            optimize,
+            strategy_name,
+            df,
+            grid,
+            user=update.effective_user.id,
+            cancellable=True,
+            pool=compute.process_pool,
+            max_workers=compute.processes,
+        )
+
+        await update.message.reply_text(
+            f"Top parameters for {symbol} using {strategy_name.upper()} strategy:\n"
+            f"{result.head(10).to_string(index=False, float_format='{:.2f}'.format)}"
+        )
+    except ComputeBusy as e:
+        await update.message.reply_text(str(e))
+    except JobCancelled:
+        await update.message.reply_text("Optimization cancelled.")
+    except Exception as e:
+        await update.message.reply_text(f"Optimization failed: {e}")
+
+
+async def walkforward(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    try:
+        args = context.args
+        if len(args) < 3:
+            await update.message.reply_text(
+                "Usage: /walkforward <strategy> <symbol> <interval> [days=N] [train=N] [test=N] [param=v1,v2,...]"
+            )
+            return
+
+        strategy_name, symbol, interval = args[0].lower(), args[1].upper(), args[2]
+        if interval not in INTERVALS:
+            await update.message.reply_text(f"Invalid interval. Use one of: {', '.join(INTERVALS)}")
+            return
+        grid = parse_grid(args[3:])
+        days = int(grid.pop("days", [WALKFORWARD_DAYS[interval]])[0])
+        train = grid.pop("train", [None])[0]
+        test = grid.pop("test", [None])[0]
+
+        # Long histories come from (and stay in) the on-disk OHLC cache
+        end = datetime.now(timezone.utc)
+        df = await ohlc_cache.fetch_ohlc(symbol, interval, start=end - timedelta(days=days), end=end)
+        train = int(train or len(df) // 4)
+        test = int(test or max(len(df) // 12, 1))
+        await update.message.reply_text(
+            f"Walk-forward testing {strategy_name.upper()} on {symbol} ({interval}): "
+            f"{len(df)} bars, training on {train} and testing on the next {test}..."
+        )
+
+        result = await compute.run(
+            walk_forward, strategy_name, df, train, test, grid or None, user=update.effective_user.id, cancellable=True
+        )
+
+        # Out-of-sample windows chained one after another
+        compounded = (np.prod(1 + result["test_return_pct"] / 100) - 1) * 100
+        params = [c for c in result.columns if c not in WALKFORWARD_COLUMNS]
+        table = result[["test_start", *params, "train_return_pct", "test_return_pct"]].tail(10)
+        await update.message.reply_text(
+            f"Walk-forward result for {symbol} using {strategy_name.upper()} strategy:\n"
+            f"- Windows: {len(result)}\n"
+            f"- Out-of-sample return: {compounded:.2f}% (in-sample avg {result['train_return_pct'].mean():.2f}% per window)\n"
+            f"- Profitable test windows: {(result['test_return_pct'] > 0).sum()}/{len(result)}\n\n"
+            f"{table.to_string(index=False, float_format='{:.2f}'.format)}"
+        )
+    except ComputeBusy as e:
+        await update.message.reply_text(str(e))
+    except JobCancelled:
+        await update.message.reply_text("Walk-forward test cancelled.")
+    except Exception as e:
+        await update.message.reply_text(f"Walk-forward test failed: {e}")
+
+
+async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Cancels the user's running /backtest, /optimize, /portfolio and /walkforward jobs."""
+    cancelled = compute.cancel(update.effective_user.id)
+    if cancelled:
+        await update.message.reply_text(f"Cancelling {cancelled} job(s).")
+    else:
+        await update.message.reply_text("You have no running jobs.")
@@ -0,0 +1,106 @@
+# market_calendar.py
+
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from functools import lru_cache
+from typing import Optional
+from zoneinfo import ZoneInfo
+import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar,
+    GoodFriday,
+    Holiday,
+    USLaborDay,
+    USMartinLutherKingJr,
+    USMemorialDay,
+    USPresidentsDay,
+    USThanksgivingDay,
+    nearest_workday,
+    sunday_to_monday,
+)
+
+
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    """Full-day NYSE closures."""
+
+    rules = [
+        # NYSE does not close on Friday Dec 31 when Jan 1 is a Saturday
+        Holiday("New Year's Day", month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday("Juneteenth", month=6, day=19, start_date="2022-01-01", observance=nearest_workday),
+        Holiday("Independence Day", month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday("Christmas", month=12, day=25, observance=nearest_workday),
+    ]
+
+
+@dataclass(frozen=True)
+class ExchangeCalendar:
+    """Weekday trading sessions of an exchange in its local time zone.
+
+    A session whose close is not after its open starts on the previous
+    evening (forex: Sunday 17:00 New York to Friday 17:00).
+    """
+
+    tz: str
+    open: time
+    close: time
+    holidays: Optional[type[AbstractHolidayCalendar]] = None
+
+    def sessions(self, start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+        """(open, close) of the sessions that may overlap [start, end)."""
+        zone = ZoneInfo(self.tz)
+        first = start.astimezone(zone).date() - timedelta(days=1)
+        last = end.astimezone(zone).date() + timedelta(days=1)
+        closed = _holidays(self.holidays, first.year, last.year)
+
+        result = []
+        for day in pd.bdate_range(first, last).date:
+            if day in closed:
+                continue
+            session_open = datetime.combine(day, self.open, zone)
+            session_close = datetime.combine(day, self.close, zone)
+            if session_close <= session_open:
+                session_open -= timedelta(days=1)
+            result.append((session_open, session_close))
+        return result
+
+    def is_trading(self, start: datetime, end: datetime) -> bool:
+        """True if the exchange was open at any time in [start, end)."""
+        return any(o < end and c > start for o, c in self.sessions(start, end))
+
+
+@lru_cache(maxsize=32)
+def _holidays(calendar: Optional[type[AbstractHolidayCalendar]], first_year: int, last_year: int) -> frozenset:
+    if calendar is None:
+        return frozenset()
+    days = calendar().holidays(f"{first_year}-01-01", f"{last_year}-12-31")
+    return frozenset(days.date)
+
+
+# Exchange suffix of EODHD tickers -> trading sessions. Crypto (.CC) trades
+# around the clock; exchanges missing here are treated as always open.
+CALENDARS = {
+    "US": ExchangeCalendar("America/New_York", time(9, 30), time(16, 0), NYSEHolidayCalendar),
+    "TO": ExchangeCalendar("America/Toronto", time(9, 30), time(16, 0)),
+    "MX": ExchangeCalendar("America/Mexico_City", time(8, 30), time(15, 0)),
+    "LSE": ExchangeCalendar("Europe/London", time(8, 0), time(16, 30)),
+    "XETRA": ExchangeCalendar("Europe/Berlin", time(9, 0), time(17, 30)),
+    "PA": ExchangeCalendar("Europe/Paris", time(9, 0), time(17, 30)),
+    "AS": ExchangeCalendar("Europe/Amsterdam", time(9, 0), time(17, 30)),
+    "FOREX": ExchangeCalendar("America/New_York", time(17, 0), time(17, 0)),
+}
+
+
+def calendar_for(symbol: str) -> Optional[ExchangeCalendar]:
+    return CALENDARS.get(symbol.upper().rpartition(".")[2])
+
+
+def is_trading(symbol: str, start: datetime, end: datetime) -> bool:
+    """True if the symbol's market was open at some point in [start, end)."""
+    calendar = calendar_for(symbol)
+    return calendar is None or calendar.is_trading(start, end)
@@ -0,0 +1,275 @@
+# ohlc_cache.py
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager, suppress
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Optional
+import pytz
+from config import OHLC_CACHE_DIR, OHLC_CACHE_MAX_MB
+from data_fetcher import AsyncDataFetcher, history_start
+import metrics
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_REQUESTS = metrics.counter("ohlc_cache_requests_total", "OHLC cache lookups by coverage", ("result",))
+
+TIME_FILE = "time.npy"
+META_FILE = "meta.json"
+LOCK_DIR = ".locks"
+
+
+def _epoch(ts: datetime) -> int:
+    return int(ts.timestamp())
+
+
+class OhlcCache:
+    """On-disk columnar OHLC cache shared across restarts.
+
+    Each (symbol, interval) series is stored in its own directory as one .npy
+    file per column (timestamps as int64 epoch nanoseconds) plus meta.json with
+    the time range already fetched. Reads memory-map the column files, and only
+    the parts of a requested range outside that coverage are downloaded. When
+    the cache grows past `max_bytes` the least recently used series are evicted.
+    Sizes and last use are tracked in memory, from one scan of the directory
+    on first use.
+
+    Several processes (one per shard) may share the directory: each write goes
+    to its own temporary directory, and replacing or deleting a series holds a
+    per-series file lock.
+    """
+
+    def __init__(self, root: str = OHLC_CACHE_DIR, max_bytes: int = OHLC_CACHE_MAX_MB * 2**20):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._locks: dict[tuple[str, str], asyncio.Lock] = {}
+        # path -> (last used, bytes) of every stored series, loaded by _index()
+        self._entries: Optional[dict[str, tuple[float, int]]] = None
+        self._total = 0
+        # write() and read() run in worker threads
+        self._index_lock = threading.RLock()
+
+    def _path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.root, symbol.replace(os.sep, "_"), interval)
+
+    @contextmanager
+    def _file_lock(self, path: str):
+        """Holds the inter-process lock of the series stored at `path` (no-op without fcntl)."""
+        if fcntl is None:
+            yield
+            return
+        name = os.path.relpath(path, self.root).replace(os.sep, "-")
+        os.makedirs(os.path.join(self.root, LOCK_DIR), exist_ok=True)
+        with open(os.path.join(self.root, LOCK_DIR, f"{name}.lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _meta(self, path: str) -> Optional[dict]:
+        try:
+            with open(os.path.join(path, META_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def read_arrays(
+        self, symbol: str, interval: str, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Optional[dict[str, np.ndarray]]:
+        """Returns read-only memory-mapped column views for a range, or None if not cached."""
+        path = self._path(symbol, interval)
+        meta = self._meta(path)
+        if meta is None:
+            return None
+
+        try:
+            times = np.load(os.path.join(path, TIME_FILE), mmap_mode="r")
+            lo = 0 if start is None else np.searchsorted(times, _epoch(start) * 10**9, side="left")
+            hi = len(times) if end is None else np.searchsorted(times, _epoch(end) * 10**9, side="right")
+            arrays = {meta["time_column"]: times[lo:hi]}
+            for col in meta["columns"]:
+                arrays[col] = np.load(os.path.join(path, f"{col}.npy"), mmap_mode="r")[lo:hi]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Discarding unreadable cache entry %s: %r", path, e)
+            with self._file_lock(path):
+                shutil.rmtree(path, ignore_errors=True)
+            self._track(path, None)
+            return None
+
+        # Touch the meta file so eviction sees this series as recently used after a restart.
+        # Another process may have replaced or evicted it meanwhile; the open maps stay valid.
+        with suppress(OSError):
+            os.utime(os.path.join(path, META_FILE))
+        with self._index_lock:
+            if self._entries is not None and path in self._entries:
+                self._entries[path] = (time.time(), self._entries[path][1])
+        return arrays
+
+    def read(
+        self, symbol: str, interval: str, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Optional[pd.DataFrame]:
+        """Returns the cached bars for a range as a DataFrame, or None if not cached."""
+        arrays = self.read_arrays(symbol, interval, start, end)
+        if arrays is None:
+            return None
+
+        time_col = next(iter(arrays))
+        df = pd.DataFrame(arrays, copy=False)
+        df[time_col] = pd.to_datetime(arrays[time_col], unit="ns", utc=True)
+        return df
+
+    def coverage(self, symbol: str, interval: str) -> Optional[tuple[int, int]]:
+        """(start, end) epoch seconds of the range already fetched for a series."""
+        meta = self._meta(self._path(symbol, interval))
+        try:
+            return (int(meta["start"]), int(meta["end"])) if meta else None
+        except (KeyError, TypeError, ValueError):
+            return None  # malformed; the series is fetched again and rewritten
+
+    def write(self, symbol: str, interval: str, df: pd.DataFrame, start: datetime, end: datetime) -> None:
+        """Replaces a series with `df`, recording [start, end] as fetched coverage."""
+        path = self._path(symbol, interval)
+        # Unique per writer, so concurrent writers never share a directory
+        tmp = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        os.makedirs(tmp)
+
+        try:
+            time_col = "datetime" if "datetime" in df.columns else "date"
+            columns = [c for c in df.columns if c != time_col and pd.api.types.is_numeric_dtype(df[c])]
+            np.save(os.path.join(tmp, TIME_FILE), pd.DatetimeIndex(df[time_col]).as_unit("ns").asi8)
+            for col in columns:
+                np.save(os.path.join(tmp, f"{col}.npy"), df[col].to_numpy())
+
+            meta = {"time_column": time_col, "columns": columns, "start": _epoch(start), "end": _epoch(end)}
+            with open(os.path.join(tmp, META_FILE), "w") as f:
+                json.dump(meta, f)
+
+            size = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp))
+
+            # Move the old directory aside and swap the new one in; open memory maps keep the old files alive
+            old = f"{tmp[:-4]}.old.tmp"
+            with self._file_lock(path):
+                try:
+                    os.rename(path, old)
+                except FileNotFoundError:
+                    pass
+                os.replace(tmp, path)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        shutil.rmtree(old, ignore_errors=True)
+        self._track(path, size)
+        self.evict(keep=path)
+
+    def _index(self) -> dict[str, tuple[float, int]]:
+        """The stored series, scanned from disk the first time it is needed."""
+        if self._entries is None:
+            self._entries = {}
+            for dirpath, _, filenames in os.walk(self.root):
+                # Directories still being written end in .tmp
+                if META_FILE in filenames and not dirpath.endswith(".tmp"):
+                    size = sum(os.path.getsize(os.path.join(dirpath, f)) for f in filenames)
+                    self._entries[dirpath] = (os.path.getmtime(os.path.join(dirpath, META_FILE)), size)
+            self._total = sum(size for _, size in self._entries.values())
+        return self._entries
+
+    def _track(self, path: str, size: Optional[int]) -> None:
+        """Records a series as just written with `size` bytes, or as deleted with None."""
+        with self._index_lock:
+            entries = self._index()
+            _, old = entries.pop(path, (0, 0))
+            self._total -= old
+            if size is not None:
+                entries[path] = (time.time(), size)
+                self._total += size
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """Deletes least recently used series (except `keep`) until the cache fits in max_bytes."""
+        with self._index_lock:
+            entries = self._index()
+            if self._total <= self.max_bytes:
+                return
+
+            for _, size, dirpath in sorted((used, size, path) for path, (used, size) in entries.items()):
+                if self._total <= self.max_bytes:
+                    break
+                if dirpath == keep:
+                    continue
+                logger.info("Evicting cached series %s (%d bytes)", dirpath, size)
+                with self._file_lock(dirpath):
+                    shutil.rmtree(dirpath, ignore_errors=True)
+                self._track(dirpath, None)
+                try:
+                    os.rmdir(os.path.dirname(dirpath))  # symbol directory, once empty
+                except OSError:
+                    pass
+
+    async def fetch_ohlc(
+        self, symbol: str, interval: str, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> pd.DataFrame:
+        """Returns bars for a range, downloading only the parts not yet on disk.
+
+        Defaults to the same history window as AsyncDataFetcher.fetch_ohlc.
+        """
+        end = end or datetime.now(pytz.UTC)
+        start = start or history_start(interval, end)
+        lock = self._locks.setdefault((symbol, interval), asyncio.Lock())
+
+        async with lock:
+            covered = await asyncio.to_thread(self.coverage, symbol, interval)
+            if covered and covered[0] <= _epoch(start) and _epoch(end) <= covered[1]:
+                CACHE_REQUESTS.inc(result="hit")
+                return await asyncio.to_thread(self.read, symbol, interval, start, end)
+            CACHE_REQUESTS.inc(result="partial" if covered else "miss")
+
+            fetcher = AsyncDataFetcher(symbol, interval)
+            cached = await asyncio.to_thread(self.read, symbol, interval) if covered else None
+
+            if cached is None or cached.empty:
+                df = await fetcher.try_fetch_ohlc(start=start, end=end)
+                if df is None:
+                    return pd.DataFrame()
+                new_start, new_end = start, end
+            else:
+                time_col = cached.columns[0]
+                parts = []
+                # Coverage only grows over ranges that were actually downloaded
+                new_start = datetime.fromtimestamp(covered[0], pytz.UTC)
+                new_end = datetime.fromtimestamp(covered[1], pytz.UTC)
+
+                if _epoch(start) < covered[0]:
+                    head = await fetcher.try_fetch_ohlc(start=start, end=cached[time_col].iloc[0].to_pydatetime())
+                    if head is not None:
+                        parts.append(head)
+                        new_start = start
+                parts.append(cached)
+                if _epoch(end) > covered[1]:
+                    # Re-fetch from the last stored bar, which may have been incomplete
+                    tail = await fetcher.try_fetch_ohlc(start=cached[time_col].iloc[-1].to_pydatetime(), end=end)
+                    if tail is not None:
+                        parts.append(tail)
+                        new_end = end
+
+                df = pd.concat([p for p in parts if not p.empty], ignore_index=True)
+                df.drop_duplicates(subset=time_col, keep="last", inplace=True)
+                df.sort_values(time_col, inplace=True, kind="stable")
+                df.reset_index(drop=True, inplace=True)
+
+            if df.empty:
+                return df
+
+            await asyncio.to_thread(self.write, symbol, interval, df, new_start, new_end)
+            return await asyncio.to_thread(self.read, symbol, interval, start, end)
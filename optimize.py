@@ -0,0 +1,151 @@
+# optimize.py
+
+import itertools
+import logging
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional
+import numpy as np
+import pandas as pd
+from config import OPTIMIZE_MAX_WORKERS
+from strategy import StrategyFactory
+from backtest import simulate_signals
+from compute import JobCancelled
+
+logger = logging.getLogger(__name__)
+
+# Default parameter grids swept by /optimize
+PARAM_GRIDS = {
+    "sma": {"short_window": [5, 10, 20, 30, 50], "long_window": [50, 100, 150, 200]},
+    "ema": {"short_span": [5, 8, 12, 20], "long_span": [26, 50, 100, 200]},
+    "rsi": {"period": [7, 14, 21], "overbought": [65, 70, 75, 80], "oversold": [20, 25, 30, 35]},
+    "macd": {"fast": [8, 12, 16], "slow": [21, 26, 34], "signal": [5, 9, 12]},
+    "bbands": {"length": [10, 20, 30, 50], "std": [1.5, 2.0, 2.5, 3.0]},
+}
+
+# Combinations that make no sense for a strategy are skipped
+CONSTRAINTS = {
+    "sma": lambda p: p["short_window"] < p["long_window"],
+    "ema": lambda p: p["short_span"] < p["long_span"],
+    "rsi": lambda p: p["oversold"] < p["overbought"],
+    "macd": lambda p: p["fast"] < p["slow"],
+}
+
+# Tasks per worker, so each process gets several chunks to balance load
+CHUNKS_PER_WORKER = 4
+
+_shm: Optional[SharedMemory] = None
+_close: Optional[np.ndarray] = None
+
+
+def expand_grid(strategy_name: str, grid: Optional[dict] = None) -> list[dict]:
+    """All valid parameter combinations of a grid (default: PARAM_GRIDS)."""
+    grid = grid or PARAM_GRIDS.get(strategy_name, {})
+    keys = list(grid)
+    combos = [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+    constraint = CONSTRAINTS.get(strategy_name)
+    if constraint is not None:
+        combos = [p for p in combos if _satisfies(constraint, p)]
+    return combos
+
+
+def _satisfies(constraint, params: dict) -> bool:
+    try:
+        return constraint(params)
+    except KeyError:  # grid doesn't sweep a constrained parameter
+        return True
+
+
+def _attach(shm_name: str, length: int, dtype: str) -> np.ndarray:
+    """Maps a sweep's close prices, keeping the latest block mapped between tasks."""
+    global _shm, _close
+
+    if _shm is None or _shm.name != shm_name.lstrip("/"):
+        if _shm is not None:
+            _close = None
+            _shm.close()
+        # Workers share the parent's resource tracker, which unlinks the block once
+        _shm = SharedMemory(name=shm_name)
+        _close = np.ndarray((length,), dtype=dtype, buffer=_shm.buf)
+    return _close
+
+
+def _evaluate(shm_name: str, length: int, dtype: str, strategy_name: str, param_sets: list[dict], fee: float) -> list[dict]:
+    """Backtests each parameter set on the shared close prices."""
+    df = pd.DataFrame({"close": _attach(shm_name, length, dtype)}, copy=False)
+    rows = []
+    for params in param_sets:
+        strategy = StrategyFactory.create_strategy(strategy_name, **params)
+        stats = simulate_signals(strategy.compute_signals(df), fee=fee)
+        rows.append(
+            {
+                **params,
+                "trades": stats["trades"],
+                "win_rate_pct": stats["win_rate_pct"],
+                "total_return_pct": stats["total_return_pct"],
+            }
+        )
+    return rows
+
+
+def optimize(
+    strategy_name: str,
+    df: pd.DataFrame,
+    grid: Optional[dict] = None,
+    fee: float = 0.001,
+    max_workers: Optional[int] = OPTIMIZE_MAX_WORKERS,
+    pool: Optional[Executor] = None,
+    cancel: Optional[threading.Event] = None,
+) -> pd.DataFrame:
+    """Backtests every combination of a parameter grid across a process pool.
+
+    The close prices are copied once into shared memory that all workers map,
+    instead of being pickled per task. Runs on `pool` (e.g. the shared
+    ComputePool.process_pool, with `max_workers` set to its size) or on a pool
+    of `max_workers` processes started for this call. Once `cancel` is set,
+    chunks that have not started are dropped and JobCancelled is raised.
+    Returns one row per combination ranked by total return, then win rate.
+    This call blocks; run it in an executor from async code.
+    """
+    combos = expand_grid(strategy_name, grid)
+    if not combos:
+        raise ValueError(f"No parameter grid for strategy: {strategy_name}")
+
+    own_pool = pool is None
+    workers = max_workers or os.cpu_count() or 1
+    close = np.ascontiguousarray(df["close"].dropna().to_numpy(dtype=np.float64))
+    shm = SharedMemory(create=True, size=max(close.nbytes, 1))
+    if own_pool:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    futures = []
+    try:
+        np.ndarray(close.shape, dtype=close.dtype, buffer=shm.buf)[:] = close
+
+        n_chunks = min(len(combos), workers * CHUNKS_PER_WORKER)
+        chunks = [combos[i::n_chunks] for i in range(n_chunks)]
+        args = (shm.name, len(close), close.dtype.str, strategy_name)
+        futures = [pool.submit(_evaluate, *args, chunk, fee) for chunk in chunks]
+
+        pending = set(futures)
+        while pending:
+            if cancel is not None and cancel.is_set():
+                raise JobCancelled(f"Optimization of {strategy_name} was cancelled")
+            _, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+        rows = [row for f in futures for row in f.result()]
+    finally:
+        for f in futures:
+            f.cancel()
+        if own_pool:
+            pool.shutdown(cancel_futures=True)
+        else:
+            # Chunks already running still read the block; let them finish first
+            wait(futures)
+        shm.close()
+        shm.unlink()
+
+    logger.info("Optimized %s over %d combinations", strategy_name, len(rows))
+    result = pd.DataFrame(rows)
+    result.sort_values(["total_return_pct", "win_rate_pct"], ascending=False, inplace=True)
+    return result.reset_index(drop=True)
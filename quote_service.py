@@ -0,0 +1,102 @@
+# quote_service.py
+
+import asyncio
+import logging
+import time
+from typing import Optional
+from config import QUOTE_TTL, QUOTE_BATCH_SIZE, QUOTE_BATCH_DELAY
+from data_fetcher import AsyncDataFetcher
+import metrics
+
+logger = logging.getLogger(__name__)
+
+QUOTE_REQUESTS = metrics.counter("quote_requests_total", "Live quote lookups by how they were served", ("result",))
+
+
+class QuoteService:
+    """Live quotes for many symbols with batching, single-flight and a TTL cache.
+
+    Symbols requested within `batch_delay` of each other are fetched together
+    in multi-ticker real-time requests of up to `batch_size` symbols, concurrent
+    requests for the same symbol share one fetch, and quotes are reused for
+    `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float = QUOTE_TTL, batch_size: int = QUOTE_BATCH_SIZE, batch_delay: float = QUOTE_BATCH_DELAY):
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self._cache: dict[str, tuple[float, Optional[dict]]] = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._queued: list[str] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def get_quotes(self, symbols: list[str]) -> dict[str, Optional[dict]]:
+        """Quotes keyed by symbol; None for symbols EODHD returned nothing for."""
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        quotes: dict[str, Optional[dict]] = {}
+        waiting: dict[str, asyncio.Future] = {}
+
+        for symbol in dict.fromkeys(s.upper() for s in symbols):
+            cached = self._cache.get(symbol)
+            if cached is not None and now - cached[0] < self.ttl:
+                quotes[symbol] = cached[1]
+                QUOTE_REQUESTS.inc(result="cached")
+                continue
+
+            if symbol in self._inflight:
+                QUOTE_REQUESTS.inc(result="shared")
+            else:
+                QUOTE_REQUESTS.inc(result="fetched")
+                self._inflight[symbol] = loop.create_future()
+                self._queued.append(symbol)
+            waiting[symbol] = self._inflight[symbol]
+
+        if len(self._queued) >= self.batch_size:
+            self._flush()
+        elif self._queued and self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_delay, self._flush)
+
+        for symbol, future in waiting.items():
+            quotes[symbol] = await asyncio.shield(future)
+        return quotes
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        queued, self._queued = self._queued, []
+        for i in range(0, len(queued), self.batch_size):
+            task = asyncio.create_task(self._fetch(queued[i : i + self.batch_size]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, symbols: list[str]) -> None:
+        futures = {symbol: self._inflight[symbol] for symbol in symbols}
+        try:
+            try:
+                quotes = await AsyncDataFetcher().fetch_quotes(symbols)
+            except Exception as e:
+                logger.warning("Quote batch %s failed: %r", symbols, e)
+                quotes = {}
+
+            now = time.monotonic()
+            for symbol, future in futures.items():
+                quote = quotes.get(symbol)
+                if quote is not None:
+                    self._cache[symbol] = (now, quote)
+                if not future.done():
+                    future.set_result(quote)
+        finally:
+            # A cancelled batch (e.g. at shutdown) cancels its waiters rather than leaving them pending
+            for symbol, future in futures.items():
+                if self._inflight.get(symbol) is future:
+                    del self._inflight[symbol]
+                future.cancel()
+
+        # Keep the cache from growing without bound
+        for symbol in [s for s, (t, _) in self._cache.items() if now - t >= self.ttl]:
+            del self._cache[symbol]
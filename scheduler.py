@@ -0,0 +1,131 @@
+# scheduler.py
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Iterable, Optional
+from telegram.ext import ContextTypes, JobQueue  # type: ignore
+from config import SCHEDULE_SETTLE, SCHEDULE_BATCH_SIZE, SCHEDULE_BATCH_WINDOW
+from market_calendar import is_trading
+import metrics
+
+logger = logging.getLogger(__name__)
+
+Series = tuple[str, str]
+
+JOB_PREFIX = "analyse_market:"
+
+JOB_LAG = metrics.histogram("job_lag_seconds", "Delay of scheduled runs past their due time", ("interval",))
+RUNS = metrics.counter("scheduled_runs_total", "Scheduled analysis runs by outcome", ("interval", "result"))
+
+# Candle lengths of the fixed-size intervals; "w" and "m" follow the calendar
+FIXED_INTERVALS = {"1m": 60, "5m": 300, "h": 3600, "d": 86400}
+
+
+def candle_start(interval: str, t: datetime) -> datetime:
+    """Open time (UTC) of the candle of `interval` that contains `t`."""
+    t = t.astimezone(timezone.utc)
+    if interval in FIXED_INTERVALS:
+        seconds = FIXED_INTERVALS[interval]
+        epoch = int(t.timestamp())
+        return datetime.fromtimestamp(epoch - epoch % seconds, timezone.utc)
+
+    midnight = t.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "w":
+        return midnight - timedelta(days=midnight.weekday())
+    if interval == "m":
+        return midnight.replace(day=1)
+    raise ValueError(f"Unsupported interval: {interval}")
+
+
+def next_boundary(interval: str, t: datetime) -> datetime:
+    """Close time (UTC) of the candle of `interval` that contains `t`."""
+    start = candle_start(interval, t)
+    if interval == "m":
+        return (start + timedelta(days=32)).replace(day=1)
+    if interval == "w":
+        return start + timedelta(days=7)
+    return start + timedelta(seconds=FIXED_INTERVALS[interval])
+
+
+class CandleScheduler:
+    """Runs the analysis of each watched series right after its candles close.
+
+    Every (symbol, interval) has its own one-shot job, aligned to the next
+    candle boundary plus `settle` seconds for the provider to publish the
+    bar, that re-arms itself for the following boundary. Runs for candles in
+    which the symbol's market was closed (weekends, holidays, outside
+    trading hours) are skipped. Series coming due within `batch_window`
+    seconds of each other are handed to `analyse` together, in batches of
+    at most `batch_size`.
+    """
+
+    def __init__(
+        self,
+        analyse: Callable[[list[Series]], Awaitable[None]],
+        settle: float = SCHEDULE_SETTLE,
+        batch_size: int = SCHEDULE_BATCH_SIZE,
+        batch_window: float = SCHEDULE_BATCH_WINDOW,
+    ):
+        self.analyse = analyse
+        self.settle = settle
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self._due: list[Series] = []
+        self._drain: Optional[asyncio.Task] = None
+
+    def sync(self, job_queue: JobQueue, series: Iterable[Series]) -> None:
+        """Keeps exactly one job per given series, leaving existing ones untouched."""
+        wanted = set(series)
+        scheduled = set()
+
+        for job in job_queue.jobs():
+            if not job.name.startswith(JOB_PREFIX):
+                continue
+            if job.data in wanted:
+                scheduled.add(job.data)
+            else:
+                job.schedule_removal()
+
+        for s in wanted - scheduled:
+            self._schedule(job_queue, s, datetime.now(timezone.utc))
+
+    def next_run(self, interval: str, now: datetime) -> datetime:
+        return next_boundary(interval, now) + timedelta(seconds=self.settle)
+
+    def _schedule(self, job_queue: JobQueue, series: Series, now: datetime) -> None:
+        symbol, interval = series
+        job_queue.run_once(
+            self._run,
+            when=self.next_run(interval, now),
+            name=f"{JOB_PREFIX}{symbol}:{interval}",
+            data=series,
+        )
+
+    async def _run(self, context: ContextTypes.DEFAULT_TYPE) -> None:
+        symbol, interval = series = context.job.data
+        now = datetime.now(timezone.utc)
+        # One second of slack in case the job fires a little early
+        end = candle_start(interval, now - timedelta(seconds=self.settle - 1))
+        self._schedule(context.job_queue, series, end)
+        JOB_LAG.observe(max((now - end).total_seconds() - self.settle, 0.0), interval=interval)
+
+        start = candle_start(interval, end - timedelta(microseconds=1))
+        if not is_trading(symbol, start, end):
+            RUNS.inc(interval=interval, result="market_closed")
+            logger.debug("Skipping %s (%s): market closed from %s to %s", symbol, interval, start, end)
+            return
+
+        RUNS.inc(interval=interval, result="run")
+        self._due.append(series)
+        if self._drain is None or self._drain.done():
+            self._drain = asyncio.create_task(self._run_due())
+
+    async def _run_due(self) -> None:
+        await asyncio.sleep(self.batch_window)
+        due, self._due = self._due, []
+        for i in range(0, len(due), self.batch_size):
+            try:
+                await self.analyse(due[i : i + self.batch_size])
+            except Exception as e:
+                logger.error("Scheduled analysis failed for %s: %r", due[i : i + self.batch_size], e)
@@ -0,0 +1,275 @@
+# benchmark.py
+#
+# Reproducible benchmarks on synthetic OHLC data (fixed seed, no network):
+#
+#   python scripts/benchmark.py                        # all suites, 1k to 1M bars
+#   python scripts/benchmark.py --sizes 1000,100000 --suite strategies
+#   python scripts/benchmark.py --save baseline.json
+#   python scripts/benchmark.py --compare baseline.json --threshold 1.2
+#   python scripts/benchmark.py --suite parse --sizes 20000 --memory
+#
+# --compare exits with status 1 if any benchmark got slower than
+# `threshold` times its baseline median, so it can gate a CI job.
+# --memory adds the peak memory traced during one extra run of each benchmark.
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# The benchmark's subscriptions must not mix with the bot's saved state
+os.environ.setdefault("STATE_BACKEND", "memory")
+
+from strategy import StrategyFactory  # noqa: E402
+from strategy import indicators  # noqa: E402
+from strategy.indicator_cache import indicator_cache  # noqa: E402
+from backtest import simulate_trades, simulate_portfolio  # noqa: E402
+import data_fetcher  # noqa: E402
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def synthetic_ohlc(n: int, seed: int = 42, start: str = "2000-01-03", freq: str = "min") -> pd.DataFrame:
+    """Geometric random walk shaped like AsyncDataFetcher's intraday frames."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    spread = np.abs(rng.normal(0, 0.0005, n)) * close
+    return pd.DataFrame(
+        {
+            "datetime": pd.date_range(start, periods=n, freq=freq, tz="UTC"),
+            "open": open_,
+            "high": np.maximum(open_, close) + spread,
+            "low": np.minimum(open_, close) - spread,
+            "close": close,
+            "volume": rng.integers(100, 10_000, n).astype(float),
+        }
+    )
+
+
+def synthetic_response(n: int, fmt: str = "json") -> bytes:
+    """Body of an EODHD intraday response with n bars, as JSON or CSV."""
+    df = synthetic_ohlc(n, start="2024-01-02")
+    rows = zip(
+        df["datetime"].array.as_unit("s").asi8.tolist(),
+        df["datetime"].dt.strftime("%Y-%m-%d %H:%M:%S").tolist(),
+        *(df[col].round(4).tolist() for col in ("open", "high", "low", "close")),
+        df["volume"].astype(int).tolist(),
+    )
+    if fmt == "csv":
+        lines = ["Timestamp,Gmtoffset,Datetime,Open,High,Low,Close,Volume"]
+        lines += [f"{t},0,{dt},{o},{h},{l},{c},{v}" for t, dt, o, h, l, c, v in rows]
+        return ("\n".join(lines) + "\n").encode()
+    keys = ("timestamp", "datetime", "open", "high", "low", "close", "volume")
+    return json.dumps([{"gmtoffset": 0, **dict(zip(keys, row))} for row in rows]).encode()
+
+
+def measure(fn: Callable[[], object], min_time: float = 0.2, min_repeat: int = 3, max_repeat: int = 50) -> list[float]:
+    """Runs `fn` at least `min_repeat` times and until `min_time` seconds were spent."""
+    times: list[float] = []
+    while len(times) < min_repeat or (sum(times) < min_time and len(times) < max_repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def peak_memory(fn: Callable[[], object]) -> int:
+    """Peak bytes allocated during one run of `fn`, as traced by tracemalloc."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_strategies(sizes: list[int]):
+    for n in sizes:
+        df = synthetic_ohlc(n)
+        for name in StrategyFactory.list_strategies():
+            strategy = StrategyFactory.create_strategy(name)
+
+            def run():
+                # Measure the computation, not indicator cache hits
+                indicator_cache.clear()
+                strategy.generate_signals(df)
+
+            yield f"generate_signals[{name}]", n, run
+
+
+def bench_indicators(sizes: list[int], symbols: int = 100, max_cells: int = 10_000_000):
+    """The indicator kernels on one series and on `symbols` series at once."""
+    kernels = {
+        "sma": lambda close: indicators.sma(close, 50),
+        "ema": lambda close: indicators.ema(close, 26),
+        "rsi": lambda close: indicators.rsi(close, 14),
+        "macd": lambda close: indicators.macd(close, 12, 26, 9),
+        "bbands": lambda close: indicators.bbands(close, 20, 2),
+    }
+    for n in sizes:
+        close = synthetic_ohlc(n)["close"].to_numpy()
+        panel = None
+        if n * symbols <= max_cells:
+            panel = np.column_stack([synthetic_ohlc(n, seed=i)["close"].to_numpy() for i in range(symbols)])
+        for name, kernel in kernels.items():
+            yield f"indicators.{name}", n, lambda: kernel(close)
+            if panel is not None:
+                yield f"indicators.{name}[x {symbols}]", n, lambda: kernel(panel)
+
+
+def bench_backtest(sizes: list[int]):
+    for n in sizes:
+        signals = StrategyFactory.create_strategy("sma").generate_signals(synthetic_ohlc(n))
+        yield "simulate_trades", n, lambda: simulate_trades(signals)
+
+
+def bench_portfolio(sizes: list[int], symbols: int = 500, max_cells: int = 10_000_000):
+    """simulate_portfolio over `symbols` daily series of n bars (up to `max_cells` prices)."""
+    for n in sizes:
+        if n * symbols > max_cells:
+            continue
+        frames = {f"SYM{i}.US": synthetic_ohlc(n, seed=i, freq="D") for i in range(symbols)}
+        for name in StrategyFactory.list_strategies():
+            strategy = StrategyFactory.create_strategy(name)
+            yield f"simulate_portfolio[{name} x {symbols}]", n, lambda: simulate_portfolio(strategy, frames)
+
+
+def bench_factory(sizes: list[int]):
+    names = StrategyFactory.list_strategies()
+
+    def run():
+        for _ in range(1000):
+            for name in names:
+                StrategyFactory.create_strategy(name)
+
+    yield f"create_strategy x{1000 * len(names)}", 0, run
+
+
+def bench_analyse_market(sizes: list[int], symbols: int = 50, subscribers: int = 3):
+    """One analyse_market cycle over `symbols` series with a fake data source and notifier.
+
+    Every cycle shifts each series by one new bar, as a candle close would.
+    """
+    import handlers
+    from watchlist import Subscription
+
+    class FakeNotifier:
+        def __init__(self):
+            self.sent = 0
+
+        async def send_message(self, message, chat_id=None):
+            self.sent += 1
+
+    history = min(max(sizes), 5_000)
+    cycles = 1_000
+    source = {f"SYM{i}.US": synthetic_ohlc(history + cycles, seed=i) for i in range(symbols)}
+    cycle = {"n": 0}
+
+    async def fake_get(symbol, interval):
+        k = cycle["n"] % cycles
+        return source[symbol].iloc[k : k + history]
+
+    handlers.candle_store.get = fake_get
+    handlers.notifier = FakeNotifier()
+    strategies = StrategyFactory.list_strategies()
+    for i, symbol in enumerate(source):
+        for chat_id in range(subscribers):
+            handlers.watchlist.add(Subscription(chat_id, symbol, "1m", strategies[(i + chat_id) % len(strategies)]))
+    series = list(handlers.watchlist.groups())
+
+    loop = asyncio.new_event_loop()
+
+    def run():
+        cycle["n"] += 1
+        loop.run_until_complete(handlers.analyse_market(series))
+
+    yield f"analyse_market[{symbols} symbols x {subscribers} subs]", history, run
+
+
+def bench_parse(sizes: list[int], max_bars: int = 100_000):
+    """Parsing an intraday OHLC response of n bars: JSON into records, then a frame, or CSV into columns."""
+    for n in sizes:
+        if n > max_bars:
+            continue
+        body, csv = synthetic_response(n), synthetic_response(n, "csv")
+        yield "parse[json]", n, lambda: data_fetcher._to_dataframe(json.loads(body))
+        if data_fetcher.orjson is not None:
+            yield "parse[orjson]", n, lambda: data_fetcher._to_dataframe(data_fetcher.orjson.loads(body))
+        yield "parse[csv]", n, lambda: data_fetcher._from_csv(csv)
+
+
+SUITES = {
+    "strategies": bench_strategies,
+    "indicators": bench_indicators,
+    "backtest": bench_backtest,
+    "portfolio": bench_portfolio,
+    "factory": bench_factory,
+    "analyse_market": bench_analyse_market,
+    "parse": bench_parse,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma separated bar counts")
+    parser.add_argument("--suite", action="append", choices=list(SUITES), help="run only these suites")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds to spend per benchmark")
+    parser.add_argument("--save", help="write results to a JSON file")
+    parser.add_argument("--compare", help="compare against a JSON file written by --save")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio that counts as a regression")
+    parser.add_argument("--memory", action="store_true", help="also report each benchmark's peak traced memory")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    print(
+        f"{'benchmark':<48} {'bars':>9} {'runs':>5} {'min ms':>10} {'median ms':>10} {'vs base':>8}"
+        + (f" {'peak MB':>8}" if args.memory else "")
+    )
+    for suite in args.suite or list(SUITES):
+        for name, n, fn in SUITES[suite](sizes):
+            times = measure(fn, args.min_time)
+            key = f"{name}@{n}"
+            median = statistics.median(times)
+            results[key] = {"min": min(times), "median": median, "runs": len(times)}
+
+            ratio = ""
+            if key in baseline:
+                r = median / baseline[key]["median"]
+                ratio = f"{r:.2f}x"
+                if r > args.threshold:
+                    regressions.append((key, r))
+            peak = ""
+            if args.memory:
+                results[key]["peak_bytes"] = peak_memory(fn)
+                peak = f" {results[key]['peak_bytes'] / 2**20:>8.1f}"
+            print(f"{name:<48} {n:>9} {len(times):>5} {min(times) * 1e3:>10.2f} {median * 1e3:>10.2f} {ratio:>8}{peak}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if regressions:
+        for key, r in regressions:
+            print(f"REGRESSION {key}: {r:.2f}x slower than baseline")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# ws_stub_server.py
+#
+# Local stand-in for EODHD's real-time WebSocket feeds, for trying the
+# streaming mode without an API key or market hours:
+#
+#   python scripts/ws_stub_server.py --port 8765 --rate 20
+#   EODHD_WS_URL=ws://localhost:8765/ws STREAMING_ENABLED=true python bot.py
+#
+# Every subscribed symbol gets random-walk ticks in the message format of the
+# feed it was subscribed on (us, crypto or forex). Tests build the app with
+# make_app(script=[...]) to replay fixed messages instead.
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Optional
+from aiohttp import web
+
+
+RATE = web.AppKey("rate", float)
+SCRIPT = web.AppKey("script", object)
+
+
+def tick(feed: str, code: str, price: float) -> dict:
+    ms = int(time.time() * 1000)
+    if feed == "forex":
+        spread = price * 0.0001
+        return {"s": code, "a": round(price + spread, 5), "b": round(price - spread, 5), "dc": "0", "dd": "0", "ppms": False, "t": ms}
+    if feed == "crypto":
+        return {"s": code, "p": str(round(price, 4)), "q": str(round(random.random(), 4)), "dc": "0", "dd": "0", "t": ms}
+    return {"s": code, "p": round(price, 2), "c": [12], "v": random.randint(1, 500), "dp": False, "ms": ms, "t": ms}
+
+
+async def send_ticks(ws: web.WebSocketResponse, feed: str, prices: dict[str, float], rate: float) -> None:
+    """Random-walk ticks for the subscribed codes until the socket closes."""
+    while not ws.closed:
+        for code in list(prices):
+            prices[code] *= 1 + random.gauss(0, 0.0005)
+            await ws.send_json(tick(feed, code, prices[code]))
+        await asyncio.sleep(1 / rate)
+
+
+def parse_request(data) -> Optional[tuple[Optional[str], list[str]]]:
+    """(action, codes) of a subscribe/unsubscribe message; None for anything else."""
+    try:
+        payload = json.loads(data)
+        return payload.get("action"), [c for c in payload["symbols"].split(",") if c]
+    except (ValueError, KeyError, AttributeError):
+        return None
+
+
+def update_prices(prices: dict[str, float], action: Optional[str], codes: list[str]) -> None:
+    for code in codes:
+        if action == "subscribe":
+            prices.setdefault(code, random.uniform(10, 500))
+        else:
+            prices.pop(code, None)
+
+
+async def feed_handler(request: web.Request) -> web.WebSocketResponse:
+    feed = request.match_info["feed"]
+    script = request.app[SCRIPT]
+    ws = web.WebSocketResponse(heartbeat=30)
+    await ws.prepare(request)
+    await ws.send_json({"status_code": 200, "message": "Authorized"})
+
+    prices: dict[str, float] = {}
+    sender = asyncio.create_task(send_ticks(ws, feed, prices, request.app[RATE])) if script is None else None
+    try:
+        async for msg in ws:
+            parsed = parse_request(msg.data)
+            if parsed is None:
+                continue
+            action, codes = parsed
+            update_prices(prices, action, codes)
+            print(f"{feed}: {action} {codes}")
+            if script is not None and action == "subscribe":
+                for message in script:
+                    await ws.send_json(message)
+                script = None
+    finally:
+        if sender is not None:
+            sender.cancel()
+    return ws
+
+
+def make_app(rate: float = 10, script: Optional[list[dict]] = None) -> web.Application:
+    """The stub server. With `script`, each connection gets those messages
+    after its first subscribe instead of random ticks."""
+    app = web.Application()
+    app[RATE] = rate
+    app[SCRIPT] = script
+    app.router.add_get("/ws/{feed}", feed_handler)
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=float, default=10, help="ticks per second per symbol")
+    args = parser.parse_args()
+
+    web.run_app(make_app(args.rate), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
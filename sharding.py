@@ -0,0 +1,188 @@
+# sharding.py
+
+import asyncio
+import bisect
+import hashlib
+import itertools
+import logging
+import multiprocessing as mp
+import threading
+from typing import Any, Optional
+from config import SHARD_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# Virtual nodes per worker on the hash ring
+REPLICAS = 64
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hashing of symbols onto workers.
+
+    Each worker owns REPLICAS points on the ring and a symbol belongs to the
+    first point after its hash, so changing the worker count only moves the
+    symbols of the added or removed workers.
+    """
+
+    def __init__(self, nodes: int, replicas: int = REPLICAS):
+        points = sorted((_hash(f"{node}:{i}"), node) for node in range(nodes) for i in range(replicas))
+        self._hashes = [h for h, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node(self, symbol: str) -> int:
+        i = bisect.bisect(self._hashes, _hash(symbol)) % len(self._hashes)
+        return self._nodes[i]
+
+
+def _worker_main(inbox: mp.Queue, outbox: mp.Queue) -> None:
+    asyncio.run(_worker_loop(inbox, outbox))
+
+
+async def _worker_loop(inbox: mp.Queue, outbox: mp.Queue) -> None:
+    """Fetches and evaluates the series it is sent, keeping their candles and
+    streaming strategy state between runs."""
+    # Imported in the worker only; the front-end never needs its own copies
+    from candle_store import CandleStore, time_column
+    from data_fetcher import close_session
+    from evaluator import SignalEvaluator
+    from ohlc_cache import OhlcCache
+
+    candle_store = CandleStore(cache=OhlcCache())
+    evaluator = SignalEvaluator()
+    loop = asyncio.get_running_loop()
+    tasks: set[asyncio.Task] = set()
+
+    async def analyse(request_id: int, symbol: str, interval: str, configs: dict) -> None:
+        try:
+            data = await candle_store.get(symbol, interval)
+            if data.empty:
+                result = None
+            else:
+                signals = await asyncio.to_thread(evaluator.latest_signals, symbol, interval, configs, data)
+                result = (data[time_column(data)].iloc[-1], data["close"].iloc[-1], signals)
+            outbox.put((request_id, result, None))
+        except Exception as e:
+            outbox.put((request_id, None, repr(e)))
+
+    while True:
+        message = await loop.run_in_executor(None, inbox.get)
+        if message is None:
+            break
+        kind, *args = message
+        if kind == "analyse":
+            task = asyncio.create_task(analyse(*args))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        elif kind == "drop":
+            candle_store.drop(*args)
+            evaluator.drop(*args)
+
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await close_session()
+
+
+class ShardPool:
+    """Spreads series evaluation over worker processes, sharded by symbol.
+
+    The front-end process keeps the Telegram updates, the watchlist, the
+    duplicate-candle check and the notifier. Each worker fetches the series
+    it owns into its own CandleStore and evaluates every strategy config
+    sent with them, so a symbol's candles and streaming state stay in one
+    process. Results come back on a single queue.
+    """
+
+    def __init__(self, workers: int, timeout: float = SHARD_TIMEOUT):
+        self.workers = workers
+        self.timeout = timeout
+        self.ring = HashRing(workers)
+        # spawn, since the front-end already runs threads (compute pool, HTTP clients)
+        self._ctx = mp.get_context("spawn")
+        self._inboxes: list[mp.Queue] = []
+        self._processes: list[Optional[mp.Process]] = []
+        self._outbox: Optional[mp.Queue] = None
+        self._reader: Optional[threading.Thread] = None
+        self._pending: dict[int, asyncio.Future] = {}
+        self._ids = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self) -> None:
+        if self._outbox is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        outbox = self._ctx.Queue()
+        self._inboxes = [self._ctx.Queue() for _ in range(self.workers)]
+        self._processes = [None] * self.workers
+        for i in range(self.workers):
+            self._spawn(i, outbox)
+        self._outbox = outbox
+        self._reader = threading.Thread(target=self._read_results, name="shard-results", daemon=True)
+        self._reader.start()
+        logger.info("Started %d analysis workers", self.workers)
+
+    def _spawn(self, i: int, outbox: mp.Queue) -> None:
+        process = self._ctx.Process(target=_worker_main, args=(self._inboxes[i], outbox), name=f"shard-{i}", daemon=True)
+        process.start()
+        self._processes[i] = process
+
+    def _read_results(self) -> None:
+        while True:
+            try:
+                message = self._outbox.get()
+            except (EOFError, OSError, ValueError):
+                return
+            if message is None:
+                return
+            self._loop.call_soon_threadsafe(self._resolve, *message)
+
+    def _resolve(self, request_id: int, result: Any, error: Optional[str]) -> None:
+        future = self._pending.pop(request_id, None)
+        if future is None or future.done():
+            return
+        if error is not None:
+            future.set_exception(RuntimeError(error))
+        else:
+            future.set_result(result)
+
+    def _inbox(self, symbol: str) -> mp.Queue:
+        i = self.ring.node(symbol)
+        if not self._processes[i].is_alive():
+            logger.warning("Analysis worker %d exited (%s); restarting it", i, self._processes[i].exitcode)
+            self._spawn(i, self._outbox)
+        return self._inboxes[i]
+
+    async def analyse(self, symbol: str, interval: str, configs: dict[tuple, tuple[str, dict]]) -> Optional[tuple]:
+        """(last candle time, last close, {strategy key: signal}) for a series, or None if it has no data."""
+        self.start()
+        request_id = next(self._ids)
+        future = self._loop.create_future()
+        self._pending[request_id] = future
+        self._inbox(symbol).put(("analyse", request_id, symbol, interval, configs))
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    def drop(self, symbol: str, interval: str) -> None:
+        """Makes the owning worker forget a series."""
+        if self._outbox is not None:
+            self._inbox(symbol).put(("drop", symbol, interval))
+
+    def close(self) -> None:
+        if self._outbox is None:
+            return
+        for inbox in self._inboxes:
+            inbox.put(None)
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._outbox.put(None)
+        self._reader.join(timeout=5)
+        self._outbox = self._reader = None
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
@@ -0,0 +1,165 @@
+# state_store.py
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Optional
+from config import STATE_BACKEND, STATE_DB_PATH, STATE_FLUSH_INTERVAL
+import metrics
+
+logger = logging.getLogger(__name__)
+
+STATE_WRITES = metrics.counter("state_writes_total", "Rows written to the state store", ("kind",))
+STATE_FLUSH_SECONDS = metrics.histogram("state_flush_seconds", "Time to write one batch to the state store")
+
+# Rows are plain dicts so this module stays free of pandas and the watchlist:
+#   chat:          {"chat_id", "symbol", "interval", "strategy", "params", "debug"}
+#   subscription:  {"chat_id", "symbol", "interval", "strategy", "params", "last_candle_time"}
+# last_candle_time is an ISO 8601 string or None.
+
+
+class StateStore:
+    """Where per-chat settings and subscriptions survive restarts.
+
+    The base class keeps nothing; SqliteStateStore persists to disk. Writes
+    are buffered per key, so a setting or candle time that changes many times
+    between flushes is written once, and `flush()` writes the whole batch.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._chats: dict[int, dict] = {}
+        self._subs: dict[tuple, Optional[dict]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def load(self) -> tuple[list[dict], list[dict]]:
+        """All saved (chat settings, subscriptions)."""
+        return [], []
+
+    def put_chat(self, row: dict) -> None:
+        with self._lock:
+            self._chats[row["chat_id"]] = row
+
+    def put_subscription(self, key: tuple, row: dict) -> None:
+        with self._lock:
+            self._subs[key] = row
+
+    def delete_subscription(self, key: tuple) -> None:
+        with self._lock:
+            self._subs[key] = None
+
+    def flush(self) -> None:
+        """Writes everything buffered since the last flush.
+
+        A batch that fails to write is logged and kept for the next flush.
+        """
+        with self._lock:
+            chats, self._chats = self._chats, {}
+            subs, self._subs = self._subs, {}
+        if chats or subs:
+            try:
+                with STATE_FLUSH_SECONDS.time():
+                    self._write(chats, subs)
+            except Exception as e:
+                # Keep the batch for the next flush; rows changed since take precedence
+                with self._lock:
+                    self._chats = {**chats, **self._chats}
+                    self._subs = {**subs, **self._subs}
+                logger.error("Saving state failed, retrying on the next flush: %r", e)
+                return
+            STATE_WRITES.inc(len(chats), kind="chat")
+            STATE_WRITES.inc(len(subs), kind="subscription")
+
+    def _write(self, chats: dict[int, dict], subs: dict[tuple, Optional[dict]]) -> None:
+        pass
+
+    def start(self, interval: float = STATE_FLUSH_INTERVAL) -> None:
+        """Flushes every `interval` seconds from the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop(interval))
+
+    async def _flush_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                logger.error("Saving state failed: %r", e)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await asyncio.to_thread(self.flush)
+
+
+class SqliteStateStore(StateStore):
+    """StateStore in a SQLite database in WAL mode.
+
+    Each flush is one transaction, and everything is read back in one query
+    on startup.
+    """
+
+    def __init__(self, path: str = STATE_DB_PATH):
+        super().__init__()
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Flushes run in worker threads, one at a time (guarded by _db_lock)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db_lock = threading.Lock()
+        with self._db_lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS chats (chat_id INTEGER PRIMARY KEY, data TEXT NOT NULL)")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS subscriptions ("
+                "chat_id INTEGER, symbol TEXT, interval TEXT, strategy TEXT, data TEXT NOT NULL, "
+                "PRIMARY KEY (chat_id, symbol, interval, strategy))"
+            )
+
+    def load(self) -> tuple[list[dict], list[dict]]:
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT 'chat', data FROM chats UNION ALL SELECT 'subscription', data FROM subscriptions"
+            ).fetchall()
+        chats = [json.loads(data) for kind, data in rows if kind == "chat"]
+        subs = [json.loads(data) for kind, data in rows if kind == "subscription"]
+        return chats, subs
+
+    def _write(self, chats: dict[int, dict], subs: dict[tuple, Optional[dict]]) -> None:
+        with self._db_lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO chats (chat_id, data) VALUES (?, ?)",
+                [(chat_id, json.dumps(row)) for chat_id, row in chats.items()],
+            )
+            self._db.executemany(
+                "DELETE FROM subscriptions WHERE chat_id = ? AND symbol = ? AND interval = ? AND strategy = ?",
+                [key for key, row in subs.items() if row is None],
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO subscriptions (chat_id, symbol, interval, strategy, data) VALUES (?, ?, ?, ?, ?)",
+                [(*key, json.dumps(row)) for key, row in subs.items() if row is not None],
+            )
+
+    async def close(self) -> None:
+        await super().close()
+        with self._db_lock:
+            self._db.close()
+
+
+def has_saved_state(backend: str = STATE_BACKEND, path: str = STATE_DB_PATH) -> bool:
+    """Whether a previous run left state to resume (checked before loading the handlers)."""
+    return backend == "sqlite" and os.path.exists(path)
+
+
+def open_store(backend: str = STATE_BACKEND) -> StateStore:
+    """The configured state store ("sqlite", or "memory" to keep nothing)."""
+    if backend == "sqlite":
+        return SqliteStateStore()
+    if backend == "memory":
+        return StateStore()
+    raise ValueError(f"Unknown state backend: {backend}")
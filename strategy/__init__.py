@@ -1,19 +1,23 @@
 from .strategy import (
     Strategy,
+    SignalResult,
     SmaCrossoverStrategy,
     EmaCrossoverStrategy,
     RsiStrategy,
     MacdStrategy,
     BollingerBandsStrategy,
     StrategyFactory,
+    close_panel,
 )
 
 __all__ = [
     "Strategy",
+    "SignalResult",
     "SmaCrossoverStrategy",
     "EmaCrossoverStrategy",
     "RsiStrategy",
     "MacdStrategy",
     "BollingerBandsStrategy",
     "StrategyFactory",
+    "close_panel",
 ]
@@ -0,0 +1,109 @@
+# indicator_cache.py
+
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+import numpy as np
+import pandas as pd
+from config import INDICATOR_CACHE_MB
+import metrics
+
+CACHE_REQUESTS = metrics.counter("indicator_cache_requests_total", "Indicator cache lookups", ("result",))
+
+
+def series_key(data: pd.DataFrame) -> Hashable:
+    """Identifies a price series by the frame object, its length, last time and last close.
+
+    This takes constant time whatever the length of the series. Frames from
+    the candle store are replaced rather than updated when a candle changes,
+    and the last bar's time and close keep a frame refreshed in place apart.
+    IndicatorCache checks that the frame is still alive, since ids are reused.
+    """
+    if not len(data):
+        return (id(data), 0)
+    time_col = "datetime" if "datetime" in data.columns else "date" if "date" in data.columns else None
+    last_time = data[time_col].iloc[-1] if time_col else data.index[-1]
+    # The bytes of the close, so a NaN close still compares equal to itself
+    last_close = np.float64(data["close"].iloc[-1]).tobytes()
+    return (id(data), len(data), last_time, last_close)
+
+
+def _nbytes(value: Any) -> int:
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    return 0
+
+
+class IndicatorCache:
+    """LRU cache of indicator arrays keyed by (series, indicator, params).
+
+    Strategies evaluated on the same series (several subscribers, parameter
+    sweeps, MACD and EMA sharing EMA 12/26) compute each indicator once.
+    Values are stored as NumPy arrays so they can be re-attached to any index.
+    The cached arrays take at most `max_bytes` together.
+    """
+
+    def __init__(self, max_bytes: int = INDICATOR_CACHE_MB * 2**20):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        # key -> (weak reference to the source frame or None, value, bytes)
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, compute: Callable[[], Any], source: Any = None) -> Any:
+        """Cached `compute()` for `key`; an entry made for another (since freed) `source` is recomputed."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0]() is source):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                CACHE_REQUESTS.inc(result="hit")
+                return entry[1]
+            self.misses += 1
+        CACHE_REQUESTS.inc(result="miss")
+
+        value = compute()
+        # Cached arrays are shared between callers, so make them read-only
+        for arr in value.values() if isinstance(value, dict) else [value]:
+            if isinstance(arr, np.ndarray):
+                arr.flags.writeable = False
+
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return value
+        ref = None if source is None else weakref.ref(source)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[2]
+            self._entries[key] = (ref, value, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+        return value
+
+    def indicator(self, data: pd.DataFrame, name: str, compute: Callable[[], Any], **params) -> Any:
+        """Cached result of `compute()` for indicator `name` with `params` on `data`."""
+        if self.max_bytes <= 0:
+            return compute()
+        return self.get((series_key(data), name, tuple(sorted(params.items()))), compute, source=data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+indicator_cache = IndicatorCache()
+metrics.gauge("indicator_cache_bytes", "Memory held by cached indicator arrays", function=lambda: indicator_cache.nbytes)
@@ -0,0 +1,335 @@
+# indicators.py
+
+import math
+from typing import Callable, Optional
+import numpy as np
+from config import INDICATOR_JIT
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Array-in, array-out indicator kernels for the built-in strategies.
+#
+# Every kernel takes one series (1-D) or many aligned series as the columns of
+# a (bars x symbols) array and returns float64 arrays of the same shape.
+# Columns may start with NaN rows (no data yet for that symbol); values
+# start from each column's first valid bar, as for a series without them.
+# Gaps after that are not filled and propagate.
+#
+# The outputs follow pandas_ta (ema, rma, rsi, macd, bbands with ddof=0)
+# and pandas rolling means, and match the streaming indicators in
+# streaming.py. The loop kernels are compiled with Numba when it is
+# installed and INDICATOR_JIT is on; otherwise the NumPy versions run.
+
+JIT = njit is not None and INDICATOR_JIT
+
+# Largest factor exp(-n * log(decay)) the block recurrence lets grow (2**200)
+_MAX_GROWTH = 200 * math.log(2)
+# Values per block of rolling standard deviations
+_STD_BLOCK_ELEMENTS = 1 << 15
+
+
+def _jit(fn: Callable) -> Callable:
+    return njit(cache=True, nogil=True)(fn) if JIT else fn
+
+
+def _columns(values) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    return values.reshape(len(values), -1)
+
+
+def _like(out: np.ndarray, values) -> np.ndarray:
+    return out if np.ndim(values) == 2 else out.reshape(-1)
+
+
+def first_valid(values: np.ndarray) -> np.ndarray:
+    """Row of the first non-NaN value in each column (len(values) for all-NaN columns)."""
+    valid = ~np.isnan(values)
+    return np.where(valid.any(axis=0), valid.argmax(axis=0), len(values))
+
+
+def _same_start(first: np.ndarray) -> bool:
+    """Whether all columns start on the same row, so per-row values can be shared."""
+    return len(first) > 0 and first.min() == first.max()
+
+
+# Loop kernels (compiled when Numba is available)
+
+
+@_jit
+def _sma_loop(x, window, min_periods):
+    n, k = x.shape
+    out = np.full((n, k), np.nan)
+    for j in range(k):
+        total = 0.0
+        count = 0
+        for t in range(n):
+            if not math.isnan(x[t, j]):
+                total += x[t, j]
+                count += 1
+            if t >= window and not math.isnan(x[t - window, j]):
+                total -= x[t - window, j]
+                count -= 1
+            if count >= min_periods and count > 0:
+                out[t, j] = total / count
+    return out
+
+
+@_jit
+def _ema_loop(x, length):
+    n, k = x.shape
+    alpha = 2.0 / (length + 1)
+    out = np.full((n, k), np.nan)
+    for j in range(k):
+        first = 0
+        while first < n and math.isnan(x[first, j]):
+            first += 1
+        if first + length > n:
+            continue
+        total = 0.0
+        for t in range(first, first + length):
+            total += x[t, j]
+        value = total / length
+        out[first + length - 1, j] = value
+        for t in range(first + length, n):
+            value += alpha * (x[t, j] - value)
+            out[t, j] = value
+    return out
+
+
+@_jit
+def _rma_loop(x, length):
+    n, k = x.shape
+    decay = 1 - 1.0 / length
+    out = np.full((n, k), np.nan)
+    for j in range(k):
+        first = 0
+        while first < n and math.isnan(x[first, j]):
+            first += 1
+        if first == n:
+            continue
+        ref = x[first, j]
+        total = 0.0
+        weight = 0.0
+        for t in range(first, n):
+            total = (x[t, j] - ref) + decay * total
+            weight = 1 + decay * weight
+            if t - first + 1 >= length:
+                out[t, j] = ref + total / weight
+    return out
+
+
+@_jit
+def _mean_std_loop(x, length):
+    n, k = x.shape
+    mean = np.full((n, k), np.nan)
+    std = np.full((n, k), np.nan)
+    for j in range(k):
+        for t in range(length - 1, n):
+            total = 0.0
+            for i in range(t - length + 1, t + 1):
+                total += x[i, j]
+            m = total / length
+            squares = 0.0
+            for i in range(t - length + 1, t + 1):
+                squares += (x[i, j] - m) ** 2
+            mean[t, j] = m
+            std[t, j] = math.sqrt(squares / length)
+    return mean, std
+
+
+# NumPy kernels
+
+
+def _before(out: np.ndarray, start: np.ndarray, value: float = np.nan) -> None:
+    """Sets the rows before each column's `start` row to `value`, in place."""
+    hi = int(start.max(initial=0))
+    if hi > 0:
+        head = out[:hi]
+        head[np.arange(len(head))[:, None] < start] = value
+
+
+def _recurrence(u: np.ndarray, decay: float, start: np.ndarray) -> np.ndarray:
+    """y[t] = decay * y[t-1] + u[t] down each column from row `start`, NaN before it.
+
+    Solved in blocks with cumulative sums, y[s+i] = decay**i * (decay * y[s-1]
+    + sum(u[s+m] * decay**-m for m <= i)), where each block is short enough
+    for decay**-m to stay in range. The rounding error is that of the plain
+    loop.
+    """
+    n, k = u.shape
+    out = np.full((n, k), np.nan)
+    lo = int(start.min(initial=n))
+    if decay == 0:
+        out[lo:] = u[lo:]
+        _before(out, start)
+        return out
+
+    block = max(1, min(n, int(_MAX_GROWTH / -math.log(decay))))
+    powers = decay ** np.arange(block, dtype=np.float64)
+    carry = np.zeros(k)
+    for s in range(lo, n, block):
+        m = min(block, n - s)
+        chunk = np.divide(u[s : s + m], powers[:m, None], out=out[s : s + m])
+        _before(chunk, start - s, 0.0)
+        np.cumsum(chunk, axis=0, out=chunk)
+        chunk += decay * carry
+        chunk *= powers[:m, None]
+        carry = chunk[-1]
+    _before(out, start)
+    return out
+
+
+def _window_counts(n: int, first: np.ndarray, window: int) -> np.ndarray:
+    """Values in each trailing window of columns with only leading NaNs."""
+    if _same_start(first):
+        return np.clip(np.arange(1, n + 1) - first[:1], 0, window)[:, None]
+    return np.clip(np.arange(1, n + 1)[:, None] - first, 0, window)
+
+
+def _sma_numpy(x: np.ndarray, window: int, min_periods: int) -> np.ndarray:
+    n, k = x.shape
+    first = first_valid(x)
+    missing = np.isnan(x)
+    # Sums of differences from each column's first value keep the cumulative sums small
+    base = np.where(first < n, x[np.minimum(first, n - 1), np.arange(k)], 0.0)
+    total = np.subtract(x, base, out=np.empty_like(x))
+    total[missing] = 0.0
+    np.cumsum(total, axis=0, out=total)
+    total[window:] -= total[:-window]
+    if missing.sum() == first.sum():
+        count = _window_counts(n, first, window)
+    else:
+        # Gaps inside the series: count the values actually in each window
+        count = np.cumsum(~missing, axis=0)
+        count[window:] -= count[:-window]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        total /= count
+    total += base
+    total[np.broadcast_to(count < max(min_periods, 1), total.shape)] = np.nan
+    return total
+
+
+def _ema_numpy(x: np.ndarray, length: int) -> np.ndarray:
+    n, k = x.shape
+    first = first_valid(x)
+    seed = np.minimum(first + length - 1, n)
+    alpha = 2 / (length + 1)
+
+    # Seed values: the mean of each column's first `length` values
+    ref = np.zeros(k)
+    cols = np.flatnonzero(seed < n)
+    if len(cols):
+        head = x[: seed[cols].max() + 1, cols]
+        total = np.cumsum(np.where(np.isnan(head), 0.0, head), axis=0)
+        before = np.where(first[cols] > 0, total[np.maximum(first[cols] - 1, 0), np.arange(len(cols))], 0.0)
+        ref[cols] = (total[seed[cols], np.arange(len(cols))] - before) / length
+    # Averaging the differences from the seed keeps a constant series exactly constant
+    u = x - ref
+    u *= alpha
+    u[seed[cols], cols] = 0.0
+    out = _recurrence(u, 1 - alpha, seed)
+    out += ref
+    return out
+
+
+def _rma_numpy(x: np.ndarray, length: int) -> np.ndarray:
+    n = len(x)
+    first = first_valid(x)
+    decay = 1 - 1 / length
+    # Differences from each column's first value, as in _ema_numpy
+    ref = np.where(first < n, x[np.minimum(first, n - 1), np.arange(x.shape[1])], 0.0)
+    out = _recurrence(x - ref, decay, first)
+    # Sum of the weights, 1 + decay + ... + decay**(t - first)
+    weights = np.full(n, 1 / (1 - decay))
+    if decay:
+        # Past `head` bars decay**t is below float precision and the sum is 1 / (1 - decay)
+        head = min(n, int(40 / -math.log(decay)) + 1)
+        weights[:head] = (1 - decay ** np.arange(1, head + 1)) / (1 - decay)
+    if _same_start(first):
+        start = int(first[0])
+        weight = np.concatenate([np.ones(start), weights[: n - start]])[:, None]
+    else:
+        weight = weights[np.clip(np.arange(n)[:, None] - first, 0, n - 1)]
+    out /= weight
+    out += ref
+    _before(out, first + length - 1)
+    return out
+
+
+def _mean_std_numpy(x: np.ndarray, length: int) -> tuple[np.ndarray, np.ndarray]:
+    n, k = x.shape
+    mean = np.full((n, k), np.nan)
+    std = np.full((n, k), np.nan)
+    # Two passes over the window offsets, the means and then the squared
+    # deviations from them, in blocks of rows that stay in the CPU cache
+    block = max(1, _STD_BLOCK_ELEMENTS // max(k, 1))
+    for s in range(length - 1, n, block):
+        rows = min(block, n - s)
+        m = mean[s : s + rows]
+        m[:] = x[s - length + 1 : s - length + 1 + rows]
+        for i in range(s - length + 2, s + 1):
+            m += x[i : i + rows]
+        m /= length
+        squares = std[s : s + rows]
+        squares[:] = 0.0
+        for i in range(s - length + 1, s + 1):
+            deviation = x[i : i + rows] - m
+            deviation *= deviation
+            squares += deviation
+        squares /= length
+        np.sqrt(squares, out=squares)
+    return mean, std
+
+
+# Public kernels
+
+
+def sma(values, window: int, min_periods: Optional[int] = None) -> np.ndarray:
+    """Rolling mean, as Series.rolling(window, min_periods).mean()."""
+    x = _columns(values)
+    min_periods = window if min_periods is None else min_periods
+    out = _sma_loop(x, window, min_periods) if JIT else _sma_numpy(x, window, min_periods)
+    return _like(out, values)
+
+
+def ema(values, length: int) -> np.ndarray:
+    """EMA seeded with the SMA of the first `length` values, as pandas_ta.ema."""
+    x = _columns(values)
+    return _like(_ema_loop(x, length) if JIT else _ema_numpy(x, length), values)
+
+
+def rma(values, length: int) -> np.ndarray:
+    """Wilder's moving average, as pandas_ta.rma: ewm(alpha=1/length, min_periods=length)."""
+    x = _columns(values)
+    return _like(_rma_loop(x, length) if JIT else _rma_numpy(x, length), values)
+
+
+def rsi(close, length: int = 14) -> np.ndarray:
+    """Relative Strength Index from Wilder averages of gains and losses, as pandas_ta.rsi."""
+    x = _columns(close)
+    change = np.diff(x, axis=0, prepend=np.nan)
+    gains = rma(np.maximum(change, 0.0), length)
+    losses = rma(np.maximum(-change, 0.0), length)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        losses += gains
+        gains /= losses
+    gains *= 100
+    return _like(gains, close)
+
+
+def macd(close, fast: int = 12, slow: int = 26, signal: int = 9) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(MACD line, signal line, histogram), as pandas_ta.macd (which swaps fast > slow)."""
+    fast, slow = sorted((fast, slow))
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def bbands(close, length: int = 20, std: float = 2) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(lower, middle, upper) Bollinger Bands with the population standard deviation, as pandas_ta.bbands."""
+    x = _columns(close)
+    mid, stdev = _mean_std_loop(x, length) if JIT else _mean_std_numpy(x, length)
+    return _like(mid - std * stdev, close), _like(mid, close), _like(mid + std * stdev, close)
@@ -1,16 +1,170 @@
 # strategy.py
 
+import copy
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Hashable, Mapping, Optional, Union
+import numpy as np
 import pandas as pd
-import ta
+from . import indicators as kernels
+from .indicators import first_valid
+from .streaming import RollingMean, RollingStd, Ema, Rma, crossover_signal
+from .indicator_cache import IndicatorCache, indicator_cache
+import metrics
+
+Bar = Union[float, dict, pd.Series]
+
+SIGNALS_SECONDS = metrics.histogram("strategy_signals_seconds", "Time to compute signals over a full series", ("strategy",))
+
+
+def _close(bar: Bar) -> float:
+    return float(bar) if isinstance(bar, (int, float)) else float(bar["close"])
+
+
+def _settled(length: int) -> int:
+    """Bars after which an exponential average of `length` no longer depends on where it started.
+
+    Past this many bars, the weight left on the seed is below 1e-17, so the
+    value matches the one computed over the full history to double precision.
+    """
+    return 40 * (length + 1)
+
+
+def close_panel(series: Mapping[Hashable, pd.DataFrame], bars: Optional[int] = None) -> pd.DataFrame:
+    """The last `bars` closes (all by default) of each series as the columns of one array.
+
+    Series are aligned on their latest candle rather than by time, so the last
+    row holds every series' latest close even when their candles differ;
+    shorter series start with NaN rows.
+    """
+    closes = {key: data["close"].to_numpy(dtype=np.float64) for key, data in series.items()}
+    n = max((len(c) for c in closes.values()), default=0)
+    if bars is not None:
+        n = min(n, bars)
+    panel = np.full((n, len(closes)), np.nan)
+    for j, close in enumerate(closes.values()):
+        tail = close[len(close) - min(len(close), n) :]
+        panel[n - len(tail) :, j] = tail
+    return pd.DataFrame(panel, columns=pd.Index(list(closes), tupleize_cols=False), copy=False)
+
+
+def _crossover(fast: np.ndarray, slow: np.ndarray) -> np.ndarray:
+    """1 where fast is above slow, -1 where below, 0 otherwise (including NaN)."""
+    return (fast > slow).astype(np.int64) - (fast < slow).astype(np.int64)
+
+
+@dataclass
+class SignalResult:
+    """Signals for a price frame that reference, rather than copy, the frame.
+
+    `data` is the caller's frame, and `indicators` are the (read-only, cached)
+    indicator arrays in the column order generate_signals would add them.
+    """
+
+    data: pd.DataFrame
+    signal: np.ndarray
+    indicators: dict[str, np.ndarray] = field(default_factory=dict)
+
+    @property
+    def position(self) -> np.ndarray:
+        """Change in signal from the previous row (0 for the first row)."""
+        return np.diff(self.signal, prepend=self.signal[:1]).astype(np.float64)
+
+    def latest(self) -> int:
+        return int(self.signal[-1]) if len(self.signal) else 0
+
+    def to_frame(self) -> pd.DataFrame:
+        """Materialises a copy of the data with indicator, signal and position columns."""
+        df = self.data.copy()
+        for col, values in self.indicators.items():
+            df[col] = values
+        df["signal"] = self.signal
+        df["position"] = self.position
+        return df
 
 
 class Strategy(ABC):
     """Base interface for all trading strategies."""
 
+    # Indicators are requested through this cache so equal ones are computed once
+    cache: IndicatorCache = indicator_cache
+
+    def _ema(self, data: pd.DataFrame, length: int) -> np.ndarray:
+        return self.cache.indicator(data, "ema", lambda: kernels.ema(data["close"], length), length=length)
+
     @abstractmethod
+    def compute_signals(self, data: pd.DataFrame) -> SignalResult:
+        """Computes signals and indicators for an OHLC DataFrame without copying it."""
+
     def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
         """Takes OHLC DataFrame and returns it with `signal` + `position` columns."""
+        with SIGNALS_SECONDS.time(strategy=type(self).__name__):
+            result = self.compute_signals(data)
+        return result.to_frame()
+
+    @property
+    def lookback(self) -> Optional[int]:
+        """Trailing bars the latest signal depends on (None: the whole history)."""
+        return None
+
+    def generate_signals_batch(self, panel: pd.DataFrame) -> pd.Series:
+        """Latest signal of every column of a (bars x symbols) close panel in one vectorized pass.
+
+        Rows are bars and columns are symbols, aligned on their latest candle
+        (see close_panel). Only the last `lookback` rows are used. A column
+        without a close in the last row gets signal 0.
+        """
+        close = panel.to_numpy(dtype=np.float64)
+        if self.lookback is not None:
+            close = close[-self.lookback :]
+        if not len(close):
+            return pd.Series(0, index=panel.columns, dtype=np.int64)
+        signal = self.compute_signal_matrix(close)[-1]
+        signal[np.isnan(close[-1])] = 0
+        return pd.Series(signal, index=panel.columns)
+
+    def compute_signal_matrix(self, close: np.ndarray) -> np.ndarray:
+        """Signals for a (bars x symbols) array of closes, one column per symbol.
+
+        Columns may start with NaN rows (no data yet for that symbol), which
+        get signal 0. The built-in strategies override this with one
+        vectorized pass over all columns; this fallback runs compute_signals
+        per column.
+        """
+        close = np.asarray(close, dtype=np.float64)
+        signal = np.zeros(close.shape, dtype=np.int64)
+        for j, first in enumerate(first_valid(close)):
+            if first < len(close):
+                frame = pd.DataFrame({"close": close[first:, j]})
+                signal[first:, j] = self.compute_signals(frame).signal
+        return signal
+
+    # Optional streaming API: strategies that keep running indicator state
+    # override reset() and update() so each new candle costs O(1).
+
+    @property
+    def supports_streaming(self) -> bool:
+        return type(self).update is not Strategy.update
+
+    def reset(self) -> None:
+        """Clears the streaming indicator state."""
+        raise NotImplementedError(f"{type(self).__name__} does not support streaming")
+
+    def update(self, bar: Bar) -> int:
+        """Feeds one closed candle (or its close price) and returns the signal after it."""
+        raise NotImplementedError(f"{type(self).__name__} does not support streaming")
+
+    def seed(self, data: pd.DataFrame) -> int:
+        """Rebuilds the streaming state from history and returns the latest signal."""
+        self.reset()
+        signal = 0
+        for close in data["close"].to_numpy(dtype=float):
+            signal = self.update(close)
+        return signal
+
+    def peek(self, bar: Bar) -> int:
+        """Signal if `bar` were the next candle, without committing it (e.g. a forming candle)."""
+        return copy.deepcopy(self).update(bar)
 
 
 class SmaCrossoverStrategy(Strategy):
@@ -19,24 +173,37 @@ class SmaCrossoverStrategy(Strategy):
     def __init__(self, short_window: int = 20, long_window: int = 50):
         self.short_window = short_window
         self.long_window = long_window
-
-    def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
-        df = data.copy()
-        df[f"sma_{self.short_window}"] = (
-            df["close"].rolling(window=self.short_window, min_periods=1).mean()
-        )
-        df[f"sma_{self.long_window}"] = (
-            df["close"].rolling(window=self.long_window, min_periods=1).mean()
-        )
-        df["signal"] = 0
-        df.loc[
-            df[f"sma_{self.short_window}"] > df[f"sma_{self.long_window}"], "signal"
-        ] = 1
-        df.loc[
-            df[f"sma_{self.short_window}"] < df[f"sma_{self.long_window}"], "signal"
-        ] = -1
-        df["position"] = df["signal"].diff().fillna(0)
-        return df
+        self.reset()
+
+    @property
+    def lookback(self) -> int:
+        return max(self.short_window, self.long_window)
+
+    def reset(self) -> None:
+        self._short = RollingMean(self.short_window, min_periods=1)
+        self._long = RollingMean(self.long_window, min_periods=1)
+
+    def update(self, bar: Bar) -> int:
+        close = _close(bar)
+        return crossover_signal(self._short.update(close), self._long.update(close))
+
+    def compute_signals(self, data: pd.DataFrame) -> SignalResult:
+        indicators = {}
+        for window in (self.short_window, self.long_window):
+            indicators[f"sma_{window}"] = self.cache.indicator(
+                data,
+                "sma",
+                lambda: kernels.sma(data["close"], window, min_periods=1),
+                window=window,
+                min_periods=1,
+            )
+        signal = _crossover(indicators[f"sma_{self.short_window}"], indicators[f"sma_{self.long_window}"])
+        return SignalResult(data, signal, indicators)
+
+    def compute_signal_matrix(self, close: np.ndarray) -> np.ndarray:
+        short = kernels.sma(close, self.short_window, min_periods=1)
+        long = kernels.sma(close, self.long_window, min_periods=1)
+        return _crossover(short, long)
 
 
 class EmaCrossoverStrategy(Strategy):
@@ -45,18 +212,29 @@ class EmaCrossoverStrategy(Strategy):
     def __init__(self, short_span: int = 12, long_span: int = 26):
         self.short_span = short_span
         self.long_span = long_span
+        self.reset()
 
-    def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
-        df = data.copy()
-        df[f"ema_{self.short_span}"] = ta.ema(df["close"], length=self.short_span)
-        df[f"ema_{self.long_span}"] = ta.ema(df["close"], length=self.long_span)
-        df["signal"] = 0
-        df.loc[df[f"ema_{self.short_span}"] > df[f"ema_{self.long_span}"], "signal"] = 1
-        df.loc[df[f"ema_{self.short_span}"] < df[f"ema_{self.long_span}"], "signal"] = (
-            -1
-        )
-        df["position"] = df["signal"].diff().fillna(0)
-        return df
+    @property
+    def lookback(self) -> int:
+        return _settled(max(self.short_span, self.long_span))
+
+    def reset(self) -> None:
+        self._short = Ema(self.short_span)
+        self._long = Ema(self.long_span)
+
+    def update(self, bar: Bar) -> int:
+        close = _close(bar)
+        return crossover_signal(self._short.update(close), self._long.update(close))
+
+    def compute_signals(self, data: pd.DataFrame) -> SignalResult:
+        short = self._ema(data, self.short_span)
+        long = self._ema(data, self.long_span)
+        indicators = {f"ema_{self.short_span}": short, f"ema_{self.long_span}": long}
+        return SignalResult(data, _crossover(short, long), indicators)
+
+    def compute_signal_matrix(self, close: np.ndarray) -> np.ndarray:
+        close = np.asarray(close, dtype=np.float64)
+        return _crossover(kernels.ema(close, self.short_span), kernels.ema(close, self.long_span))
 
 
 class RsiStrategy(Strategy):
@@ -66,15 +244,49 @@ class RsiStrategy(Strategy):
         self.period = period
         self.overbought = overbought
         self.oversold = oversold
-
-    def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
-        df = data.copy()
-        df["rsi"] = ta.rsi(df["close"], length=self.period)
-        df["signal"] = 0
-        df.loc[df["rsi"] < self.oversold, "signal"] = 1
-        df.loc[df["rsi"] > self.overbought, "signal"] = -1
-        df["position"] = df["signal"].diff().fillna(0)
-        return df
+        self.reset()
+
+    @property
+    def lookback(self) -> int:
+        # One more bar for the first price change
+        return _settled(self.period) + 1
+
+    def reset(self) -> None:
+        self._gains = Rma(self.period)
+        self._losses = Rma(self.period)
+        self._prev = None
+
+    def update(self, bar: Bar) -> int:
+        close = _close(bar)
+        prev, self._prev = self._prev, close
+        if prev is None:
+            return 0
+
+        change = close - prev
+        gain = self._gains.update(max(change, 0.0))
+        loss = self._losses.update(-min(change, 0.0))
+        if gain is None or gain + loss == 0:
+            return 0
+
+        rsi = 100 * gain / (gain + loss)
+        if rsi > self.overbought:
+            return -1
+        if rsi < self.oversold:
+            return 1
+        return 0
+
+    def compute_signals(self, data: pd.DataFrame) -> SignalResult:
+        rsi = self.cache.indicator(data, "rsi", lambda: kernels.rsi(data["close"], self.period), length=self.period)
+        return SignalResult(data, self._classify(rsi), {"rsi": rsi})
+
+    def compute_signal_matrix(self, close: np.ndarray) -> np.ndarray:
+        return self._classify(kernels.rsi(close, self.period))
+
+    def _classify(self, rsi: np.ndarray) -> np.ndarray:
+        signal = np.zeros(rsi.shape, dtype=np.int64)
+        signal[rsi < self.oversold] = 1
+        signal[rsi > self.overbought] = -1
+        return signal
 
 
 class MacdStrategy(Strategy):
@@ -84,16 +296,46 @@ class MacdStrategy(Strategy):
         self.fast = fast
         self.slow = slow
         self.signal = signal
+        self.reset()
+
+    @property
+    def lookback(self) -> int:
+        # The signal line averages the MACD line, which settles first
+        return _settled(max(self.fast, self.slow)) + _settled(self.signal)
+
+    def reset(self) -> None:
+        # pandas_ta swaps the lengths when fast > slow
+        self._fast = Ema(min(self.fast, self.slow))
+        self._slow = Ema(max(self.fast, self.slow))
+        self._signal = Ema(self.signal)
+
+    def update(self, bar: Bar) -> int:
+        close = _close(bar)
+        fast, slow = self._fast.update(close), self._slow.update(close)
+        if fast is None or slow is None:
+            return 0
+        macd = fast - slow
+        return crossover_signal(macd, self._signal.update(macd))
+
+    def compute_signals(self, data: pd.DataFrame) -> SignalResult:
+        # Built from the shared EMAs instead of kernels.macd, so EMA 12/26 is
+        # computed once for both this and the EMA crossover strategy
+        fast, slow = sorted((self.fast, self.slow))
+        props = f"{fast}_{slow}_{self.signal}"
+        macd = self._ema(data, fast) - self._ema(data, slow)
+        signal_line = self.cache.indicator(
+            data, "macd_signal", lambda: kernels.ema(macd, self.signal), fast=fast, slow=slow, signal=self.signal
+        )
+        indicators = {
+            f"MACD_{props}": macd,
+            f"MACDh_{props}": macd - signal_line,
+            f"MACDs_{props}": signal_line,
+        }
+        return SignalResult(data, _crossover(macd, signal_line), indicators)
 
-    def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
-        df = data.copy()
-        macd = ta.macd(df["close"], fast=self.fast, slow=self.slow, signal=self.signal)
-        df = df.join(macd)
-        df["signal"] = 0
-        df.loc[df["MACD_12_26_9"] > df["MACDs_12_26_9"], "signal"] = 1
-        df.loc[df["MACD_12_26_9"] < df["MACDs_12_26_9"], "signal"] = -1
-        df["position"] = df["signal"].diff().fillna(0)
-        return df
+    def compute_signal_matrix(self, close: np.ndarray) -> np.ndarray:
+        macd, signal_line, _ = kernels.macd(close, self.fast, self.slow, self.signal)
+        return _crossover(macd, signal_line)
 
 
 class BollingerBandsStrategy(Strategy):
@@ -102,39 +344,55 @@ class BollingerBandsStrategy(Strategy):
     def __init__(self, length: int = 20, std: int = 2):
         self.length = length
         self.std = std
-
-    def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
-        df = data.copy()
-        bb = ta.bbands(df["close"], length=self.length, std=self.std)
-        df = df.join(bb)
-        df["signal"] = 0
-        df.loc[df["close"] > df["BBU_20_2.0"], "signal"] = 1
-        df.loc[df["close"] < df["BBL_20_2.0"], "signal"] = -1
-        df["position"] = df["signal"].diff().fillna(0)
-        return df
-
-
-class StrategyFactory:
-    """Creates strategies by name and lists available options."""
-
-    _strategies = {
-        "sma": SmaCrossoverStrategy,
-        "ema": EmaCrossoverStrategy,
-        "rsi": RsiStrategy,
-        "macd": MacdStrategy,
-        "bbands": BollingerBandsStrategy,
-    }
-
-    @classmethod
-    def list_strategies(cls) -> list[str]:
-        return list(cls._strategies.keys())
-
-    @classmethod
-    def create_strategy(cls, name: str, **kwargs) -> Strategy:
-        name = name.lower()
-        if name not in cls._strategies:
-            raise ValueError(f"Unknown strategy: {name}")
-        return cls._strategies[name](**kwargs)
+        self.reset()
+
+    @property
+    def lookback(self) -> int:
+        return self.length
+
+    def reset(self) -> None:
+        self._bands = RollingStd(self.length, ddof=0)
+
+    def update(self, bar: Bar) -> int:
+        close = _close(bar)
+        mid, stdev = self._bands.update(close)
+        if mid is None:
+            return 0
+        if close > mid + self.std * stdev:
+            return 1
+        if close < mid - self.std * stdev:
+            return -1
+        return 0
+
+    def compute_signals(self, data: pd.DataFrame) -> SignalResult:
+        close = data["close"].to_numpy(dtype=float)
+        bands = self.cache.indicator(data, "bbands", lambda: self._band_columns(close), length=self.length, std=self.std)
+        props = f"{self.length}_{float(self.std)}"
+        return SignalResult(data, self._classify(close, bands[f"BBL_{props}"], bands[f"BBU_{props}"]), dict(bands))
+
+    def _band_columns(self, close: np.ndarray) -> dict[str, np.ndarray]:
+        # Same columns as pandas_ta.bbands: bands, bandwidth and %B
+        lower, mid, upper = kernels.bbands(close, self.length, self.std)
+        props = f"{self.length}_{float(self.std)}"
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return {
+                f"BBL_{props}": lower,
+                f"BBM_{props}": mid,
+                f"BBU_{props}": upper,
+                f"BBB_{props}": 100 * (upper - lower) / mid,
+                f"BBP_{props}": (close - lower) / (upper - lower),
+            }
+
+    def _classify(self, close: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+        signal = np.zeros(close.shape, dtype=np.int64)
+        signal[close > upper] = 1
+        signal[close < lower] = -1
+        return signal
+
+    def compute_signal_matrix(self, close: np.ndarray) -> np.ndarray:
+        close = np.asarray(close, dtype=np.float64)
+        lower, _, upper = kernels.bbands(close, self.length, self.std)
+        return self._classify(close, lower, upper)
 
 
 class StrategyFactory:
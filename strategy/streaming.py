@@ -0,0 +1,106 @@
+# streaming.py
+
+from collections import deque
+from typing import Optional
+
+
+class RollingMean:
+    """Mean of the last `window` values, like Series.rolling(window, min_periods).mean()."""
+
+    def __init__(self, window: int, min_periods: Optional[int] = None):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self._values: deque = deque()
+        self._sum = 0.0
+
+    def update(self, x: float) -> Optional[float]:
+        self._values.append(x)
+        self._sum += x
+        if len(self._values) > self.window:
+            self._sum -= self._values.popleft()
+        if len(self._values) < self.min_periods:
+            return None
+        return self._sum / len(self._values)
+
+
+class RollingStd:
+    """Rolling mean and standard deviation over `window` values (windowed Welford)."""
+
+    def __init__(self, window: int, ddof: int = 0):
+        self.window = window
+        self.ddof = ddof
+        self._values: deque = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, x: float) -> tuple[Optional[float], Optional[float]]:
+        self._values.append(x)
+        n = len(self._values)
+        if n > self.window:
+            old = self._values.popleft()
+            mean = self._mean + (x - old) / self.window
+            self._m2 += (x - old) * (x - mean + old - self._mean)
+            self._mean = mean
+        else:
+            delta = x - self._mean
+            self._mean += delta / n
+            self._m2 += delta * (x - self._mean)
+
+        if n < self.window:
+            return None, None
+        variance = max(self._m2, 0.0) / (self.window - self.ddof)
+        return self._mean, variance**0.5
+
+
+class Ema:
+    """EMA seeded with the SMA of the first `length` values, as pandas_ta.ema."""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.alpha = 2 / (length + 1)
+        self._seed: list = []
+        self.value: Optional[float] = None
+
+    def update(self, x: float) -> Optional[float]:
+        if self.value is not None:
+            self.value += self.alpha * (x - self.value)
+        else:
+            self._seed.append(x)
+            if len(self._seed) == self.length:
+                self.value = sum(self._seed) / self.length
+                self._seed = []
+        return self.value
+
+
+class Rma:
+    """Wilder-style moving average as pandas_ta.rma: ewm(alpha=1/length, min_periods=length).
+
+    Keeps the weighted sum and weight total of the adjusted EWM form, so every
+    update is O(1) and matches the batch calculation.
+    """
+
+    def __init__(self, length: int):
+        self.length = length
+        self._decay = 1 - 1 / length
+        self._sum = 0.0
+        self._weight = 0.0
+        self._count = 0
+
+    def update(self, x: float) -> Optional[float]:
+        self._sum = x + self._decay * self._sum
+        self._weight = 1 + self._decay * self._weight
+        self._count += 1
+        if self._count < self.length:
+            return None
+        return self._sum / self._weight
+
+
+def crossover_signal(fast: Optional[float], slow: Optional[float]) -> int:
+    """1 when fast is above slow, -1 when below, 0 when equal or not yet defined."""
+    if fast is None or slow is None:
+        return 0
+    if fast > slow:
+        return 1
+    if fast < slow:
+        return -1
+    return 0
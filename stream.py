@@ -0,0 +1,280 @@
+# stream.py
+
+import aiohttp
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+import pandas as pd
+from config import EODHD_API_TOKEN, EODHD_WS_URL, STREAM_SETTLE
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Exchange suffix -> EODHD real-time WebSocket feed
+FEEDS = {"US": "us", "CC": "crypto", "FOREX": "forex"}
+
+# Intervals that can be built from ticks, in seconds
+STREAM_INTERVALS = {"1m": 60, "5m": 300, "h": 3600}
+
+TICKS = metrics.counter("stream_ticks_total", "Ticks received over the WebSocket feeds", ("feed",))
+
+
+def feed_symbol(symbol: str) -> Optional[tuple[str, str]]:
+    """("us", "AAPL") for "AAPL.US"; None when no WebSocket feed carries the symbol."""
+    code, _, exchange = symbol.upper().rpartition(".")
+    feed = FEEDS.get(exchange)
+    if not code or feed is None:
+        return None
+    return feed, code
+
+
+@dataclass
+class Candle:
+    start: int  # epoch seconds of the bar open
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+    def to_frame(self) -> pd.DataFrame:
+        """One-row frame shaped like the intraday bars of AsyncDataFetcher."""
+        return pd.DataFrame(
+            {
+                "datetime": [pd.Timestamp(self.start, unit="s", tz="UTC")],
+                "open": [self.open],
+                "high": [self.high],
+                "low": [self.low],
+                "close": [self.close],
+                "volume": [self.volume],
+            }
+        )
+
+
+class CandleAggregator:
+    """Builds epoch-aligned candles of `seconds` length from ticks."""
+
+    def __init__(self, seconds: int):
+        self.seconds = seconds
+        self.current: Optional[Candle] = None
+        self._emitted = -1  # start of the last candle handed out
+
+    def add(self, ts: float, price: float, volume: float = 0.0) -> Optional[Candle]:
+        """Adds a tick; returns the previous candle if this tick closed it."""
+        start = int(ts) - int(ts) % self.seconds
+        candle = self.current
+
+        if start <= self._emitted or (candle is not None and start < candle.start):
+            return None  # late tick for a candle that was already emitted
+
+        if candle is None or start > candle.start:
+            self.current = Candle(start, price, price, price, price, volume)
+            if candle is not None:
+                self._emitted = candle.start
+            return candle
+
+        candle.high = max(candle.high, price)
+        candle.low = min(candle.low, price)
+        candle.close = price
+        candle.volume += volume
+        return None
+
+    def close_due(self, now: float, settle: float = 0.0) -> Optional[Candle]:
+        """Closes the current candle once `settle` seconds past its end went by without a newer tick."""
+        candle = self.current
+        if candle is None or now < candle.start + self.seconds + settle:
+            return None
+        self.current = None
+        self._emitted = candle.start
+        return candle
+
+
+class EodhdStream:
+    """Consumes EODHD's real-time WebSocket feeds and emits closed candles.
+
+    One connection is kept per feed (us, crypto, forex) with the watched
+    symbols subscribed. Ticks are aggregated into candles for every streamed
+    interval of a symbol, and `on_candle(symbol, interval, candle)` runs when
+    a candle closes: on the first tick of the next candle, or STREAM_SETTLE
+    seconds after its end when the market is quiet. Connections reconnect
+    with backoff and resubscribe.
+    """
+
+    def __init__(
+        self,
+        on_candle: Callable[[str, str, Candle], Awaitable[None]],
+        url: str = EODHD_WS_URL,
+        api_token: str = EODHD_API_TOKEN,
+        settle: float = STREAM_SETTLE,
+    ):
+        self.on_candle = on_candle
+        self.url = url.rstrip("/")
+        self.api_token = api_token
+        self.settle = settle
+        # feed -> feed code -> symbol -> interval -> aggregator
+        self._series: dict[str, dict[str, dict[str, dict[str, CandleAggregator]]]] = {}
+        self._sockets: dict[str, aiohttp.ClientWebSocketResponse] = {}
+        self._feeds: dict[str, asyncio.Task] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._sweeper: Optional[asyncio.Task] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def covers(self, symbol: str, interval: str) -> bool:
+        """True while candles for the series arrive over a live connection."""
+        fs = feed_symbol(symbol)
+        if fs is None or interval not in STREAM_INTERVALS:
+            return False
+        feed, code = fs
+        return feed in self._sockets and interval in self._series.get(feed, {}).get(code, {}).get(symbol, {})
+
+    def sync(self, series: set[tuple[str, str]]) -> None:
+        """Streams exactly the given (symbol, interval) series that a feed carries."""
+        wanted = self._by_feed(series)
+        for feed in set(self._series) | set(wanted):
+            added, removed = self._update_codes(feed, wanted.get(feed, {}))
+            self._update_connection(feed, added, removed)
+
+        if self._series and (self._sweeper is None or self._sweeper.done()):
+            self._sweeper = asyncio.create_task(self._sweep())
+
+    @staticmethod
+    def _by_feed(series: set[tuple[str, str]]) -> dict[str, dict[str, dict[str, set[str]]]]:
+        """feed -> feed code -> symbol -> intervals of the series a feed carries."""
+        wanted: dict[str, dict[str, dict[str, set[str]]]] = {}
+        for symbol, interval in series:
+            fs = feed_symbol(symbol)
+            if fs is not None and interval in STREAM_INTERVALS:
+                feed, code = fs
+                wanted.setdefault(feed, {}).setdefault(code, {}).setdefault(symbol, set()).add(interval)
+        return wanted
+
+    def _update_codes(self, feed: str, wanted: dict[str, dict[str, set[str]]]) -> tuple[list[str], list[str]]:
+        """Makes a feed's aggregators match `wanted`; returns the (added, removed) feed codes."""
+        codes = self._series.setdefault(feed, {})
+        added = sorted(set(wanted) - set(codes))
+        removed = sorted(set(codes) - set(wanted))
+
+        for code in removed:
+            del codes[code]
+        for code, symbols in wanted.items():
+            self._update_symbols(codes.setdefault(code, {}), symbols)
+        if not codes:
+            del self._series[feed]
+        return added, removed
+
+    @staticmethod
+    def _update_symbols(current: dict[str, dict[str, CandleAggregator]], symbols: dict[str, set[str]]) -> None:
+        """Adds and drops the aggregators of one feed code's symbols and intervals, keeping the others."""
+        for symbol in set(current) - set(symbols):
+            del current[symbol]
+        for symbol, intervals in symbols.items():
+            aggregators = current.setdefault(symbol, {})
+            for interval in set(aggregators) - intervals:
+                del aggregators[interval]
+            for interval in intervals - set(aggregators):
+                aggregators[interval] = CandleAggregator(STREAM_INTERVALS[interval])
+
+    def _update_connection(self, feed: str, added: list[str], removed: list[str]) -> None:
+        """Closes a feed nothing is streamed from, connects a new one, or changes a live one's subscriptions."""
+        if feed not in self._series:
+            task = self._feeds.pop(feed, None)
+            if task is not None:
+                task.cancel()
+        elif feed not in self._feeds or self._feeds[feed].done():
+            self._feeds[feed] = asyncio.create_task(self._run_feed(feed))
+        elif feed in self._sockets:
+            self._spawn(self._subscribe(feed, "unsubscribe", removed))
+            self._spawn(self._subscribe(feed, "subscribe", added))
+
+    async def close(self) -> None:
+        for task in [*self._feeds.values(), *self._tasks, self._sweeper]:
+            if task is not None:
+                task.cancel()
+        self._feeds.clear()
+        self._sockets.clear()
+        self._sweeper = None
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _spawn(self, coro: Awaitable) -> None:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _subscribe(self, feed: str, action: str, codes: list[str]) -> None:
+        ws = self._sockets.get(feed)
+        if not codes or ws is None or ws.closed:
+            return
+        await ws.send_str(json.dumps({"action": action, "symbols": ",".join(codes)}))
+
+    async def _run_feed(self, feed: str) -> None:
+        attempt = 0
+        while True:
+            if self._session is None or self._session.closed:
+                self._session = aiohttp.ClientSession()
+            url = f"{self.url}/{feed}?api_token={self.api_token}"
+            try:
+                async with self._session.ws_connect(url, heartbeat=30) as ws:
+                    self._sockets[feed] = ws
+                    await self._subscribe(feed, "subscribe", sorted(self._series.get(feed, {})))
+                    logger.info("Streaming %s feed", feed)
+                    attempt = 0
+                    async for msg in ws:
+                        if msg.type == aiohttp.WSMsgType.TEXT:
+                            self._on_message(feed, msg.data)
+                        elif msg.type == aiohttp.WSMsgType.ERROR:
+                            break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("%s feed connection failed: %r", feed, e)
+            finally:
+                self._sockets.pop(feed, None)
+
+            # Polling takes over (see covers()) until the feed is back
+            delay = min(2**attempt, 60)
+            attempt += 1
+            logger.warning("%s feed disconnected, reconnecting in %ss", feed, delay)
+            await asyncio.sleep(delay)
+
+    def _on_message(self, feed: str, raw: str) -> None:
+        try:
+            tick = json.loads(raw)
+            symbols = self._series.get(feed, {}).get(tick.get("s"))
+            if not symbols:
+                return  # status messages and unsubscribed codes
+
+            if "p" in tick:
+                price = float(tick["p"])
+            else:  # forex quotes carry bid/ask
+                price = (float(tick["a"]) + float(tick["b"])) / 2
+            ts = float(tick.get("t", tick.get("ms", time.time() * 1000))) / 1000
+            volume = float(tick.get("v", tick.get("q", 0)) or 0)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.debug("Ignoring %s feed message %r: %r", feed, raw, e)
+            return
+
+        TICKS.inc(feed=feed)
+
+        for symbol, aggregators in symbols.items():
+            for interval, aggregator in aggregators.items():
+                candle = aggregator.add(ts, price, volume)
+                if candle is not None:
+                    self._spawn(self.on_candle(symbol, interval, candle))
+
+    async def _sweep(self) -> None:
+        """Closes candles that ended without a newer tick."""
+        while self._series:
+            now = time.time()
+            for codes in self._series.values():
+                for symbols in codes.values():
+                    for symbol, aggregators in symbols.items():
+                        for interval, aggregator in aggregators.items():
+                            candle = aggregator.close_due(now, self.settle)
+                            if candle is not None:
+                                self._spawn(self.on_candle(symbol, interval, candle))
+            await asyncio.sleep(1)
@@ -1,14 +1,225 @@
 import aiohttp
 import asyncio
-from config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
+import logging
+import time
+from config import (
+    TELEGRAM_BOT_TOKEN,
+    TELEGRAM_CHAT_ID,
+    TELEGRAM_GLOBAL_RATE,
+    TELEGRAM_CHAT_RATE,
+    TELEGRAM_MAX_CONNECTIONS,
+    TELEGRAM_MAX_RETRIES,
+)
+from typing import Optional, Union
+import metrics
+
+logger = logging.getLogger(__name__)
+
+ChatId = Union[int, str]
+
+# Telegram rejects messages longer than this
+MAX_MESSAGE_LENGTH = 4096
+
+SEND_SECONDS = metrics.histogram("telegram_send_seconds", "Telegram sendMessage latency")
+MESSAGES = metrics.counter("telegram_messages_total", "Telegram sends by outcome", ("result",))
+QUEUED = metrics.gauge("telegram_queued_messages", "Messages waiting to be sent")
+
+
+class TokenBucket:
+    """Allows `rate` events per second with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until an event is allowed."""
+        now = time.monotonic()
+        self._refill(now)
+        wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+        return max(wait, self._blocked_until - now)
+
+    def consume(self) -> None:
+        self._refill(time.monotonic())
+        self._tokens -= 1
+
+    def block(self, seconds: float) -> None:
+        """Holds all events back for `seconds` (e.g. Telegram's retry_after)."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
 
 
 class TelegramNotifier:
-    def __init__(self):
-        self.api_url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-
-    async def send_message(self, message: str):
-        payload = {"chat_id": TELEGRAM_CHAT_ID, "text": message}
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.api_url, data=payload) as response:
-                await response.text()  # Optional: handle or log response
+    """Sends bot messages through a queue over one long-lived HTTP session.
+
+    send_message() only enqueues. A background task sends the queue while
+    respecting a global and a per-chat token bucket. Messages that pile up
+    for a chat while it is rate limited are coalesced into one message, and
+    sends are retried on 429 (honouring retry_after), 5xx and network errors.
+    """
+
+    def __init__(
+        self,
+        token: str = TELEGRAM_BOT_TOKEN,
+        global_rate: float = TELEGRAM_GLOBAL_RATE,
+        chat_rate: float = TELEGRAM_CHAT_RATE,
+    ):
+        self.api_url = f"https://api.telegram.org/bot{token}/sendMessage"
+        self.chat_rate = chat_rate
+        self._global = TokenBucket(global_rate, capacity=global_rate)
+        self._chats: dict[ChatId, TokenBucket] = {}
+        self._pending: dict[ChatId, list[str]] = {}
+        self._retries: dict[ChatId, int] = {}
+        self._inflight: set[ChatId] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def send_message(self, message: str, chat_id: Optional[ChatId] = None) -> None:
+        """Queues a message for a chat (default: TELEGRAM_CHAT_ID)."""
+        chat_id = chat_id or TELEGRAM_CHAT_ID
+        pieces = [message[i : i + MAX_MESSAGE_LENGTH] for i in range(0, len(message), MAX_MESSAGE_LENGTH)]
+        self._pending.setdefault(chat_id, []).extend(pieces or [""])
+        QUEUED.set(sum(map(len, self._pending.values())))
+        self._wakeup.set()
+
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def flush(self, timeout: Optional[float] = None) -> None:
+        """Waits until every queued message has been sent or dropped."""
+
+        async def drained():
+            while self._pending or self._inflight:
+                await asyncio.sleep(0.05)
+
+        await asyncio.wait_for(drained(), timeout)
+
+    async def close(self, timeout: float = 10) -> None:
+        """Flushes the queue, then stops the sender and closes the session."""
+        try:
+            await self.flush(timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Dropping %d unsent Telegram messages", sum(map(len, self._pending.values())))
+
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        for task in list(self._tasks):
+            task.cancel()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _bucket(self, chat_id: ChatId) -> TokenBucket:
+        if chat_id not in self._chats:
+            self._chats[chat_id] = TokenBucket(self.chat_rate)
+        return self._chats[chat_id]
+
+    def _coalesce(self, chat_id: ChatId) -> str:
+        """Takes as many queued messages for a chat as fit into one Telegram message."""
+        queued = self._pending.pop(chat_id)
+        text = queued[0]
+        taken = 1
+        for message in queued[1:]:
+            if len(text) + 2 + len(message) > MAX_MESSAGE_LENGTH:
+                break
+            text = f"{text}\n\n{message}"
+            taken += 1
+        if taken < len(queued):
+            self._pending[chat_id] = queued[taken:]
+        QUEUED.set(sum(map(len, self._pending.values())))
+        return text
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            while True:
+                ready = [c for c in self._pending if c not in self._inflight]
+                if not ready or len(self._inflight) >= TELEGRAM_MAX_CONNECTIONS:
+                    break
+
+                waits = {c: self._bucket(c).wait_time() for c in ready}
+                chat_id = min(waits, key=waits.get)
+                wait = max(waits[chat_id], self._global.wait_time())
+                if wait > 0:
+                    # Messages arriving meanwhile are coalesced with the queued ones
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), wait)
+                        self._wakeup.clear()
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                self._bucket(chat_id).consume()
+                self._global.consume()
+                text = self._coalesce(chat_id)
+                self._inflight.add(chat_id)
+                task = asyncio.create_task(self._send(chat_id, text))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, chat_id: ChatId, text: str) -> None:
+        try:
+            retry_after = await self._post(chat_id, text)
+            if retry_after is None:
+                self._retries.pop(chat_id, None)
+                return
+
+            attempt = self._retries.get(chat_id, 0) + 1
+            if attempt > TELEGRAM_MAX_RETRIES:
+                MESSAGES.inc(result="dropped")
+                logger.error("Dropping Telegram message to %s after %d attempts", chat_id, attempt)
+                self._retries.pop(chat_id, None)
+                return
+
+            # Put the message back in front of anything queued since
+            MESSAGES.inc(result="retried")
+            self._retries[chat_id] = attempt
+            self._pending[chat_id] = [text] + self._pending.get(chat_id, [])
+            self._bucket(chat_id).block(retry_after)
+        finally:
+            self._inflight.discard(chat_id)
+            self._wakeup.set()
+
+    async def _post(self, chat_id: ChatId, text: str) -> Optional[float]:
+        """POSTs one message. Returns None when done, or seconds to wait before retrying."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30))
+
+        attempt = self._retries.get(chat_id, 0)
+        backoff = min(2**attempt, 60)
+        payload = {"chat_id": chat_id, "text": text}
+        try:
+            with SEND_SECONDS.time():
+                async with self._session.post(self.api_url, data=payload) as response:
+                    if response.status == 200:
+                        MESSAGES.inc(result="sent")
+                        return None
+
+                    body = await response.json(content_type=None)
+                    body = body if isinstance(body, dict) else {}
+                    if response.status == 429:
+                        retry_after = body.get("parameters", {}).get("retry_after", backoff)
+                        if retry_after > 1:
+                            # Long waits usually mean the bot-wide limit was hit
+                            self._global.block(retry_after)
+                        return float(retry_after)
+                    if response.status >= 500:
+                        return backoff
+
+                    MESSAGES.inc(result="rejected")
+                    logger.error("Telegram rejected message to %s (%s): %s", chat_id, response.status, body)
+                    return None
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            logger.warning("Telegram send to %s failed: %r", chat_id, e)
+            return backoff
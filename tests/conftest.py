@@ -0,0 +1,8 @@
+# conftest.py
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# Tests must not read or write the bot's saved state
+os.environ.setdefault("STATE_BACKEND", "memory")
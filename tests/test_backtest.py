@@ -0,0 +1,117 @@
+# test_backtest.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from backtest import simulate_trades, simulate_signals
+from strategy import StrategyFactory
+
+
+def reference_simulate_trades(df: pd.DataFrame, fee: float = 0.001) -> dict:
+    """The iterrows loop simulate_trades replaced, kept as the reference."""
+    df = df.copy()
+    df.dropna(subset=["close", "signal"], inplace=True)
+
+    trades = []
+    log = []
+    entry_price = None
+    in_position = False
+
+    timestamp_col = None
+    if "datetime" in df.columns:
+        timestamp_col = "datetime"
+    elif "date" in df.columns:
+        timestamp_col = "date"
+
+    for i, row in df.iterrows():
+        time = row[timestamp_col] if timestamp_col else str(i)
+        price = row["close"]
+        signal = row["signal"]
+
+        if signal == 1 and not in_position:
+            entry_price = price
+            in_position = True
+            log.append(f"BUY at {price:.2f} on {time}")
+
+        elif signal == -1 and in_position:
+            exit_price = price
+            pct_change = (exit_price - entry_price) / entry_price - fee
+            trades.append(pct_change)
+            log.append(f"SELL at {exit_price:.2f} on {time} (Return: {pct_change * 100:.2f}%)")
+            in_position = False
+            entry_price = None
+
+    total_return = sum(trades)
+    num_trades = len(trades)
+    wins = len([t for t in trades if t > 0])
+    losses = len([t for t in trades if t <= 0])
+    win_rate = wins / num_trades * 100 if num_trades > 0 else 0
+
+    data_points = len(df)
+    start_time = df[timestamp_col].iloc[0] if timestamp_col else None
+    end_time = df[timestamp_col].iloc[-1] if timestamp_col else None
+
+    return {
+        "trades": num_trades,
+        "total_return_pct": round(total_return * 100, 2),
+        "win_rate_pct": round(win_rate, 2),
+        "wins": wins,
+        "losses": losses,
+        "log": log,
+        "data_points": data_points,
+        "start_time": str(start_time),
+        "end_time": str(end_time),
+    }
+
+
+def random_frame(n: int, seed: int, time_col, nan_rate: float = 0.1) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    signal = rng.choice([-1.0, 0.0, 0.0, 1.0], n)
+    signal[rng.random(n) < nan_rate] = np.nan
+    close[rng.random(n) < nan_rate / 2] = np.nan
+    df = pd.DataFrame({"close": close, "signal": signal})
+    if time_col == "datetime":
+        df.insert(0, "datetime", pd.date_range("2024-01-02", periods=n, freq="min", tz="UTC"))
+    elif time_col == "date":
+        df.insert(0, "date", pd.date_range("2020-01-01", periods=n, freq="D", tz="UTC"))
+    else:
+        df.index = df.index * 3 + 7  # non-default labels show up in the log
+    return df
+
+
+def assert_same(result: dict, expected: dict) -> None:
+    assert {k: v for k, v in result.items() if k != "log"} == {k: v for k, v in expected.items() if k != "log"}
+    assert list(result["log"]) == expected["log"]
+
+
+@pytest.mark.parametrize("time_col", ["datetime", "date", None])
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_iterrows_loop(time_col, seed):
+    df = random_frame(300, seed, time_col)
+    assert_same(simulate_trades(df), reference_simulate_trades(df))
+
+
+def test_open_position_at_end():
+    df = random_frame(50, 1, "datetime", nan_rate=0)
+    df["signal"] = 0.0
+    df.loc[[3, 10, 30], "signal"] = [1.0, -1.0, 1.0]
+    result = simulate_trades(df)
+    assert result["trades"] == 1
+    assert len(result["log"]) == 3 and result["log"][-1].startswith("BUY")
+    assert_same(result, reference_simulate_trades(df))
+
+
+@pytest.mark.parametrize(
+    "signal",
+    [[], [np.nan] * 5, [0.0] * 5, [-1.0, -1.0, 0.0], [1.0, 1.0, 1.0], [1.0, np.nan, -1.0, -1.0, 1.0, 1.0]],
+)
+def test_edge_cases(signal):
+    df = pd.DataFrame({"close": np.linspace(10, 20, len(signal)), "signal": signal})
+    assert_same(simulate_trades(df), reference_simulate_trades(df))
+
+
+def test_simulate_signals_matches_signals_frame():
+    df = random_frame(500, 3, "datetime", nan_rate=0).drop(columns="signal")
+    strategy = StrategyFactory.create_strategy("sma", short_window=5, long_window=20)
+    assert_same(simulate_signals(strategy.compute_signals(df)), reference_simulate_trades(strategy.generate_signals(df)))
@@ -0,0 +1,63 @@
+# test_batch.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from evaluator import latest_signals_batch
+from strategy import StrategyFactory, close_panel
+
+STRATEGIES = {
+    "sma": {"short_window": 5, "long_window": 20},
+    "ema": {"short_span": 5, "long_span": 12},
+    "rsi": {"period": 7, "overbought": 60, "oversold": 40},
+    "macd": {},
+    "bbands": {"length": 10, "std": 1.0},
+}
+
+
+def random_series(count: int, seed: int) -> dict[str, pd.DataFrame]:
+    """Series of different lengths, ending at different times."""
+    rng = np.random.default_rng(seed)
+    series = {}
+    for i in range(count):
+        n = int(rng.integers(30, 1500))
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+        times = pd.date_range("2024-01-02", periods=n, freq="min", tz="UTC") + pd.Timedelta(minutes=i)
+        series[f"S{i}.US"] = pd.DataFrame({"datetime": times, "close": close})
+    return series
+
+
+def test_close_panel_aligns_series_on_their_latest_candle():
+    series = {
+        "A": pd.DataFrame({"close": [1.0, 2.0, 3.0]}),
+        "B": pd.DataFrame({"close": [10.0]}),
+        ("C", "h"): pd.DataFrame({"close": [5.0, 6.0]}),
+    }
+    panel = close_panel(series)
+    assert list(panel.columns) == ["A", "B", ("C", "h")]
+    np.testing.assert_array_equal(panel.to_numpy(), [[1, np.nan, np.nan], [2, np.nan, 5], [3, 10, 6]])
+    np.testing.assert_array_equal(close_panel(series, bars=2).to_numpy(), [[2, np.nan, 5], [3, 10, 6]])
+    assert close_panel({}).shape == (0, 0)
+
+
+@pytest.mark.parametrize("name", list(STRATEGIES))
+@pytest.mark.parametrize("seed", range(3))
+def test_matches_each_series_evaluated_alone(name, seed):
+    series = random_series(40, seed)
+    signals = latest_signals_batch({"config": (name, STRATEGIES[name], series)})["config"]
+    strategy = StrategyFactory.create_strategy(name, **STRATEGIES[name])
+    assert signals == {key: strategy.compute_signals(df).latest() for key, df in series.items()}
+
+
+def test_series_without_a_last_close_get_no_signal():
+    series = random_series(3, 7)
+    series["S1.US"].loc[len(series["S1.US"]) - 1, "close"] = np.nan
+    signals = StrategyFactory.create_strategy("sma", **STRATEGIES["sma"]).generate_signals_batch(close_panel(series))
+    assert signals["S1.US"] == 0
+
+
+def test_configs_are_kept_apart():
+    series = random_series(5, 8)
+    configs = {("sma", 1): ("sma", {"short_window": 2, "long_window": 3}, series), ("rsi", 2): ("rsi", {}, {})}
+    result = latest_signals_batch(configs)
+    assert set(result[("sma", 1)]) == set(series) and result[("rsi", 2)] == {}
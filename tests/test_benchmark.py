@@ -0,0 +1,39 @@
+# test_benchmark.py
+
+import json
+import os
+import subprocess
+import sys
+
+SCRIPT = os.path.join(os.path.dirname(__file__), "..", "scripts", "benchmark.py")
+
+
+def benchmark(*args: str) -> subprocess.CompletedProcess:
+    """Runs the benchmark script quickly: every suite once or a few times on 1k bars."""
+    return subprocess.run(
+        [sys.executable, SCRIPT, "--sizes", "1000", "--min-time", "0", *args], capture_output=True, text=True, timeout=120
+    )
+
+
+def test_runs_every_suite_and_compares_with_a_baseline(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    run = benchmark("--save", str(baseline))
+    assert run.returncode == 0, run.stderr
+    results = json.loads(baseline.read_text())
+    for prefix in ("generate_signals[", "indicators.", "simulate_trades", "simulate_portfolio[", "create_strategy", "analyse_market[", "parse["):
+        assert any(key.startswith(prefix) for key in results), prefix
+    assert all(r["runs"] >= 3 and 0 < r["min"] <= r["median"] for r in results.values())
+
+    # Slower than a baseline of near-zero timings is a regression
+    baseline.write_text(json.dumps({key: {**r, "median": 1e-12} for key, r in results.items()}))
+    run = benchmark("--suite", "parse", "--compare", str(baseline))
+    assert run.returncode == 1
+    assert "REGRESSION parse[csv]@1000" in run.stdout
+
+
+def test_memory_column():
+    run = benchmark("--suite", "parse", "--memory")
+    assert run.returncode == 0, run.stderr
+    header, *rows = run.stdout.splitlines()
+    assert header.split()[-2:] == ["peak", "MB"]
+    assert rows and all(float(row.split()[-1]) > 0 for row in rows)
@@ -0,0 +1,58 @@
+# test_bot.py
+
+import asyncio
+from types import SimpleNamespace
+import pytest
+import bot
+from state_store import SqliteStateStore
+from watchlist import Subscription, Watchlist
+
+CHANNEL = -100123
+
+
+@pytest.fixture
+def restart(tmp_path, monkeypatch):
+    """Runs warm_up against a watchlist loaded from the same database, as after a restart."""
+    monkeypatch.setattr(bot, "TELEGRAM_CHAT_ID", str(CHANNEL))
+    stores = []
+
+    def run() -> Watchlist:
+        if stores:
+            stores[-1].flush()
+        store = SqliteStateStore(str(tmp_path / "state.db"))
+        stores.append(store)
+        watchlist = Watchlist(store)
+        watchlist.load()
+        handlers = SimpleNamespace(watchlist=watchlist, schedule_jobs=lambda job_queue: None)
+
+        async def load_handlers():
+            return handlers
+
+        monkeypatch.setattr(bot, "load_handlers", load_handlers)
+        asyncio.run(bot.warm_up(SimpleNamespace(job_queue=None)))
+        return watchlist
+
+    yield run
+    for store in stores:
+        store._db.close()
+
+
+def test_first_run_watches_the_default_symbol(restart):
+    watchlist = restart()
+    assert [(s.symbol, s.interval) for s in watchlist.for_chat(CHANNEL)] == [(bot.DEFAULT_SYMBOL, bot.DEFAULT_INTERVAL)]
+
+
+def test_restart_keeps_the_channel_subscription_params(restart):
+    watchlist = restart()
+    watchlist.add(Subscription(CHANNEL, bot.DEFAULT_SYMBOL, bot.DEFAULT_INTERVAL, params={"short_window": 5}))
+
+    watchlist = restart()
+    assert [s.params for s in watchlist.for_chat(CHANNEL)] == [{"short_window": 5}]
+
+
+def test_unwatched_default_stays_removed_after_restart(restart):
+    watchlist = restart()
+    watchlist.remove(CHANNEL, bot.DEFAULT_SYMBOL)
+
+    watchlist = restart()
+    assert watchlist.for_chat(CHANNEL) == []
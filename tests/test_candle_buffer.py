@@ -0,0 +1,115 @@
+# test_candle_buffer.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from candle_buffer import COLUMNS, CandleBuffer
+
+T0 = pd.Timestamp("2024-01-02 14:30", tz="UTC")
+
+
+def bars(start: int, stop: int, offset: float = 0.0) -> pd.DataFrame:
+    """1m bars number `start` to `stop - 1`, with close = 100 + number + offset."""
+    close = np.arange(start, stop, dtype=np.float64) + 100 + offset
+    return pd.DataFrame(
+        {
+            "datetime": T0 + pd.to_timedelta(np.arange(start, stop), unit="min"),
+            "open": close - 0.5,
+            "high": close + 1,
+            "low": close - 1,
+            "close": close,
+            "volume": close * 1000,
+        }
+    )
+
+
+def assert_holds(buffer: CandleBuffer, expected: pd.DataFrame) -> None:
+    df = buffer.frame()
+    assert list(df.columns) == ["datetime", *COLUMNS]
+    assert df["datetime"].tolist() == expected["datetime"].tolist()
+    for col in COLUMNS:
+        np.testing.assert_array_equal(df[col].to_numpy(), expected[col].to_numpy(dtype=buffer.dtype))
+
+
+def test_float64_by_default():
+    buffer = CandleBuffer.from_frame(bars(0, 3), capacity=10)
+    assert buffer.dtype == np.float64
+    assert buffer.frame()["close"].dtype == np.float64
+    assert CandleBuffer(10, dtype="float32").dtype == np.float32
+
+
+@pytest.mark.parametrize("dtype", ["float64", "float32"])
+def test_extend_appends(dtype):
+    buffer = CandleBuffer.from_frame(bars(0, 10), capacity=100, dtype=dtype)
+    buffer.extend_frame(bars(10, 13))
+    assert len(buffer) == 13
+    assert buffer.last_time() == T0 + pd.Timedelta(minutes=12)
+    assert_holds(buffer, bars(0, 13))
+
+
+def test_extend_overlapping_bars_replaces_them():
+    buffer = CandleBuffer.from_frame(bars(0, 10), capacity=100)
+    # Re-fetched from bar 7: bars 7-9 changed, 10-11 are new
+    buffer.extend_frame(bars(7, 12, offset=0.25))
+    assert_holds(buffer, pd.concat([bars(0, 7), bars(7, 12, offset=0.25)], ignore_index=True))
+
+
+def test_replacing_the_last_bar():
+    buffer = CandleBuffer.from_frame(bars(0, 10), capacity=100)
+    frame = buffer.frame()
+
+    # The same forming candle again changes nothing and keeps the cached frame
+    buffer.extend_frame(bars(9, 10))
+    assert buffer.frame() is frame
+
+    buffer.extend_frame(bars(9, 10, offset=0.5))
+    assert len(buffer) == 10
+    assert buffer.frame() is not frame
+    assert buffer.column("close")[-1] == 109.5
+    assert_holds(buffer, pd.concat([bars(0, 9), bars(9, 10, offset=0.5)], ignore_index=True))
+
+
+def test_sliding_window_keeps_newest_bars():
+    buffer = CandleBuffer.from_frame(bars(0, 4), capacity=5)
+    for i in range(4, 40):
+        buffer.extend_frame(bars(i, i + 1))
+        assert len(buffer) == min(i + 1, 5)
+    assert_holds(buffer, bars(35, 40))
+    # The arrays are reused while they have room, not grown per bar
+    assert buffer.nbytes <= (5 + 16) * (8 + 5 * 8)
+
+    # One extend longer than the capacity keeps its newest bars
+    buffer.extend_frame(bars(40, 60))
+    assert_holds(buffer, bars(55, 60))
+
+
+def test_views_stay_valid_after_extend():
+    buffer = CandleBuffer.from_frame(bars(0, 10), capacity=12)
+    arrays = buffer.arrays()
+    frame = buffer.frame()
+    before = {col: np.array(values) for col, values in arrays.items()}
+    frame_before = frame.copy()
+
+    # Replace the last bar, append past the spare room and slide the window
+    buffer.extend_frame(bars(9, 10, offset=0.5))
+    buffer.extend_frame(bars(10, 30))
+
+    for col, values in arrays.items():
+        np.testing.assert_array_equal(values, before[col])
+        assert not values.flags.writeable
+    pd.testing.assert_frame_equal(frame, frame_before)
+    assert_holds(buffer, bars(18, 30))
+
+
+def test_missing_columns_are_nan():
+    buffer = CandleBuffer(10)
+    buffer.extend_frame(bars(0, 3)[["datetime", "close"]])
+    assert np.isnan(buffer.column("volume")).all()
+    np.testing.assert_array_equal(buffer.column("close"), [100, 101, 102])
+
+
+def test_extend_frame_with_second_resolution_times():
+    df = bars(0, 3)
+    df["datetime"] = df["datetime"].astype("datetime64[s, UTC]")
+    buffer = CandleBuffer.from_frame(df, capacity=10)
+    assert buffer.times.tolist() == [(T0 + pd.Timedelta(minutes=i)).value for i in range(3)]
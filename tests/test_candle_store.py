@@ -0,0 +1,98 @@
+# test_candle_store.py
+
+import asyncio
+import numpy as np
+import pandas as pd
+import pytest
+import candle_store
+from candle_store import CandleStore
+
+T0 = pd.Timestamp("2024-01-02 14:30", tz="UTC")
+
+
+def bars(start: int, stop: int, offset: float = 0.0) -> pd.DataFrame:
+    """1m bars number `start` to `stop - 1`, with close = 100 + number + offset."""
+    close = np.arange(start, stop, dtype=np.float64) + 100 + offset
+    return pd.DataFrame(
+        {
+            "datetime": T0 + pd.to_timedelta(np.arange(start, stop), unit="min"),
+            "open": close,
+            "high": close,
+            "low": close,
+            "close": close,
+            "volume": close,
+        }
+    )
+
+
+@pytest.fixture
+def eodhd(monkeypatch):
+    """Stands in for AsyncDataFetcher; tests append the frames EODHD answers with, in order."""
+    responses, requests = [], []
+
+    class Fetcher:
+        def __init__(self, symbol, interval):
+            self.series = (symbol, interval)
+
+        async def fetch_ohlc(self, start=None):
+            requests.append((*self.series, start))
+            return responses.pop(0)
+
+    monkeypatch.setattr(candle_store, "AsyncDataFetcher", Fetcher)
+    return responses, requests
+
+
+def test_fetches_only_bars_from_the_last_one(eodhd):
+    responses, requests = eodhd
+    store = CandleStore(max_bars=100)
+    # The forming last candle comes back updated along with a new one
+    responses += [bars(0, 10), bars(9, 11, offset=0.5)]
+
+    async def run():
+        return await store.get("AAPL.US", "1m"), await store.get("AAPL.US", "1m")
+
+    first, second = asyncio.run(run())
+    assert requests == [("AAPL.US", "1m", None), ("AAPL.US", "1m", (T0 + pd.Timedelta(minutes=9)).to_pydatetime())]
+    assert len(first) == 10 and first["close"].iloc[-1] == 109
+    assert len(second) == 11
+    assert second["close"].tolist()[-3:] == [108, 109.5, 110.5]
+
+
+def test_keeps_at_most_max_bars(eodhd):
+    responses, _ = eodhd
+    store = CandleStore(max_bars=8)
+    responses += [bars(0, 10), bars(9, 12)]
+
+    async def run():
+        await store.get("AAPL.US", "1m")
+        return await store.get("AAPL.US", "1m")
+
+    df = asyncio.run(run())
+    assert df["close"].tolist() == [104, 105, 106, 107, 108, 109, 110, 111]
+
+
+def test_add_bars_loads_history_first(eodhd):
+    responses, requests = eodhd
+    store = CandleStore(max_bars=100)
+    responses.append(bars(0, 10))
+    df = asyncio.run(store.add_bars("AAPL.US", "1m", bars(8, 12, offset=0.25)))
+    assert len(requests) == 1
+    assert df["close"].tolist()[-5:] == [107, 108.25, 109.25, 110.25, 111.25]
+
+
+def test_series_are_kept_apart_and_dropped(eodhd):
+    responses, requests = eodhd
+    store = CandleStore(max_bars=100)
+    responses += [bars(0, 5), bars(0, 3), bars(0, 4)]
+
+    async def run():
+        a = await store.get("AAPL.US", "1m")
+        b = await store.get("MSFT.US", "1m")
+        store.drop("AAPL.US", "1m")
+        return a, b, await store.get("AAPL.US", "1m")
+
+    a, b, reloaded = asyncio.run(run())
+    assert (len(a), len(b), len(reloaded)) == (5, 3, 4)
+    # After drop() the whole history is downloaded again
+    assert [r[2] for r in requests] == [None, None, None]
+    assert store.nbytes() > 0
@@ -0,0 +1,124 @@
+# test_compute.py
+
+import asyncio
+import threading
+import pytest
+from compute import ComputeBusy, ComputePool, JobCancelled
+
+
+def blocking(release: threading.Event) -> str:
+    release.wait(5)
+    return "done"
+
+
+def until_cancelled(cancel: threading.Event) -> None:
+    cancel.wait(5)
+    raise JobCancelled("stopped")
+
+
+async def settle(pool: ComputePool) -> None:
+    """Waits until the workers' done callbacks have freed their slots."""
+    for _ in range(500):
+        if not pool.pending():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("jobs still pending")
+
+
+def test_user_limit_rejects_only_that_user():
+    async def main():
+        pool = ComputePool(threads=4, max_pending=4, user_limit=1)
+        release = threading.Event()
+        first = asyncio.create_task(pool.run(blocking, release, user=1))
+        await asyncio.sleep(0)
+        with pytest.raises(ComputeBusy):
+            await pool.run(blocking, release, user=1)
+        other = asyncio.create_task(pool.run(blocking, release, user=2))
+        await asyncio.sleep(0)
+        assert pool.pending(1) == 1 and pool.pending(2) == 1
+        release.set()
+        assert await first == await other == "done"
+        await settle(pool)
+        pool.shutdown()
+
+    asyncio.run(main())
+
+
+def test_full_queue_rejects_users_and_queues_background_jobs():
+    async def main():
+        pool = ComputePool(threads=2, max_pending=1, user_limit=5)
+        release = threading.Event()
+        first = asyncio.create_task(pool.run(blocking, release, user=1))
+        await asyncio.sleep(0.01)
+        with pytest.raises(ComputeBusy):
+            await pool.run(blocking, release, user=2)
+
+        background = asyncio.create_task(pool.run(lambda: "background", wait=True))
+        await asyncio.sleep(0.05)
+        assert not background.done()
+        release.set()
+        assert await first == "done"
+        assert await background == "background"
+        await settle(pool)
+        pool.shutdown()
+
+    asyncio.run(main())
+
+
+def test_cancel_stops_running_and_queued_jobs():
+    async def main():
+        pool = ComputePool(threads=2, max_pending=1, user_limit=5)
+        running = asyncio.create_task(pool.run(until_cancelled, user=1, cancellable=True))
+        await asyncio.sleep(0.01)
+        calls = []
+        queued = asyncio.create_task(pool.run(calls.append, 1, user=1, wait=True))
+        await asyncio.sleep(0.01)
+
+        assert pool.cancel(1) == 2
+        with pytest.raises(JobCancelled):
+            await running
+        with pytest.raises(JobCancelled):
+            await queued
+        await settle(pool)
+        # The queued job got its slot only after the running one stopped, and never ran
+        assert calls == []
+        assert not pool._slots.locked()
+        pool.shutdown()
+
+    asyncio.run(main())
+
+
+def test_failed_job_frees_its_slot():
+    def fail():
+        raise ValueError("bad data")
+
+    async def main():
+        pool = ComputePool(threads=1, max_pending=1, user_limit=1)
+        with pytest.raises(ValueError):
+            await pool.run(fail, user=1)
+        await settle(pool)
+        assert await pool.run(lambda: 42, user=1) == 42
+        pool.shutdown()
+
+    asyncio.run(main())
+
+
+def test_failed_submit_frees_its_slot(monkeypatch):
+    async def main():
+        pool = ComputePool(threads=1, max_pending=1, user_limit=1)
+        assert await pool.run(lambda: 1) == 1
+        await settle(pool)
+
+        def submit(*args, **kwargs):
+            raise RuntimeError("cannot schedule new futures after shutdown")
+
+        monkeypatch.setattr(pool._thread_pool, "submit", submit)
+        with pytest.raises(RuntimeError):
+            await pool.run(lambda: 2, user=1)
+        assert pool.pending() == 0
+        assert not pool._slots.locked()
+        monkeypatch.undo()
+        assert await pool.run(lambda: 3, user=1) == 3
+        pool.shutdown()
+
+    asyncio.run(main())
@@ -0,0 +1,168 @@
+# test_data_fetcher.py
+
+import asyncio
+from types import SimpleNamespace
+import pandas as pd
+import pytest
+from aiohttp import web
+import data_fetcher
+from data_fetcher import AsyncDataFetcher, close_session
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Records the backoff delays of AsyncDataFetcher without waiting them out."""
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(data_fetcher, "asyncio", SimpleNamespace(**{**vars(asyncio), "sleep": sleep}))
+    monkeypatch.setattr(data_fetcher, "EODHD_RETRY_BACKOFF", 0.5)
+    monkeypatch.setattr(data_fetcher, "EODHD_MAX_RETRIES", 3)
+    return delays
+
+
+def serve(monkeypatch, handler, *checks):
+    """Runs `checks` (coroutine functions) against a local server standing in for EODHD."""
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/{path:.*}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        monkeypatch.setattr(data_fetcher, "EODHD_API_URL", f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}")
+        try:
+            return [await check() for check in checks]
+        finally:
+            await close_session()
+            await runner.cleanup()
+
+    return asyncio.run(run())
+
+
+def answers(*responses):
+    """A handler answering with the given (status, headers) in turn, then 200."""
+    calls = []
+
+    async def handler(request):
+        calls.append(request.path)
+        status, headers = responses[len(calls) - 1] if len(calls) <= len(responses) else (200, {})
+        return web.Response(status=status, headers=headers, body=b'{"close": 1.5}' if status == 200 else b"error")
+
+    return handler, calls
+
+
+def test_retries_server_errors_with_backoff(monkeypatch, sleeps):
+    handler, calls = answers((503, {}), (500, {}))
+    [price] = serve(monkeypatch, handler, AsyncDataFetcher("AAPL.US").fetch_price)
+    assert price == 1.5
+    assert len(calls) == 3
+    assert sleeps == [0.5, 1.0]
+
+
+def test_rate_limit_waits_for_retry_after(monkeypatch, sleeps):
+    handler, calls = answers((429, {"Retry-After": "7"}))
+    [price] = serve(monkeypatch, handler, AsyncDataFetcher("AAPL.US").fetch_price)
+    assert price == 1.5
+    assert sleeps == [7.0]
+
+
+def test_client_errors_are_not_retried(monkeypatch, sleeps):
+    handler, calls = answers((404, {}))
+    [price] = serve(monkeypatch, handler, AsyncDataFetcher("NOPE.US").fetch_price)
+    assert price is None
+    assert len(calls) == 1 and sleeps == []
+
+
+def test_gives_up_after_max_retries(monkeypatch, sleeps):
+    handler, calls = answers(*[(502, {})] * 10)
+    fetcher = AsyncDataFetcher("AAPL.US", "d")
+    failed, empty = serve(monkeypatch, handler, fetcher.try_fetch_ohlc, fetcher.fetch_ohlc)
+    assert failed is None and empty.empty
+    assert len(calls) == 2 * 4
+    assert sleeps == [0.5, 1.0, 2.0] * 2
+
+
+def test_connection_errors_are_retried(monkeypatch, sleeps):
+    async def check():
+        # Nothing listens on port 9 (discard) here
+        monkeypatch.setattr(data_fetcher, "EODHD_API_URL", "http://127.0.0.1:9")
+        try:
+            return await AsyncDataFetcher("AAPL.US").fetch_price()
+        finally:
+            await close_session()
+
+    assert asyncio.run(check()) is None
+    assert sleeps == [0.5, 1.0, 2.0]
+
+
+def test_concurrent_requests_are_capped(monkeypatch):
+    monkeypatch.setattr(data_fetcher, "EODHD_MAX_CONNECTIONS", 2)
+    active = [0, 0]  # current, peak
+
+    async def handler(request):
+        active[0] += 1
+        active[1] = max(active)
+        await asyncio.sleep(0.02)
+        active[0] -= 1
+        return web.json_response({"close": 1.0})
+
+    async def many():
+        return await asyncio.gather(*(AsyncDataFetcher(f"S{i}.US").fetch_price() for i in range(8)))
+
+    [prices] = serve(monkeypatch, handler, many)
+    assert prices == [1.0] * 8
+    assert active[1] == 2
+
+
+INTRADAY_CSV = b"""Timestamp,Gmtoffset,Datetime,Open,High,Low,Close,Volume
+1704205800,0,"2024-01-02 14:30:00",187.15,188.44,186.5,187.9,1000
+1704205860,0,"2024-01-02 14:31:00",187.9,188.0,,187.7,1200
+1704205920,0,"2024-01-02 14:32:00",187.7,187.8,187.2,187.3,900
+"""
+
+INTRADAY_JSON = [
+    {"timestamp": 1704205800, "gmtoffset": 0, "datetime": "2024-01-02 14:30:00", "open": 187.15, "high": 188.44, "low": 186.5, "close": 187.9, "volume": 1000},
+    {"timestamp": 1704205860, "gmtoffset": 0, "datetime": "2024-01-02 14:31:00", "open": 187.9, "high": 188.0, "low": None, "close": 187.7, "volume": 1200},
+    {"timestamp": 1704205920, "gmtoffset": 0, "datetime": "2024-01-02 14:32:00", "open": 187.7, "high": 187.8, "low": 187.2, "close": 187.3, "volume": 900},
+]
+
+EOD_CSV = b"""Date,Open,High,Low,Close,Adjusted_close,Volume
+2024-01-02,187.15,188.44,183.89,185.64,184.94,82488700
+2024-01-03,184.22,185.88,183.43,184.25,183.55,58414500
+"""
+
+
+def test_csv_parses_like_json():
+    csv = data_fetcher._from_csv(INTRADAY_CSV)
+    expected = data_fetcher._to_dataframe(INTRADAY_JSON).reset_index(drop=True)
+    # Rows with a missing value are dropped, as from the JSON payload
+    assert len(csv) == 2
+    pd.testing.assert_frame_equal(csv, expected, check_dtype=False)
+    assert str(csv["datetime"].dtype).startswith("datetime64") and str(csv["datetime"].dt.tz) == "UTC"
+
+    eod = data_fetcher._from_csv(EOD_CSV)
+    assert list(eod.columns) == ["date", "open", "high", "low", "close", "adjusted_close", "volume"]
+    assert eod["date"].tolist() == [pd.Timestamp("2024-01-02", tz="UTC"), pd.Timestamp("2024-01-03", tz="UTC")]
+
+
+def test_csv_without_bars():
+    assert data_fetcher._from_csv(b"").empty
+    assert data_fetcher._from_csv(b"Value\nTicker not found\n").empty
+    assert data_fetcher._from_csv(b"Timestamp,Gmtoffset,Datetime,Open,High,Low,Close,Volume\n").empty
+
+
+def test_fetch_ohlc_requests_csv(monkeypatch):
+    queries = []
+
+    async def handler(request):
+        queries.append((request.path, dict(request.query)))
+        return web.Response(body=INTRADAY_CSV if "intraday" in request.path else EOD_CSV)
+
+    intraday, eod = serve(monkeypatch, handler, AsyncDataFetcher("AAPL.US", "h").fetch_ohlc, AsyncDataFetcher("AAPL.US", "d").fetch_ohlc)
+    assert len(intraday) == 2 and len(eod) == 2
+    assert [(path, query["fmt"]) for path, query in queries] == [("/intraday/AAPL.US", "csv"), ("/eod/AAPL.US", "csv")]
+    assert queries[0][1]["interval"] == "1h" and queries[1][1]["period"] == "d"
@@ -0,0 +1,86 @@
+# test_indicator_cache.py
+
+import numpy as np
+import pandas as pd
+from strategy.indicator_cache import IndicatorCache
+
+
+def frame(n: int, last_close: float = 100.0) -> pd.DataFrame:
+    close = np.linspace(50, last_close, n)
+    return pd.DataFrame({"datetime": pd.date_range("2024-01-02", periods=n, freq="min", tz="UTC"), "close": close})
+
+
+def counting(values: np.ndarray):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return values.copy()
+
+    return compute, calls
+
+
+def test_hits_on_the_same_frame_only():
+    cache = IndicatorCache(max_bytes=2**20)
+    df = frame(100)
+    compute, calls = counting(np.arange(100.0))
+    first = cache.indicator(df, "sma", compute, window=5)
+    assert cache.indicator(df, "sma", compute, window=5) is first
+    assert not first.flags.writeable
+    assert len(calls) == 1
+
+    cache.indicator(df, "sma", compute, window=6)
+    cache.indicator(df.copy(), "sma", compute, window=5)
+    assert len(calls) == 3
+
+
+def test_last_bar_changed_in_place_is_a_miss():
+    cache = IndicatorCache(max_bytes=2**20)
+    df = frame(100)
+    compute, calls = counting(np.arange(100.0))
+    cache.indicator(df, "rsi", compute, length=14)
+    df.loc[99, "close"] = 1.0
+    cache.indicator(df, "rsi", compute, length=14)
+    df.loc[99, "close"] = np.nan
+    cache.indicator(df, "rsi", compute, length=14)
+    cache.indicator(df, "rsi", compute, length=14)
+    assert len(calls) == 3
+
+
+def test_reused_id_of_a_freed_frame_is_a_miss():
+    cache = IndicatorCache(max_bytes=2**20)
+    df = frame(10)
+    key = (id(df), "ema")
+    cache.get(key, lambda: np.zeros(10), source=df)
+    del df
+    other = frame(10)
+    # Same key as if `other` had been given the freed frame's id
+    assert cache.get(key, lambda: np.ones(10), source=other)[0] == 1
+    assert cache.get(key, lambda: np.full(10, 2.0), source=other)[0] == 1
+
+
+def test_bounded_by_bytes():
+    # Room for two 800-byte arrays, or one bbands-like dict of five
+    cache = IndicatorCache(max_bytes=2000)
+    df = frame(100)
+    for window in range(5):
+        cache.indicator(df, "sma", lambda: np.zeros(100), window=window)
+    assert len(cache) == 2 and cache.nbytes == 1600
+    # The least recently used go first
+    assert [key[2] for key in cache._entries] == [(("window", 3),), (("window", 4),)]
+
+    bands = cache.indicator(df, "bbands", lambda: {c: np.zeros(100) for c in "abcde"}, length=20)
+    assert len(bands) == 5
+    assert cache.nbytes <= 2000 and all(key[1] != "bbands" for key in cache._entries)
+
+    cache.clear()
+    assert len(cache) == 0 and cache.nbytes == 0
+
+
+def test_disabled_cache_always_computes():
+    cache = IndicatorCache(max_bytes=0)
+    compute, calls = counting(np.arange(3.0))
+    df = frame(3)
+    cache.indicator(df, "sma", compute, window=2)
+    cache.indicator(df, "sma", compute, window=2)
+    assert len(calls) == 2 and len(cache) == 0
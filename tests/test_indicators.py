@@ -0,0 +1,182 @@
+# test_indicators.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from strategy import indicators
+
+N = 600
+# Leading NaN rows per column: none, a few, past the longest window, all
+LEADING = [0, 3, 40, N]
+
+
+def random_walk(rng, shape) -> np.ndarray:
+    return 100 + np.cumsum(rng.normal(0, 1, shape), axis=0)
+
+
+def single_column() -> np.ndarray:
+    return random_walk(np.random.default_rng(1), N)
+
+
+def multi_column() -> np.ndarray:
+    x = random_walk(np.random.default_rng(2), (N, len(LEADING)))
+    for j, lead in enumerate(LEADING):
+        x[:lead, j] = np.nan
+    return x
+
+
+def same_start() -> np.ndarray:
+    x = random_walk(np.random.default_rng(3), (N, 3))
+    x[:7] = np.nan
+    return x
+
+
+INPUTS = [single_column, multi_column, same_start]
+
+
+@pytest.fixture(params=[False, True], ids=["numpy", "loop"])
+def jit(request, monkeypatch):
+    """Runs a test with the NumPy kernels and with the loop kernels (plain Python without Numba)."""
+    monkeypatch.setattr(indicators, "JIT", request.param)
+    return request.param
+
+
+def per_column(fn, x: np.ndarray) -> np.ndarray:
+    """Applies a Series -> Series reference to each column of `x`."""
+    columns = x.reshape(len(x), -1).T
+    out = np.column_stack([fn(pd.Series(col)).to_numpy(dtype=np.float64) for col in columns])
+    return out if x.ndim == 2 else out.reshape(-1)
+
+
+# pandas_ta equivalents
+
+
+def ref_ema(s: pd.Series, length: int) -> pd.Series:
+    """pandas_ta.ema with presma: EWM (adjust=False) seeded with the SMA of the first `length` values."""
+    valid = np.flatnonzero(s.notna())
+    if not len(valid) or len(s) - valid[0] < length:
+        return pd.Series(np.nan, index=s.index)
+    head = s.iloc[valid[0] :].copy()
+    seed = head.iloc[:length].mean()
+    head.iloc[: length - 1] = np.nan
+    head.iloc[length - 1] = seed
+    return head.ewm(span=length, adjust=False).mean().reindex(s.index)
+
+
+def ref_rma(s: pd.Series, length: int) -> pd.Series:
+    return s.ewm(alpha=1 / length, min_periods=length).mean()
+
+
+def ref_rsi(s: pd.Series, length: int) -> pd.Series:
+    change = s.diff()
+    gains = ref_rma(change.clip(lower=0), length)
+    losses = ref_rma(change.clip(upper=0).abs(), length)
+    return 100 * gains / (gains + losses)
+
+
+def ref_macd(s: pd.Series, fast: int, slow: int, signal: int) -> tuple[pd.Series, pd.Series]:
+    line = ref_ema(s, fast) - ref_ema(s, slow)
+    first = line.first_valid_index()
+    signal_line = pd.Series(np.nan, index=s.index) if first is None else ref_ema(line.loc[first:], signal)
+    return line, signal_line.reindex(s.index)
+
+
+@pytest.mark.parametrize("make", INPUTS)
+@pytest.mark.parametrize("window,min_periods", [(1, None), (20, None), (20, 5)])
+def test_sma(jit, make, window, min_periods):
+    x = make()
+    expected = per_column(lambda s: s.rolling(window, min_periods=min_periods).mean(), x)
+    np.testing.assert_allclose(indicators.sma(x, window, min_periods), expected, rtol=1e-10, atol=1e-10)
+
+
+@pytest.mark.parametrize("min_periods", [None, 1, 15])
+def test_sma_with_gaps(jit, min_periods):
+    x = multi_column()
+    rng = np.random.default_rng(4)
+    x[rng.random(x.shape) < 0.1] = np.nan
+    x[100:130, 0] = np.nan  # a gap longer than the window
+    expected = per_column(lambda s: s.rolling(20, min_periods=min_periods).mean(), x)
+    np.testing.assert_allclose(indicators.sma(x, 20, min_periods), expected, rtol=1e-10, atol=1e-10)
+
+
+@pytest.mark.parametrize("make", INPUTS)
+@pytest.mark.parametrize("length", [1, 12, 50])
+def test_ema(jit, make, length):
+    x = make()
+    np.testing.assert_allclose(indicators.ema(x, length), per_column(lambda s: ref_ema(s, length), x), rtol=1e-10)
+
+
+@pytest.mark.parametrize("make", INPUTS)
+@pytest.mark.parametrize("length", [1, 14, 50])
+def test_rma(jit, make, length):
+    x = make()
+    np.testing.assert_allclose(indicators.rma(x, length), per_column(lambda s: ref_rma(s, length), x), rtol=1e-10)
+
+
+@pytest.mark.parametrize("make", INPUTS)
+def test_rsi(jit, make):
+    x = make()
+    np.testing.assert_allclose(indicators.rsi(x, 14), per_column(lambda s: ref_rsi(s, 14), x), rtol=1e-9)
+
+
+@pytest.mark.parametrize("make", INPUTS)
+def test_macd(jit, make):
+    x = make()
+    line, signal_line, hist = indicators.macd(x, 26, 12, 9)
+    expected_line = per_column(lambda s: ref_macd(s, 12, 26, 9)[0], x)
+    expected_signal = per_column(lambda s: ref_macd(s, 12, 26, 9)[1], x)
+    np.testing.assert_allclose(line, expected_line, rtol=1e-9, atol=1e-10)
+    np.testing.assert_allclose(signal_line, expected_signal, rtol=1e-9, atol=1e-10)
+    np.testing.assert_allclose(hist, expected_line - expected_signal, rtol=1e-9, atol=1e-10)
+
+
+@pytest.mark.parametrize("make", INPUTS)
+@pytest.mark.parametrize("length", [1, 20])
+def test_bbands(jit, make, length):
+    x = make()
+    lower, mid, upper = indicators.bbands(x, length, 2)
+    expected_mid = per_column(lambda s: s.rolling(length).mean(), x)
+    expected_std = per_column(lambda s: s.rolling(length).std(ddof=0), x)
+    np.testing.assert_allclose(mid, expected_mid, rtol=1e-10)
+    np.testing.assert_allclose(lower, expected_mid - 2 * expected_std, rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(upper, expected_mid + 2 * expected_std, rtol=1e-9, atol=1e-9)
+
+
+def test_mean_std_numpy_matches_loop():
+    x = multi_column()
+    x[:, 0] *= 1e6  # large values, where one-pass formulas lose precision
+    for length in (1, 2, 20, N + 1):
+        mean, std = indicators._mean_std_numpy(x, length)
+        ref_mean, ref_std = indicators._mean_std_loop(x, length)
+        np.testing.assert_allclose(mean, ref_mean, rtol=1e-12)
+        np.testing.assert_allclose(std, ref_std, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("decay", [0.0, 0.5, 0.9, 0.999])
+def test_recurrence_matches_loop(decay):
+    rng = np.random.default_rng(5)
+    u = rng.normal(0, 1, (N, 4))
+    start = np.array([0, 3, 250, N])
+    expected = np.full_like(u, np.nan)
+    for j, s in enumerate(start):
+        y = 0.0
+        for t in range(s, N):
+            y = decay * y + u[t, j]
+            expected[t, j] = y
+    # With decay 0.5 the rows are solved in blocks of about 200, so the carry between blocks is covered
+    np.testing.assert_allclose(indicators._recurrence(u, decay, start), expected, rtol=1e-9, atol=1e-12)
+
+
+@pytest.mark.parametrize("length", [2, 14])
+def test_rma_numpy_matches_loop(length):
+    x = multi_column()
+    np.testing.assert_allclose(indicators._rma_numpy(x, length), indicators._rma_loop(x, length), rtol=1e-10)
+
+
+@pytest.mark.parametrize("min_periods", [1, 20])
+def test_sma_numpy_matches_loop_with_gaps(min_periods):
+    x = multi_column()
+    x[np.random.default_rng(6).random(x.shape) < 0.2] = np.nan
+    np.testing.assert_allclose(
+        indicators._sma_numpy(x, 20, min_periods), indicators._sma_loop(x, 20, min_periods), rtol=1e-10, atol=1e-10
+    )
@@ -0,0 +1,31 @@
+# test_market_calendar.py
+
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+import pytest
+from market_calendar import is_trading
+
+NEW_YORK = ZoneInfo("America/New_York")
+
+
+def trades_on(day: str) -> bool:
+    start = datetime.fromisoformat(day).replace(hour=10, tzinfo=NEW_YORK)
+    return is_trading("AAPL.US", start, start + timedelta(hours=1))
+
+
+@pytest.mark.parametrize(
+    "day, open_",
+    [
+        ("2021-12-31", True),  # Jan 1 2022 is a Saturday; not observed on the Friday before
+        ("2027-12-31", True),
+        ("2022-01-03", True),
+        ("2023-01-02", False),  # Jan 1 on a Sunday moves to Monday
+        ("2026-01-01", False),
+        ("2021-12-24", False),  # Christmas on a Saturday is observed on Friday
+        ("2021-07-05", False),
+        ("2024-11-28", False),
+        ("2024-11-29", True),
+    ],
+)
+def test_nyse_holidays(day, open_):
+    assert trades_on(day) is open_
@@ -0,0 +1,80 @@
+# test_metrics.py
+
+import asyncio
+import math
+import aiohttp
+import pytest
+import metrics
+from metrics import Registry
+
+
+def test_render_exposition_format():
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests", ("status",))
+    requests.inc(status="200")
+    requests.inc(2, status='5"xx')
+    registry.gauge("queued", "Queued items", function=lambda: 3)
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        latency.observe(value)
+
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests",
+        "# TYPE requests_total counter",
+        'requests_total{status="200"} 1.0',
+        'requests_total{status="5\\"xx"} 2.0',
+        "# HELP queued Queued items",
+        "# TYPE queued gauge",
+        "queued 3.0",
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 1.0',
+        'latency_seconds_bucket{le="1.0"} 3.0',
+        'latency_seconds_bucket{le="+Inf"} 4.0',
+        "latency_seconds_sum 6.05",
+        "latency_seconds_count 4.0",
+    ]
+
+
+def test_histogram_quantiles_and_summary():
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Latency", ("op",), buckets=(0.1, 1.0))
+    assert math.isnan(latency.quantile(0.5, op="get"))
+    for _ in range(10):
+        with latency.time(op="get"):
+            pass
+    latency.observe(0.5, op="get")
+    assert latency.count(op="get") == 11
+    # 10 of 11 observations are in the first bucket, interpolated from 0
+    assert latency.quantile(0.5, op="get") == pytest.approx(0.1 * 5.5 / 10)
+    assert latency.quantile(0.99, op="get") > 0.1
+    [line] = registry.summary()
+    assert line.startswith('latency_seconds{op="get"}: n=11 avg=')
+
+
+def test_registration_is_shared_and_checked():
+    registry = Registry()
+    counter = registry.counter("events_total", "Events", ("kind",))
+    assert registry.counter("events_total", "Events", ("kind",)) is counter
+    with pytest.raises(ValueError):
+        registry.gauge("events_total", "Events")
+    with pytest.raises(ValueError):
+        counter.inc(other="x")
+
+
+def test_exporter_serves_the_registry():
+    metrics.counter("test_exporter_total", "Exporter test").inc()
+
+    async def scrape():
+        runner = await metrics.start_exporter(0, host="127.0.0.1")
+        port = next(iter(runner.sites))._server.sockets[0].getsockname()[1]
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"http://127.0.0.1:{port}/metrics") as response:
+                    return response.headers["Content-Type"], await response.text()
+        finally:
+            await runner.cleanup()
+
+    content_type, body = asyncio.run(scrape())
+    assert content_type.startswith("text/plain; version=0.0.4")
+    assert "test_exporter_total 1.0" in body.splitlines()
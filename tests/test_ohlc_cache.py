@@ -0,0 +1,135 @@
+# test_ohlc_cache.py
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import pytz
+import pytest
+import ohlc_cache
+from ohlc_cache import OhlcCache
+
+T0 = datetime(2024, 1, 2, tzinfo=pytz.UTC)
+
+
+def bars(start: datetime, end: datetime) -> pd.DataFrame:
+    times = pd.date_range(start, end, freq="h", tz="UTC")
+    close = np.arange(len(times), dtype=float) + 100
+    return pd.DataFrame({"datetime": times, "open": close, "high": close, "low": close, "close": close, "volume": 1.0})
+
+
+class FakeFetcher:
+    """Stands in for AsyncDataFetcher; `fail` makes every request fail."""
+
+    fail = False
+    requests: list = []
+
+    def __init__(self, symbol, interval):
+        pass
+
+    async def try_fetch_ohlc(self, start=None, end=None):
+        FakeFetcher.requests.append((start, end))
+        return None if FakeFetcher.fail else bars(start, end)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(ohlc_cache, "AsyncDataFetcher", FakeFetcher)
+    FakeFetcher.fail = False
+    FakeFetcher.requests = []
+    return OhlcCache(root=str(tmp_path), max_bytes=2**30)
+
+
+def fetch(cache, start, end):
+    return asyncio.run(cache.fetch_ohlc("AAPL.US", "h", start, end))
+
+
+def test_failed_head_and_tail_leave_coverage_unchanged(cache):
+    fetch(cache, T0 + timedelta(days=2), T0 + timedelta(days=4))
+    covered = cache.coverage("AAPL.US", "h")
+
+    FakeFetcher.fail = True
+    df = fetch(cache, T0, T0 + timedelta(days=6))
+    assert cache.coverage("AAPL.US", "h") == covered
+    assert df["datetime"].iloc[0] == T0 + timedelta(days=2)
+
+    # The gaps are requested again once EODHD answers
+    FakeFetcher.fail = False
+    df = fetch(cache, T0, T0 + timedelta(days=6))
+    assert cache.coverage("AAPL.US", "h") == (int(T0.timestamp()), int((T0 + timedelta(days=6)).timestamp()))
+    assert df["datetime"].iloc[0] == T0 and df["datetime"].iloc[-1] == T0 + timedelta(days=6)
+    assert df["datetime"].is_unique
+
+
+def test_failed_first_fetch_writes_nothing(cache):
+    FakeFetcher.fail = True
+    assert fetch(cache, T0, T0 + timedelta(days=1)).empty
+    assert cache.coverage("AAPL.US", "h") is None
+
+
+def test_covered_range_is_read_from_disk(cache):
+    fetch(cache, T0, T0 + timedelta(days=3))
+    FakeFetcher.requests.clear()
+    df = fetch(cache, T0 + timedelta(days=1), T0 + timedelta(days=2))
+    assert FakeFetcher.requests == []
+    assert len(df) == 25
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = OhlcCache(root=str(tmp_path), max_bytes=2**30)
+    df = bars(T0, T0 + timedelta(days=30))
+    for symbol in ("A", "B", "C"):
+        cache.write(symbol, "h", df, T0, T0 + timedelta(days=30))
+    cache.read("A", "h")
+
+    # A new instance scans the directory once; later writes only update its index
+    cache = OhlcCache(root=str(tmp_path), max_bytes=cache._total * 3 // 4 + 1)
+    cache.read("A", "h")
+    cache.write("D", "h", df, T0, T0 + timedelta(days=30))
+    assert cache.coverage("B", "h") is None and cache.coverage("C", "h") is None
+    assert cache.coverage("A", "h") is not None and cache.coverage("D", "h") is not None
+    assert cache._total == sum(size for _, size in cache._index().values())
+
+
+def write_many(root: str, days: int) -> None:
+    cache = OhlcCache(root=root, max_bytes=2**30)
+    for _ in range(20):
+        cache.write("AAPL.US", "h", bars(T0, T0 + timedelta(days=days)), T0, T0 + timedelta(days=days))
+
+
+def test_concurrent_writes_from_processes(tmp_path):
+    # Shard processes share the cache directory and may store the same series at once
+    days = [1, 2, 3, 4]
+    with ProcessPoolExecutor(len(days)) as pool:
+        list(pool.map(write_many, [str(tmp_path)] * len(days), days))
+
+    cache = OhlcCache(root=str(tmp_path), max_bytes=2**30)
+    start, end = cache.coverage("AAPL.US", "h")
+    df = cache.read("AAPL.US", "h")
+    assert end - start == len(df) * 3600 - 3600 and (end - start) // 86400 in days
+    assert os.listdir(tmp_path / "AAPL.US") == ["h"]
+
+
+@pytest.mark.parametrize("meta", ['{"start": 0, "end": 1}', '{"time_column": "datetime", "start": 0}', "[1, 2]"])
+def test_malformed_meta_is_discarded(cache, meta):
+    fetch(cache, T0, T0 + timedelta(days=1))
+    path = cache._path("AAPL.US", "h")
+    with open(os.path.join(path, ohlc_cache.META_FILE), "w") as f:
+        f.write(meta)
+
+    assert cache.read("AAPL.US", "h") is None
+    assert not os.path.exists(path)
+    assert cache.coverage("AAPL.US", "h") is None
+    assert len(fetch(cache, T0, T0 + timedelta(days=1))) == 25
+
+
+def test_read_survives_the_series_being_removed_meanwhile(cache, monkeypatch):
+    fetch(cache, T0, T0 + timedelta(days=1))
+
+    def utime(path, *args, **kwargs):
+        raise FileNotFoundError(path)  # another shard evicted the series after it was mapped
+
+    monkeypatch.setattr(ohlc_cache.os, "utime", utime)
+    assert len(cache.read("AAPL.US", "h")) == 25
@@ -0,0 +1,67 @@
+# test_optimize.py
+
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import pytest
+from backtest import simulate_trades
+from compute import JobCancelled
+from optimize import expand_grid, optimize
+from strategy import StrategyFactory
+
+GRID = {"short_window": [5, 10, 50], "long_window": [20, 50]}
+
+
+def random_frame(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    close[rng.random(n) < 0.02] = np.nan
+    return pd.DataFrame({"date": pd.date_range("2020-01-01", periods=n, freq="D", tz="UTC"), "close": close})
+
+
+def test_expand_grid_skips_invalid_combinations():
+    assert expand_grid("sma", GRID) == [
+        {"short_window": 5, "long_window": 20},
+        {"short_window": 5, "long_window": 50},
+        {"short_window": 10, "long_window": 20},
+        {"short_window": 10, "long_window": 50},
+    ]
+    # A grid that leaves a constrained parameter at its default is not filtered
+    assert expand_grid("sma", {"short_window": [5, 500]}) == [{"short_window": 5}, {"short_window": 500}]
+    assert len(expand_grid("bbands")) == 16
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_matches_backtest_of_each_combination(max_workers):
+    df = random_frame(600, 1)
+    result = optimize("sma", df, GRID, max_workers=max_workers)
+
+    closes = df.dropna(subset=["close"]).reset_index(drop=True)
+    expected = []
+    for params in expand_grid("sma", GRID):
+        stats = simulate_trades(StrategyFactory.create_strategy("sma", **params).generate_signals(closes))
+        expected.append({**params, **{k: stats[k] for k in ("trades", "win_rate_pct", "total_return_pct")}})
+    expected = pd.DataFrame(expected).sort_values(["total_return_pct", "win_rate_pct"], ascending=False)
+
+    pd.testing.assert_frame_equal(result, expected.reset_index(drop=True), check_dtype=False)
+
+
+def test_runs_on_a_given_pool():
+    df = random_frame(300, 2)
+    with ProcessPoolExecutor(2) as pool:
+        result = optimize("sma", df, GRID, max_workers=2, pool=pool)
+        # The pool is left running for the next sweep
+        assert len(optimize("sma", df, GRID, max_workers=2, pool=pool)) == len(result) == 4
+
+
+def test_cancelled():
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(JobCancelled):
+        optimize("sma", random_frame(300, 3), GRID, max_workers=1, cancel=cancel)
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError, match="Unknown strategy"):
+        optimize("unknown", random_frame(10, 4))
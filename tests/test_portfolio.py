@@ -0,0 +1,72 @@
+# test_portfolio.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from backtest import align_closes, simulate_portfolio, trade_indices
+from strategy import StrategyFactory
+
+FEE = 0.001
+
+
+def random_frame(n: int, seed: int, start: str = "2020-01-01") -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({"date": pd.date_range(start, periods=n, freq="D", tz="UTC"), "close": close})
+
+
+def reference_growth(strategy, df: pd.DataFrame, fee: float = FEE) -> tuple[float, int]:
+    """Growth of one symbol's capital traded alone, and its closed trades."""
+    close = df["close"].to_numpy()
+    entries, exits = trade_indices(strategy.compute_signals(df).signal)
+    growth = 1.0
+    for i, entry in enumerate(entries):
+        # Half the fee on entry and half on exit; an open position is marked at the last close
+        exit_price, fees = (close[exits[i]], 2) if i < len(exits) else (close[-1], 1)
+        growth *= exit_price / close[entry] * (1 - fee / 2) ** fees
+    return growth, len(exits)
+
+
+@pytest.mark.parametrize("name", ["sma", "ema", "rsi", "macd", "bbands"])
+def test_matches_symbols_traded_alone(name):
+    strategy = StrategyFactory.create_strategy(name)
+    frames = {f"S{i}.US": random_frame(300, i) for i in range(4)}
+    # A symbol listed later is flat until its first bar
+    frames["LATE.US"] = random_frame(200, 9, start="2020-04-10")
+    result = simulate_portfolio(strategy, frames, fee=FEE)
+
+    expected = {symbol: reference_growth(strategy, df) for symbol, df in frames.items()}
+    per_symbol = result["per_symbol"].set_index("symbol")
+    for symbol, (growth, trades) in expected.items():
+        assert per_symbol.loc[symbol, "trades"] == trades
+        assert per_symbol.loc[symbol, "return_pct"] == pytest.approx((growth - 1) * 100, abs=0.006)
+
+    total = np.mean([growth for growth, _ in expected.values()])
+    assert result["equity"].iloc[-1] == pytest.approx(total)
+    assert result["total_return_pct"] == round((total - 1) * 100, 2)
+    assert result["trades"] == sum(trades for _, trades in expected.values())
+    assert result["symbols"] == 5 and result["data_points"] == 300
+    assert result["per_symbol"]["return_pct"].is_monotonic_decreasing
+
+
+def test_drawdown_from_the_running_peak():
+    strategy = StrategyFactory.create_strategy("sma", short_window=5, long_window=20)
+    result = simulate_portfolio(strategy, {"A.US": random_frame(300, 1), "B.US": random_frame(300, 2)})
+    equity = result["equity"].to_numpy()
+    peak = np.maximum.accumulate(np.maximum(equity, 1.0))
+    assert result["max_drawdown_pct"] == round((equity / peak - 1).min() * 100, 2)
+    assert result["max_drawdown_pct"] <= 0
+
+
+def test_align_closes_forward_fills_each_symbol():
+    a = pd.DataFrame({"date": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-04"], utc=True), "close": [1.0, 2.0, 4.0]})
+    b = pd.DataFrame({"date": pd.to_datetime(["2024-01-02", "2024-01-03"], utc=True), "close": [10.0, 30.0]})
+    times, symbols, close = align_closes({"A": a, "B": b, "EMPTY": pd.DataFrame()})
+    assert list(times.strftime("%m-%d")) == ["01-01", "01-02", "01-03", "01-04"]
+    assert symbols == ["A", "B"]
+    np.testing.assert_array_equal(close, [[1, np.nan], [2, 10], [2, 30], [4, 30]])
+
+
+def test_no_data():
+    with pytest.raises(ValueError):
+        simulate_portfolio(StrategyFactory.create_strategy("sma"), {"A.US": pd.DataFrame()})
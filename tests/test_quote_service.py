@@ -0,0 +1,80 @@
+# test_quote_service.py
+
+import asyncio
+import pytest
+from data_fetcher import AsyncDataFetcher
+from quote_service import QuoteService
+
+
+def quote(code: str, close: float) -> dict:
+    return {"code": code, "close": close}
+
+
+@pytest.fixture
+def responses(monkeypatch):
+    """Makes AsyncDataFetcher._get answer from a list of canned responses."""
+    answers = []
+
+    async def _get(self, endpoint, params):
+        return answers.pop(0)
+
+    monkeypatch.setattr(AsyncDataFetcher, "_get", _get)
+    return answers
+
+
+def fetch(symbols):
+    return asyncio.run(AsyncDataFetcher().fetch_quotes(symbols))
+
+
+def test_quotes_keyed_by_requested_symbols(responses):
+    responses.append([quote("AAPL.US", 1.0), quote("BTC-USD.CC", 2.0), quote("VOD.LSE", 3.0)])
+    quotes = fetch(["AAPL", "BTC-USD.CC", "VOD.LSE"])
+    assert {s: q["close"] for s, q in quotes.items()} == {"AAPL": 1.0, "BTC-USD.CC": 2.0, "VOD.LSE": 3.0}
+
+
+def test_single_quote_without_exchange(responses):
+    responses.append(quote("MSFT.US", 4.0))
+    assert fetch(["MSFT"])["MSFT"]["close"] == 4.0
+
+
+def test_unmatched_codes_fall_back_to_position(responses):
+    responses.append([quote("BRK-B.US", 5.0), quote("AAPL.US", 1.0)])
+    quotes = fetch(["BRK.B", "AAPL"])
+    assert quotes["BRK.B"]["close"] == 5.0 and quotes["AAPL"]["close"] == 1.0
+
+
+def test_missing_quotes_are_left_out(responses):
+    responses.append([quote("AAPL.US", 1.0)])
+    assert set(fetch(["AAPL", "NOPE"])) == {"AAPL"}
+
+
+def test_quote_service_returns_symbols_without_exchange(responses):
+    responses.append([quote("AAPL.US", 1.0), quote("MSFT.US", 4.0)])
+    service = QuoteService(ttl=60, batch_size=10, batch_delay=0)
+
+    async def run():
+        return await service.get_quotes(["aapl", "MSFT"]), await service.get_quotes(["AAPL"])
+
+    quotes, again = asyncio.run(run())
+    assert quotes["AAPL"]["close"] == 1.0 and quotes["MSFT"]["close"] == 4.0
+    assert again["AAPL"]["close"] == 1.0  # served from the cache, no second request
+
+
+def test_cancelled_batch_does_not_leave_callers_waiting(monkeypatch):
+    async def fetch_quotes(self, symbols):
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(AsyncDataFetcher, "fetch_quotes", fetch_quotes)
+    service = QuoteService(ttl=60, batch_size=10, batch_delay=0)
+
+    async def run():
+        callers = [asyncio.create_task(service.get_quotes(["AAPL"])), asyncio.create_task(service.get_quotes(["AAPL", "MSFT"]))]
+        await asyncio.sleep(0.01)
+        # What shutting down the event loop does to the batch
+        for task in list(service._tasks):
+            task.cancel()
+        results = await asyncio.wait_for(asyncio.gather(*callers, return_exceptions=True), timeout=1)
+        assert all(isinstance(r, asyncio.CancelledError) for r in results)
+        assert service._inflight == {}
+
+    asyncio.run(run())
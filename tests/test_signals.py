@@ -0,0 +1,78 @@
+# test_signals.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from strategy import SignalResult, StrategyFactory
+from strategy import indicators as kernels
+
+STRATEGIES = ["sma", "ema", "rsi", "macd", "bbands"]
+
+
+def ohlc_frame(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame(
+        {
+            "datetime": pd.date_range("2024-01-02", periods=n, freq="min", tz="UTC"),
+            "open": close,
+            "high": close * 1.01,
+            "low": close * 0.99,
+            "close": close,
+            "volume": rng.integers(100, 1000, n),
+        }
+    )
+
+
+@pytest.mark.parametrize("name", STRATEGIES)
+def test_compute_signals_does_not_copy_the_frame(name):
+    df = ohlc_frame(300, 1)
+    before = df.copy()
+    result = StrategyFactory.create_strategy(name).compute_signals(df)
+
+    assert result.data is df
+    pd.testing.assert_frame_equal(df, before)
+    assert len(result.signal) == len(df) and set(np.unique(result.signal)) <= {-1, 0, 1}
+    assert result.indicators and all(len(values) == len(df) for values in result.indicators.values())
+
+
+@pytest.mark.parametrize("name", STRATEGIES)
+def test_generate_signals_materialises_the_result(name):
+    df = ohlc_frame(300, 2)
+    strategy = StrategyFactory.create_strategy(name)
+    result = strategy.compute_signals(df)
+    frame = strategy.generate_signals(df)
+
+    assert list(frame.columns) == [*df.columns, *result.indicators, "signal", "position"]
+    pd.testing.assert_frame_equal(frame[df.columns], df)
+    np.testing.assert_array_equal(frame["signal"], result.signal)
+    for col, values in result.indicators.items():
+        np.testing.assert_array_equal(frame[col], values)
+    # The frame is the caller's to change
+    frame.loc[0, "close"] = -1.0
+    assert df.loc[0, "close"] > 0
+
+
+def test_strategies_share_cached_indicators(monkeypatch):
+    df = ohlc_frame(300, 3)
+    calls = []
+    ema = kernels.ema
+
+    def counting_ema(close, length):
+        calls.append(length)
+        return ema(close, length)
+
+    monkeypatch.setattr(kernels, "ema", counting_ema)
+    first = StrategyFactory.create_strategy("ema", short_span=12, long_span=26).compute_signals(df)
+    # MACD 12/26 reuses both EMAs and only computes its signal line
+    StrategyFactory.create_strategy("macd", fast=12, slow=26, signal=9).compute_signals(df)
+    again = StrategyFactory.create_strategy("ema", short_span=12, long_span=26).compute_signals(df)
+    assert calls == [12, 26, 9]
+    assert again.indicators["ema_12"] is first.indicators["ema_12"]
+
+
+def test_position_and_latest():
+    result = SignalResult(pd.DataFrame({"close": [1.0, 2.0, 3.0, 4.0]}), np.array([0, 1, 1, -1]))
+    np.testing.assert_array_equal(result.position, [0.0, 1.0, 0.0, -2.0])
+    assert result.latest() == -1
+    assert SignalResult(pd.DataFrame({"close": []}), np.array([], dtype=np.int64)).latest() == 0
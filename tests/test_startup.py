@@ -0,0 +1,81 @@
+# test_startup.py
+#
+# Startup budget for bot.py: importing it must stay fast and must not load the
+# heavy libraries, which are only needed once the first command comes in.
+#
+#   python -m pytest tests              # runs with the rest of the suite
+#   python tests/test_startup.py        # prints the numbers, exits with status 1 when over budget
+#
+# STARTUP_BUDGET (seconds) and STARTUP_RSS_BUDGET (MB) override the defaults.
+
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+STARTUP_BUDGET = float(os.getenv("STARTUP_BUDGET", 1.0))
+STARTUP_RSS_BUDGET = float(os.getenv("STARTUP_RSS_BUDGET", 80))
+
+# Modules that must not be imported until a handler runs
+HEAVY_MODULES = ["handlers", "pandas", "numpy", "numba", "eodhd", "matplotlib", "aiohttp", "strategy"]
+
+# Peak RSS from VmHWM where /proc exists: ru_maxrss keeps the parent's peak
+# across fork and exec, which under pytest is the test runner's
+_PROBE = """
+import json, resource, sys, time
+t0 = time.perf_counter()
+import bot
+elapsed = time.perf_counter() - t0
+try:
+    with open("/proc/self/status") as f:
+        rss_mb = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:")) / 1024
+except OSError:
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({
+    "seconds": elapsed,
+    "rss_mb": rss_mb,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+"""
+
+
+def measure_startup(runs: int = 3) -> dict:
+    """Imports bot.py in fresh interpreters and keeps the fastest run."""
+    results = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE % HEAVY_MODULES],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return min(results, key=lambda r: r["seconds"])
+
+
+def check_startup(result: dict) -> list[str]:
+    problems = []
+    if result["loaded"]:
+        problems.append(f"import bot loaded {', '.join(result['loaded'])}")
+    if result["seconds"] > STARTUP_BUDGET:
+        problems.append(f"import bot took {result['seconds']:.2f}s (budget {STARTUP_BUDGET:.2f}s)")
+    if result["rss_mb"] > STARTUP_RSS_BUDGET:
+        problems.append(f"RSS after import bot is {result['rss_mb']:.0f} MB (budget {STARTUP_RSS_BUDGET:.0f} MB)")
+    return problems
+
+
+def test_startup_budget():
+    problems = check_startup(measure_startup())
+    assert not problems, "; ".join(problems)
+
+
+if __name__ == "__main__":
+    result = measure_startup()
+    print(f"import bot: {result['seconds'] * 1e3:.0f} ms, {result['rss_mb']:.0f} MB RSS")
+    problems = check_startup(result)
+    for problem in problems:
+        print(f"OVER BUDGET: {problem}")
+    sys.exit(1 if problems else 0)
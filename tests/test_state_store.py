@@ -0,0 +1,37 @@
+# test_state_store.py
+
+import sqlite3
+from state_store import SqliteStateStore
+
+
+def sub_row(chat_id, symbol, last):
+    return {"chat_id": chat_id, "symbol": symbol, "interval": "d", "strategy": "rsi", "params": {}, "last_candle_time": last}
+
+
+def test_failed_flush_is_retried(tmp_path, monkeypatch, caplog):
+    store = SqliteStateStore(str(tmp_path / "state.db"))
+    key_a, key_b = (1, "AAPL.US", "d", "rsi"), (1, "MSFT.US", "d", "rsi")
+    store.put_chat({"chat_id": 1, "symbol": "AAPL.US", "debug": False})
+    store.put_subscription(key_a, sub_row(1, "AAPL.US", "2024-01-01"))
+    store.put_subscription(key_b, sub_row(1, "MSFT.US", "2024-01-01"))
+
+    write = store._write
+
+    def failing_write(chats, subs):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(store, "_write", failing_write)
+    store.flush()
+    assert "retrying on the next flush" in caplog.text
+    assert store.load() == ([], [])
+
+    # Changes made after the failed batch win over it
+    store.put_subscription(key_a, sub_row(1, "AAPL.US", "2024-01-02"))
+    store.delete_subscription(key_b)
+    monkeypatch.setattr(store, "_write", write)
+    store.flush()
+
+    chats, subs = store.load()
+    assert chats == [{"chat_id": 1, "symbol": "AAPL.US", "debug": False}]
+    assert subs == [sub_row(1, "AAPL.US", "2024-01-02")]
+    store._db.close()
@@ -0,0 +1,151 @@
+# test_stream.py
+
+import asyncio
+import os
+import sys
+from aiohttp import web
+import stream
+from stream import Candle, CandleAggregator, EodhdStream
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+from ws_stub_server import make_app  # noqa: E402
+
+# Start of a 5-minute bar, in epoch seconds
+B0 = 1_704_205_800
+
+
+def test_aggregator_rolls_over_on_the_next_bar():
+    agg = CandleAggregator(60)
+    assert agg.add(B0 + 1, 10, 1) is None
+    assert agg.add(B0 + 30, 12, 2) is None
+    assert agg.add(B0 + 59, 9, 1) is None
+    assert agg.add(B0 + 65, 11, 1) == Candle(B0, 10, 12, 9, 9, 4)
+    assert agg.current == Candle(B0 + 60, 11, 11, 11, 11, 1)
+
+
+def test_aggregator_drops_late_ticks():
+    agg = CandleAggregator(60)
+    agg.add(B0 + 1, 10)
+    agg.add(B0 + 61, 11)
+    assert agg.add(B0 + 50, 100) is None  # the B0 candle was already emitted
+    assert agg.current == Candle(B0 + 60, 11, 11, 11, 11, 0)
+
+    assert agg.close_due(B0 + 125, settle=1) == Candle(B0 + 60, 11, 11, 11, 11, 0)
+    assert agg.add(B0 + 100, 100) is None  # nor the candle closed by close_due
+    assert agg.current is None
+
+
+def test_close_due_waits_for_settle():
+    agg = CandleAggregator(60)
+    agg.add(B0 + 1, 10)
+    assert agg.close_due(B0 + 60, settle=2) is None
+    assert agg.close_due(B0 + 62, settle=2) == Candle(B0, 10, 10, 10, 10, 0)
+    assert agg.close_due(B0 + 200, settle=2) is None
+
+
+class Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+def us_tick(seconds: float, price: float, volume: float) -> dict:
+    ms = int(seconds * 1000)
+    return {"s": "AAPL", "p": price, "v": volume, "c": [12], "dp": False, "ms": ms, "t": ms}
+
+
+async def wait_for(condition, timeout: float = 5) -> None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "timed out"
+        await asyncio.sleep(0.02)
+
+
+def test_stream_through_stub_server(monkeypatch):
+    """Bar rollover, a late tick and the _sweep flush, end to end over the stub feed."""
+    clock = Clock(B0)
+    monkeypatch.setattr(stream, "time", clock)
+    script = [
+        {"status_code": 200, "message": "Authorized"},
+        us_tick(B0 + 1, 10, 1),
+        us_tick(B0 + 30, 12, 2),
+        us_tick(B0 + 59, 9, 1),
+        us_tick(B0 + 65, 11, 1),  # closes the first 1m candle
+        us_tick(B0 + 50, 100, 5),  # late for 1m, still inside the 5m candle
+        us_tick(B0 + 130, 13, 1),  # closes the second 1m candle
+        {"s": "MSFT", "p": 1, "t": B0 * 1000},  # not subscribed
+    ]
+
+    async def run():
+        runner = web.AppRunner(make_app(script=script))
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        candles = []
+
+        async def on_candle(symbol, interval, candle):
+            candles.append((symbol, interval, candle))
+
+        feed = EodhdStream(on_candle, url=f"ws://127.0.0.1:{port}/ws", api_token="test", settle=0)
+        try:
+            feed.sync({("AAPL.US", "1m"), ("AAPL.US", "5m"), ("AAPL.US", "d")})
+            await wait_for(lambda: len(candles) == 2)
+            assert feed.covers("AAPL.US", "1m") and not feed.covers("AAPL.US", "d")
+            assert candles == [
+                ("AAPL.US", "1m", Candle(B0, 10, 12, 9, 9, 4)),
+                ("AAPL.US", "1m", Candle(B0 + 60, 11, 11, 11, 11, 1)),
+            ]
+
+            # The quiet market: _sweep flushes the open candles once they end
+            clock.now = B0 + 180
+            await wait_for(lambda: len(candles) == 3)
+            assert candles[2] == ("AAPL.US", "1m", Candle(B0 + 120, 13, 13, 13, 13, 1))
+
+            clock.now = B0 + 300
+            await wait_for(lambda: len(candles) == 4)
+            assert candles[3] == ("AAPL.US", "5m", Candle(B0, 10, 100, 9, 13, 11))
+        finally:
+            await feed.close()
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+
+def test_sync_adds_and_drops_series(monkeypatch):
+    started = []
+
+    async def run_feed(self, feed):
+        started.append(feed)
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(EodhdStream, "_run_feed", run_feed)
+
+    async def main():
+        s = EodhdStream(lambda *args: asyncio.sleep(0), url="ws://unused")
+        s.sync({("AAPL.US", "1m"), ("AAPL.US", "h"), ("MSFT.US", "5m"), ("BTC-USD.CC", "1m"), ("AAPL.US", "d")})
+        await asyncio.sleep(0)
+        assert sorted(started) == ["crypto", "us"]
+        assert {code: {sym: set(aggs) for sym, aggs in syms.items()} for code, syms in s._series["us"].items()} == {
+            "AAPL": {"AAPL.US": {"1m", "h"}},
+            "MSFT": {"MSFT.US": {"5m"}},
+        }
+        aggregator = s._series["us"]["AAPL"]["AAPL.US"]["1m"]
+
+        # Kept series keep their aggregators; the crypto feed has nothing left and is closed
+        s.sync({("AAPL.US", "1m"), ("AAPL.US", "5m")})
+        assert set(s._series) == {"us"}
+        assert set(s._series["us"]) == {"AAPL"}
+        assert set(s._series["us"]["AAPL"]["AAPL.US"]) == {"1m", "5m"}
+        assert s._series["us"]["AAPL"]["AAPL.US"]["1m"] is aggregator
+        assert set(s._feeds) == {"us"}
+
+        s.sync(set())
+        assert s._series == {} and s._feeds == {}
+        await s.close()
+
+    asyncio.run(main())
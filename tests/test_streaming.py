@@ -0,0 +1,76 @@
+# test_streaming.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from evaluator import SignalEvaluator
+from strategy import RsiStrategy, StrategyFactory
+
+STRATEGIES = ["sma", "ema", "rsi", "macd", "bbands"]
+
+
+def random_frame(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({"datetime": pd.date_range("2024-01-02", periods=n, freq="min", tz="UTC"), "close": close})
+
+
+@pytest.mark.parametrize("name", STRATEGIES)
+def test_update_matches_full_recompute(name):
+    df = random_frame(500, 1)
+    strategy = StrategyFactory.create_strategy(name)
+    assert strategy.supports_streaming
+    expected = strategy.compute_signals(df).signal
+
+    strategy.reset()
+    streamed = [strategy.update(close) for close in df["close"]]
+    np.testing.assert_array_equal(streamed, expected)
+
+    # Bars can also be passed as rows
+    strategy.reset()
+    assert [strategy.update(row) for _, row in df.iloc[:50].iterrows()] == list(expected[:50])
+
+
+@pytest.mark.parametrize("name", STRATEGIES)
+def test_peek_leaves_the_state_alone(name):
+    df = random_frame(300, 2)
+    strategy = StrategyFactory.create_strategy(name)
+    strategy.seed(df.iloc[:-1])
+    last = df["close"].iloc[-1]
+    # A forming candle can be peeked at any number of times
+    assert strategy.peek(last * 1.05) == strategy.peek(last * 1.05)
+    assert strategy.peek(last) == strategy.update(last) == strategy.compute_signals(df).latest()
+
+
+def test_evaluator_feeds_only_new_candles(monkeypatch):
+    evaluator = SignalEvaluator()
+    df = random_frame(400, 3)
+    updates = []
+    update = RsiStrategy.update
+
+    def counting_update(self, bar):
+        updates.append(bar)
+        return update(self, bar)
+
+    monkeypatch.setattr(RsiStrategy, "update", counting_update)
+    counts = []
+    for n in (300, 301, 305, 305, 400):
+        data = df.iloc[:n].reset_index(drop=True)
+        updates.clear()
+        assert evaluator.latest_signal("AAPL.US", "1m", "rsi", {}, data) == RsiStrategy().compute_signals(data).latest()
+        counts.append(len(updates))
+    # Seeded with the closed candles once, then only new closed candles plus a peek at the last one
+    assert counts == [300, 2, 5, 1, 96]
+
+
+def test_evaluator_reseeds_when_history_is_replaced():
+    evaluator = SignalEvaluator()
+    df = random_frame(400, 4)
+    evaluator.latest_signal("AAPL.US", "1m", "macd", {}, df.iloc[:300])
+    # A history that no longer holds the last consumed candle starts over
+    other = random_frame(200, 5)
+    other["datetime"] += pd.Timedelta(days=1)
+    assert evaluator.latest_signal("AAPL.US", "1m", "macd", {}, other) == StrategyFactory.create_strategy("macd").compute_signals(other).latest()
+
+    evaluator.drop("AAPL.US", "1m")
+    assert evaluator._streams == {}
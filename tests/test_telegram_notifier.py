@@ -0,0 +1,103 @@
+# test_telegram_notifier.py
+
+import asyncio
+from aiohttp import web
+import telegram_notifier
+from telegram_notifier import MAX_MESSAGE_LENGTH, TelegramNotifier, TokenBucket
+
+
+def serve(handler, check, **kwargs):
+    """Runs `check(notifier)` with a notifier posting to a local server standing in for Telegram."""
+
+    async def run():
+        app = web.Application()
+        app.router.add_post("/sendMessage", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        notifier = TelegramNotifier(token="test", **kwargs)
+        notifier.api_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/sendMessage"
+        try:
+            return await check(notifier)
+        finally:
+            await notifier.close(timeout=1)
+            await runner.cleanup()
+
+    return asyncio.run(run())
+
+
+def telegram(*responses):
+    """A handler answering with the given (status, body) in turn, then 200; records what was sent."""
+    sent = []
+
+    async def handler(request):
+        form = await request.post()
+        sent.append((form["chat_id"], form["text"]))
+        status, body = responses[len(sent) - 1] if len(sent) <= len(responses) else (200, {"ok": True})
+        return web.json_response(body, status=status)
+
+    return handler, sent
+
+
+def test_queued_messages_are_coalesced_per_chat():
+    handler, sent = telegram()
+
+    async def check(notifier):
+        for text in ("a", "b", "c"):
+            await notifier.send_message(text, chat_id=1)
+        await notifier.send_message("x", chat_id=2)
+        await notifier.flush(timeout=2)
+
+    serve(handler, check)
+    assert sorted(sent) == [("1", "a\n\nb\n\nc"), ("2", "x")]
+
+
+def test_long_messages_are_split():
+    handler, sent = telegram()
+
+    async def check(notifier):
+        await notifier.send_message("x" * (MAX_MESSAGE_LENGTH + 10), chat_id=1)
+        await notifier.flush(timeout=2)
+
+    serve(handler, check, chat_rate=100)
+    assert [len(text) for _, text in sent] == [MAX_MESSAGE_LENGTH, 10]
+
+
+def test_rate_limited_message_is_resent_first():
+    handler, sent = telegram((429, {"ok": False, "parameters": {"retry_after": 0.1}}))
+
+    async def check(notifier):
+        await notifier.send_message("first", chat_id=1)
+        await asyncio.sleep(0.02)
+        await notifier.send_message("second", chat_id=1)
+        await notifier.flush(timeout=2)
+
+    serve(handler, check)
+    # The retry goes out with what was queued while waiting, in order
+    assert sent == [("1", "first"), ("1", "first\n\nsecond")]
+
+
+def test_rejected_and_failing_messages_are_dropped(monkeypatch):
+    monkeypatch.setattr(telegram_notifier, "TELEGRAM_MAX_RETRIES", 0)
+    handler, sent = telegram((400, {"ok": False, "description": "chat not found"}), (502, {}))
+
+    async def check(notifier):
+        await notifier.send_message("rejected", chat_id=1)
+        await notifier.flush(timeout=2)
+        await notifier.send_message("failing", chat_id=1)
+        await notifier.flush(timeout=2)
+        return notifier._pending, notifier._retries
+
+    assert serve(handler, check, chat_rate=100) == ({}, {})
+    assert sent == [("1", "rejected"), ("1", "failing")]
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.wait_time() == 0
+    bucket.consume()
+    bucket.consume()
+    assert 0.09 < bucket.wait_time() <= 0.1
+    bucket.block(5)
+    assert 4.9 < bucket.wait_time() <= 5
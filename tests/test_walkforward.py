@@ -0,0 +1,77 @@
+# test_walkforward.py
+
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from backtest import simulate_trades
+from compute import JobCancelled
+from strategy import StrategyFactory
+from walkforward import walk_forward, windows
+
+GRID = {"short_window": [5, 10], "long_window": [20, 40]}
+
+
+def random_frame(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({"date": pd.date_range("2020-01-01", periods=n, freq="D", tz="UTC"), "close": close})
+
+
+def test_rolling_windows_tile_the_history():
+    assert windows(10, 4, 3) == [(0, 4, 7), (3, 7, 10)]
+    # The last test window is cut short at the end of the history
+    assert windows(11, 4, 3) == [(0, 4, 7), (3, 7, 10), (6, 10, 11)]
+
+
+def test_anchored_windows_train_from_the_first_bar():
+    assert windows(11, 4, 3, anchored=True) == [(0, 4, 7), (0, 7, 10), (0, 10, 11)]
+
+
+def test_windows_need_bars_after_the_training_window():
+    assert windows(4, 4, 3) == []
+    assert windows(5, 4, 3) == [(0, 4, 5)]
+    with pytest.raises(ValueError):
+        windows(10, 0, 3)
+    with pytest.raises(ValueError):
+        windows(10, 4, 0)
+
+
+@pytest.mark.parametrize("anchored", [False, True])
+def test_matches_backtests_of_each_window(anchored):
+    df = random_frame(400, 1)
+    result = walk_forward("sma", df, train_bars=120, test_bars=60, grid=GRID, anchored=anchored)
+    spans = windows(len(df), 120, 60, anchored)
+    assert len(result) == len(spans)
+
+    # Signals come from the whole history, so each window keeps its warm-up
+    signals = {
+        (short, long): StrategyFactory.create_strategy("sma", short_window=short, long_window=long).generate_signals(df)
+        for short in GRID["short_window"]
+        for long in GRID["long_window"]
+    }
+    for row, (train_start, test_start, test_end) in zip(result.itertuples(), spans):
+        assert row.train_start == df["date"][train_start]
+        assert row.test_start == df["date"][test_start]
+        assert row.test_end == df["date"][test_end - 1]
+
+        train = {params: simulate_trades(s.iloc[train_start:test_start]) for params, s in signals.items()}
+        assert row.train_return_pct == max(r["total_return_pct"] for r in train.values())
+        assert row.train_return_pct == train[(row.short_window, row.long_window)]["total_return_pct"]
+
+        test = simulate_trades(signals[(row.short_window, row.long_window)].iloc[test_start:test_end])
+        assert row.test_trades == test["trades"]
+        assert row.test_win_rate_pct == test["win_rate_pct"]
+        assert row.test_return_pct == test["total_return_pct"]
+
+
+def test_too_few_bars():
+    with pytest.raises(ValueError, match="Need more than 120 bars"):
+        walk_forward("sma", random_frame(120, 2), train_bars=120, test_bars=60, grid=GRID)
+
+
+def test_cancelled():
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(JobCancelled):
+        walk_forward("sma", random_frame(400, 3), train_bars=120, test_bars=60, grid=GRID, cancel=cancel)
@@ -0,0 +1,73 @@
+# test_watchlist.py
+
+import pandas as pd
+from state_store import SqliteStateStore
+from watchlist import Subscription, Watchlist
+
+
+def watchlist() -> Watchlist:
+    wl = Watchlist()
+    wl.add(Subscription(1, "AAPL.US", "d", "sma"))
+    wl.add(Subscription(1, "AAPL.US", "d", "rsi"))
+    wl.add(Subscription(2, "AAPL.US", "d", "sma", {"short_window": 5}))
+    wl.add(Subscription(2, "AAPL.US", "h"))
+    wl.add(Subscription(2, "BTC-USD.CC", "d"))
+    return wl
+
+
+def test_groups_subscribers_of_each_series():
+    wl = watchlist()
+    groups = wl.groups()
+    assert list(groups) == [("AAPL.US", "d"), ("AAPL.US", "h"), ("BTC-USD.CC", "d")]
+    assert [(s.chat_id, s.strategy) for s in groups[("AAPL.US", "d")]] == [(1, "sma"), (1, "rsi"), (2, "sma")]
+    assert list(wl.groups("h")) == [("AAPL.US", "h")]
+    assert len(wl) == 5
+
+
+def test_chats_are_kept_apart():
+    wl = watchlist()
+    assert [s.series for s in wl.for_chat(1)] == [("AAPL.US", "d")] * 2
+    assert {s.series for s in wl.for_chat(2)} == {("AAPL.US", "d"), ("AAPL.US", "h"), ("BTC-USD.CC", "d")}
+    assert wl.has_chat(2) and not wl.has_chat(3)
+
+    # Unwatching removes only that chat's subscriptions
+    removed = wl.remove(1, "AAPL.US")
+    assert [(s.chat_id, s.strategy) for s in removed] == [(1, "sma"), (1, "rsi")]
+    assert [s.chat_id for s in wl.groups()[("AAPL.US", "d")]] == [2]
+    assert wl.for_chat(1) == []
+
+
+def test_remove_one_interval_drops_empty_series():
+    wl = watchlist()
+    assert [s.interval for s in wl.remove(2, "AAPL.US", "h")] == ["h"]
+    assert not wl.is_watched("AAPL.US", "h")
+    assert wl.is_watched("AAPL.US", "d")
+    assert wl.remove(2, "MSFT.US") == []
+
+
+def test_readding_keeps_the_last_processed_candle():
+    wl = watchlist()
+    sub = wl.groups()[("BTC-USD.CC", "d")][0]
+    wl.mark_processed(sub, pd.Timestamp("2024-01-02", tz="UTC"))
+    assert not wl.add(Subscription(2, "BTC-USD.CC", "d", "sma", {"short_window": 10}))
+    [sub] = wl.groups()[("BTC-USD.CC", "d")]
+    assert sub.params == {"short_window": 10}
+    assert sub.last_candle_time == pd.Timestamp("2024-01-02", tz="UTC")
+
+
+def test_load_restores_watchlists(tmp_path):
+    store = SqliteStateStore(str(tmp_path / "state.db"))
+    wl = Watchlist(store)
+    wl.add(Subscription(1, "AAPL.US", "d", "rsi", {"length": 7}))
+    wl.add(Subscription(2, "AAPL.US", "d"))
+    wl.settings(2).symbol = "MSFT.US"
+    wl.save_settings(2)
+    wl.remove(2, "AAPL.US")
+    store.flush()
+
+    restored = Watchlist(store)
+    assert restored.load() == 1
+    [sub] = restored.groups()[("AAPL.US", "d")]
+    assert (sub.chat_id, sub.strategy, sub.params) == (1, "rsi", {"length": 7})
+    assert restored.settings(2).symbol == "MSFT.US"
+    store._db.close()
@@ -0,0 +1,112 @@
+# walkforward.py
+
+import logging
+import threading
+from typing import Optional
+import numpy as np
+import pandas as pd
+from strategy import StrategyFactory
+from backtest import invested_matrix, round_trips
+from optimize import expand_grid
+from compute import JobCancelled
+
+logger = logging.getLogger(__name__)
+
+
+def windows(n: int, train_bars: int, test_bars: int, anchored: bool = False) -> list[tuple[int, int, int]]:
+    """(train start, test start, test end) rows of consecutive walk-forward windows.
+
+    Each test window follows its training window and the next window moves
+    on by `test_bars`, so the test windows tile the history after the first
+    training window. The last test window may be shorter. Anchored windows
+    always train from the first bar.
+    """
+    if train_bars < 1 or test_bars < 1:
+        raise ValueError("train and test windows need at least one bar")
+    return [
+        (0 if anchored else start - train_bars, start, min(start + test_bars, n))
+        for start in range(train_bars, n, test_bars)
+    ]
+
+
+def _column_stats(close: np.ndarray, signal: np.ndarray, fee: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Trades, win rate (%) and total return of each signal column, each starting flat."""
+    k = signal.shape[1]
+    cols, _, trades = round_trips(close, invested_matrix(signal), fee)
+    counts = np.bincount(cols, minlength=k)
+    wins = np.bincount(cols, weights=trades > 0, minlength=k)
+    win_rate = np.divide(wins * 100, counts, out=np.zeros(k), where=counts > 0)
+    return counts, win_rate, np.bincount(cols, weights=trades, minlength=k)
+
+
+def walk_forward(
+    strategy_name: str,
+    df: pd.DataFrame,
+    train_bars: int,
+    test_bars: int,
+    grid: Optional[dict] = None,
+    fee: float = 0.001,
+    anchored: bool = False,
+    cancel: Optional[threading.Event] = None,
+) -> pd.DataFrame:
+    """Re-optimizes a strategy on each training window and trades the next window with the winner.
+
+    Every parameter combination's signals are computed once over the whole
+    history, with indicators shared through the indicator cache, and the
+    windows only slice those arrays. Because the strategies' indicators only
+    look back, a window's signals are the ones a bot running since the
+    first bar would have seen, with the warm-up taken from the bars before
+    the window. Trades in each window start flat and are counted as in
+    simulate_trades.
+
+    Returns one row per window: its time range, the parameters that won the
+    training window (by total return, then win rate) and their in-sample
+    and out-of-sample results.
+    """
+    combos = expand_grid(strategy_name, grid)
+    if not combos:
+        raise ValueError(f"No parameter grid for strategy: {strategy_name}")
+
+    df = df.dropna(subset=["close"]).reset_index(drop=True)
+    close = df["close"].to_numpy(dtype=np.float64)
+    spans = windows(len(close), train_bars, test_bars, anchored)
+    if not spans:
+        raise ValueError(f"Need more than {train_bars} bars for a walk-forward test, got {len(close)}")
+
+    signals = np.empty((len(close), len(combos)), dtype=np.int8)
+    for j, params in enumerate(combos):
+        if cancel is not None and cancel.is_set():
+            raise JobCancelled(f"Walk-forward test of {strategy_name} was cancelled")
+        signals[:, j] = StrategyFactory.create_strategy(strategy_name, **params).compute_signals(df).signal
+
+    time_col = "datetime" if "datetime" in df.columns else "date" if "date" in df.columns else None
+    times = df[time_col].array if time_col else df.index
+
+    rows = []
+    for i, (train_start, test_start, test_end) in enumerate(spans):
+        if cancel is not None and cancel.is_set():
+            raise JobCancelled(f"Walk-forward test of {strategy_name} was cancelled")
+
+        _, train_win_rate, train_return = _column_stats(
+            close[train_start:test_start], signals[train_start:test_start], fee
+        )
+        best = np.lexsort((-train_win_rate, -train_return))[0]
+        trades, win_rate, test_return = _column_stats(
+            close[test_start:test_end], signals[test_start:test_end, best : best + 1], fee
+        )
+        rows.append(
+            {
+                "window": i + 1,
+                "train_start": times[train_start],
+                "test_start": times[test_start],
+                "test_end": times[test_end - 1],
+                **combos[best],
+                "train_return_pct": round(train_return[best] * 100, 2),
+                "test_trades": int(trades[0]),
+                "test_win_rate_pct": round(win_rate[0], 2),
+                "test_return_pct": round(test_return[0] * 100, 2),
+            }
+        )
+
+    logger.info("Walk-forward tested %s over %d windows x %d combinations", strategy_name, len(rows), len(combos))
+    return pd.DataFrame(rows)
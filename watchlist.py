@@ -0,0 +1,141 @@
+# watchlist.py
+
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+import pandas as pd
+from config import DEFAULT_SYMBOL, DEFAULT_INTERVAL
+from state_store import StateStore
+
+
+@dataclass
+class ChatSettings:
+    """Per-chat defaults used by /get_price, /current_strategy and /watch."""
+
+    symbol: str = DEFAULT_SYMBOL
+    interval: str = DEFAULT_INTERVAL
+    strategy: str = "sma"
+    params: dict = field(default_factory=dict)
+    debug: bool = False
+
+
+@dataclass
+class Subscription:
+    """A chat watching one (symbol, interval) with a strategy and its parameters."""
+
+    chat_id: int
+    symbol: str
+    interval: str
+    strategy: str = "sma"
+    params: dict = field(default_factory=dict)
+    last_candle_time: Optional[pd.Timestamp] = None
+
+    @property
+    def key(self) -> tuple:
+        return (self.chat_id, self.symbol, self.interval, self.strategy)
+
+    @property
+    def series(self) -> tuple[str, str]:
+        return (self.symbol, self.interval)
+
+    @property
+    def strategy_key(self) -> tuple:
+        """Identifies the strategy configuration, so equal ones are evaluated once."""
+        return (self.strategy, tuple(sorted(self.params.items())))
+
+    def to_row(self) -> dict:
+        row = asdict(self)
+        row["last_candle_time"] = None if self.last_candle_time is None else self.last_candle_time.isoformat()
+        return row
+
+    @classmethod
+    def from_row(cls, row: dict) -> "Subscription":
+        row = dict(row)
+        if row.get("last_candle_time") is not None:
+            row["last_candle_time"] = pd.Timestamp(row["last_candle_time"])
+        return cls(**row)
+
+
+class Watchlist:
+    """All subscriptions of all chats, indexed by (symbol, interval).
+
+    The scheduler walks `groups()` so every series is fetched once per run and
+    evaluated for each of its subscribers.
+
+    With a `store`, subscriptions, chat settings (after `save_settings`) and
+    processed candles (through `mark_processed`) are persisted, and `load()`
+    restores them after a restart.
+    """
+
+    def __init__(self, store: Optional[StateStore] = None):
+        self.store = store or StateStore()
+        self._settings: dict[int, ChatSettings] = {}
+        self._series: dict[tuple[str, str], dict[tuple, Subscription]] = {}
+
+    def load(self) -> int:
+        """Restores the stored settings and subscriptions; returns the number of subscriptions."""
+        chats, subs = self.store.load()
+        for row in chats:
+            row = dict(row)
+            chat_id = row.pop("chat_id")
+            self._settings[chat_id] = ChatSettings(**row)
+        for row in subs:
+            sub = Subscription.from_row(row)
+            self._series.setdefault(sub.series, {})[sub.key] = sub
+        return len(subs)
+
+    def settings(self, chat_id: int) -> ChatSettings:
+        return self._settings.setdefault(chat_id, ChatSettings())
+
+    def save_settings(self, chat_id: int) -> None:
+        """Persists a chat's settings after they were changed."""
+        self.store.put_chat({"chat_id": chat_id, **asdict(self.settings(chat_id))})
+
+    def add(self, sub: Subscription) -> bool:
+        """Adds a subscription; returns False if it replaced an existing one."""
+        subs = self._series.setdefault(sub.series, {})
+        existing = subs.get(sub.key)
+        if existing is not None:
+            sub.last_candle_time = existing.last_candle_time
+        subs[sub.key] = sub
+        self.store.put_subscription(sub.key, sub.to_row())
+        return existing is None
+
+    def mark_processed(self, sub: Subscription, candle_time: pd.Timestamp) -> None:
+        """Records the last candle a subscription was evaluated on."""
+        sub.last_candle_time = candle_time
+        self.store.put_subscription(sub.key, sub.to_row())
+
+    def remove(self, chat_id: int, symbol: str, interval: Optional[str] = None) -> list[Subscription]:
+        """Removes a chat's subscriptions to a symbol (optionally one interval only)."""
+        removed = []
+        for series in list(self._series):
+            if series[0] != symbol or (interval is not None and series[1] != interval):
+                continue
+            subs = self._series[series]
+            for key in [k for k in subs if k[0] == chat_id]:
+                removed.append(subs.pop(key))
+                self.store.delete_subscription(key)
+            if not subs:
+                del self._series[series]
+        return removed
+
+    def for_chat(self, chat_id: int) -> list[Subscription]:
+        return [s for subs in self._series.values() for s in subs.values() if s.chat_id == chat_id]
+
+    def has_chat(self, chat_id: int) -> bool:
+        """Whether a chat has settings or subscriptions, saved or made since startup."""
+        return chat_id in self._settings or any(k[0] == chat_id for subs in self._series.values() for k in subs)
+
+    def is_watched(self, symbol: str, interval: str) -> bool:
+        return (symbol, interval) in self._series
+
+    def groups(self, interval: Optional[str] = None) -> dict[tuple[str, str], list[Subscription]]:
+        """Subscriptions grouped by (symbol, interval), optionally for one interval."""
+        return {
+            series: list(subs.values())
+            for series, subs in self._series.items()
+            if interval is None or series[1] == interval
+        }
+
+    def __len__(self) -> int:
+        return sum(len(subs) for subs in self._series.values())